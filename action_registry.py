@@ -0,0 +1,226 @@
+"""
+JARVIS - Declarative Action Registry
+Har bir executor action'i bitta yozuv sifatida ro'yxatdan o'tadi: handler, kategoriya,
+xavfli (destructive) belgisi, kechikish sinfi va qaysi resurslarni band qilishi.
+Bir xil nom ikki marta ro'yxatdan o'tsa, import paytidayoq DuplicateActionError ko'tariladi.
+ResourceLocks har bir resurs uchun alohida qulf beradi: umumiy resursi yo'q action'lar parallel bajariladi.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from config import DESTRUCTIVE_ACTIONS
+
+# Kechikish sinflari
+INSTANT = "instant"   # < 50 ms, faqat lokal o'qish / oddiy tizim chaqiruvi
+FAST = "fast"         # < 1 s, UI avtomatlashtirish, fayl operatsiyalari
+SLOW = "slow"         # tarmoq, LLM, skanerlash, uzoq jarayonlar
+LATENCY_CLASSES = (INSTANT, FAST, SLOW)
+
+# Resurslar (bir resursni band qiluvchi action'lar bir vaqtda bajarilmaydi;
+# locks=() — faqat o'qiydigan action, hech qanday qulf olinmaydi)
+INPUT = "input"            # klaviatura, sichqoncha, aktiv oyna
+AUDIO = "audio"            # ovoz balandligi, media tugmalari, TTS
+FILESYSTEM = "filesystem"  # fayl yaratish/o'chirish/yozish
+CAMERA = "camera"          # veb-kamera, ekran yozish
+NETWORK = "network"        # faqat tarmoq so'rovlari
+SYSTEM = "system"          # quvvat holati, jarayonlar, sessiya
+RESOURCES = (INPUT, AUDIO, FILESYSTEM, CAMERA, NETWORK, SYSTEM)
+
+DEFAULT_CATEGORY = "lz_ACTION"
+
+# Executor'dan tashqarida (agent darajasida) hal qilinadigan action'lar kategoriyasi
+AGENT_CATEGORIES = {
+    "ai_conversation": "AI_BRAIN",
+    "compound": "AUTOMATION",
+}
+
+
+class DuplicateActionError(RuntimeError):
+    """Bir action nomi ikki marta ro'yxatdan o'tkazilganda"""
+
+
+class ActionSpec:
+    """Bitta action yozuvi"""
+    __slots__ = ("name", "handler", "category", "destructive", "latency", "locks")
+
+    def __init__(self, name, handler, category, destructive, latency, locks):
+        self.name = name
+        self.handler = handler
+        self.category = category
+        self.destructive = destructive
+        self.latency = latency
+        self.locks = locks
+
+    def __repr__(self):
+        return (f"ActionSpec({self.name!r}, handler={self.handler.__name__}, category={self.category!r}, "
+                f"destructive={self.destructive}, latency={self.latency!r}, locks={self.locks})")
+
+
+class ActionRegistry:
+    """Action nomi -> ActionSpec (O(1) qidiruv)"""
+
+    def __init__(self):
+        self._specs = {}
+
+    def register(self, name, handler, category=DEFAULT_CATEGORY, destructive=None,
+                 latency=FAST, locks=()):
+        if name in self._specs:
+            existing = self._specs[name].handler
+            raise DuplicateActionError(
+                f"Action '{name}' allaqachon ro'yxatdan o'tgan "
+                f"({existing.__qualname__}, line {existing.__code__.co_firstlineno}); "
+                f"takroriy: {handler.__qualname__}, line {handler.__code__.co_firstlineno}"
+            )
+        if latency not in LATENCY_CLASSES:
+            raise ValueError(f"Action '{name}': noma'lum latency sinfi '{latency}'")
+        unknown = set(locks) - set(RESOURCES)
+        if unknown:
+            raise ValueError(f"Action '{name}': noma'lum resurslar {sorted(unknown)}")
+        if destructive is None:
+            destructive = name in DESTRUCTIVE_ACTIONS
+
+        spec = ActionSpec(name, handler, category, bool(destructive), latency, tuple(sorted(locks)))
+        self._specs[name] = spec
+        return spec
+
+    def action(self, category=DEFAULT_CATEGORY, *, name=None, aliases=(), destructive=None,
+               latency=FAST, locks=()):
+        """
+        Metod dekoratori. Action nomi metod nomidan olinadi (_open_app -> open_app),
+        aliases qo'shimcha nomlar uchun (masalan get_battery -> _get_battery_info).
+        """
+        def decorator(func):
+            primary = name or func.__name__.lstrip("_")
+            for action_name in (primary, *aliases):
+                self.register(action_name, func, category=category, destructive=destructive,
+                              latency=latency, locks=locks)
+            return func
+        return decorator
+
+    def get(self, name):
+        return self._specs.get(name)
+
+    def category(self, name):
+        spec = self._specs.get(name)
+        if spec:
+            return spec.category
+        return AGENT_CATEGORIES.get(name, DEFAULT_CATEGORY)
+
+    def is_destructive(self, name):
+        spec = self._specs.get(name)
+        return spec.destructive if spec else name in DESTRUCTIVE_ACTIONS
+
+    def names(self):
+        return sorted(self._specs)
+
+    def __contains__(self, name):
+        return name in self._specs
+
+    def __len__(self):
+        return len(self._specs)
+
+    def __iter__(self):
+        return iter(self._specs.values())
+
+
+class ResourceLocks:
+    """
+    Resurs -> semafor (limit 1 bo'lsa oddiy qulf). Qulflar doim bir xil (saralangan) tartibda
+    olinadi, shuning uchun deadlock bo'lmaydi. Bir oqim ichida qayta kirish (masalan workflow
+    ichidan execute) allaqachon olingan resursni qayta so'ramaydi.
+    Kutish statistikasi: qancha marta olindi, qanchasida kutishga to'g'ri keldi, jami/max kutish.
+    """
+
+    def __init__(self, limits=None):
+        limits = limits or {}
+        self._semaphores = {r: threading.BoundedSemaphore(max(1, int(limits.get(r, 1)))) for r in RESOURCES}
+        self._held = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {r: {"acquired": 0, "contended": 0, "wait_ms": 0.0, "max_wait_ms": 0.0} for r in RESOURCES}
+
+    @contextmanager
+    def hold(self, resources):
+        held = getattr(self._held, "resources", None)
+        if held is None:
+            held = self._held.resources = set()
+
+        taken = []
+        try:
+            for resource in resources:
+                if resource in held:
+                    continue
+                semaphore = self._semaphores[resource]
+                waited = 0.0
+                if not semaphore.acquire(blocking=False):
+                    t0 = time.perf_counter()
+                    semaphore.acquire()
+                    waited = (time.perf_counter() - t0) * 1000
+                held.add(resource)
+                taken.append(resource)
+                self._record(resource, waited)
+            yield
+        finally:
+            for resource in reversed(taken):
+                held.discard(resource)
+                self._semaphores[resource].release()
+
+    def _record(self, resource, waited_ms):
+        with self._stats_lock:
+            stats = self._stats[resource]
+            stats["acquired"] += 1
+            if waited_ms:
+                stats["contended"] += 1
+                stats["wait_ms"] += waited_ms
+                stats["max_wait_ms"] = max(stats["max_wait_ms"], waited_ms)
+
+    def stats(self):
+        """Resurs bo'yicha qulf raqobati: {resurs: {acquired, contended, wait_ms, max_wait_ms}}"""
+        with self._stats_lock:
+            return {r: {k: round(v, 3) if isinstance(v, float) else v for k, v in s.items()}
+                    for r, s in self._stats.items()}
+
+
+# Umumiy registry (executor.py dekoratorlari shu yerga yozadi)
+ACTION_REGISTRY = ActionRegistry()
+action = ACTION_REGISTRY.action
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    from collections import Counter
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from config import SUPPORTED_ACTIONS
+    import executor  # noqa: F401  (dekoratorlar registry'ni to'ldiradi)
+    from action_registry import ACTION_REGISTRY  # __main__ emas, executor ishlatgan modul
+
+    print(f"Registered actions: {len(ACTION_REGISTRY)}")
+    print("By latency :", dict(Counter(spec.latency for spec in ACTION_REGISTRY)))
+    print("By resource:", dict(Counter(lock for spec in ACTION_REGISTRY for lock in spec.locks)))
+    print("Destructive:", sorted(spec.name for spec in ACTION_REGISTRY if spec.destructive))
+    missing = sorted(a for a in SUPPORTED_ACTIONS if a not in ACTION_REGISTRY)
+    print(f"SUPPORTED_ACTIONS without executor handler ({len(missing)}): {missing}")
+
+    # Qulf raqobati namoyishi: sekin filesystem action paytida audio/o'qish action'lari kutmaydi
+    from concurrent.futures import ThreadPoolExecutor
+    locks = ResourceLocks({NETWORK: 4})
+
+    def job(resources, seconds):
+        t0 = time.perf_counter()
+        with locks.hold(resources):
+            time.sleep(seconds)
+        return (time.perf_counter() - t0) * 1000
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        slow = pool.submit(job, (FILESYSTEM,), 0.5)
+        time.sleep(0.05)
+        others = {
+            "pure-read": pool.submit(job, (), 0.01),
+            "audio": pool.submit(job, (AUDIO,), 0.01),
+            "network": pool.submit(job, (NETWORK,), 0.01),
+            "filesystem": pool.submit(job, (FILESYSTEM,), 0.01),
+        }
+        for label, future in others.items():
+            print(f"{label:11} finished in {future.result():7.1f} ms")
+        print(f"slow filesystem job: {slow.result():.1f} ms")
+    print("Contention:", {r: s for r, s in locks.stats().items() if s["acquired"]})
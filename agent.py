@@ -3,10 +3,14 @@ JARVIS - System Level AI Assistant
 """
 
 import json
+import os
 import sys
 import threading
+import time
 from executor import WindowsExecutor
+from action_registry import ACTION_REGISTRY
 from parser import CommandParser
+from intent_classifier import ensure_model
 from llm_brain import GeminiBrain
 from utils import (
     setup_logger, validate_json_command, is_destructive_action,
@@ -27,6 +31,11 @@ except ImportError:
         BRIGHT = RESET_ALL = ""
 
 from memory import MemoryEngine
+from memory_retention import RetentionEngine
+from retrieval import build_retriever
+from config import STARTUP_SETTINGS
+from lazy_loader import TIMELINE, LazyRegistry, start_warm_up
+from stage_timings import StageTimer, StageHistograms
 from security import SecurityEngine
 from translator import LanguageProcessor
 from automation import AutomationEngine
@@ -48,22 +57,39 @@ class JARVIS:
             self.hybrid_mode = False
 
         # Core Modullar (Engines)
-        self.executor = WindowsExecutor()
-        self.parser = CommandParser()
-        
+        with TIMELINE.measure("executor"):
+            self.executor = WindowsExecutor()
+        with TIMELINE.measure("parser"):
+            self.parser = CommandParser()
+        # Og'ir modullar (vision, research, RAG ...) birinchi ishlatilganda quriladi
+        self.modules = LazyRegistry("JARVIS", lazy=STARTUP_SETTINGS.get("lazy_modules", True))
+        self._warm_up_thread = None
+        lazy = self.modules.add
+        # process_command bosqichlari bo'yicha rolling kechikish statistikasi
+        self.stage_histograms = StageHistograms(export_path=os.path.join("data", "stage_latency.json"))
+        
+        # Executor bilan bitta MemoryEngine (ikkinchi nusxa qurilmaydi)
+        self.memory = self.executor.memory if self.executor.memory else MemoryEngine()
+        # Tarixni yig'ish/siqish faqat foydalanuvchi faol bo'lmaganda (idle)
+        self.last_activity = time.monotonic()
+        self.retention = RetentionEngine(self.memory)
+        self.retention.start(idle_check=self._is_idle)
         if self.hybrid_mode:
             self.logger.info("☁️  JARVIS Core starting in HYBRID EXECUTION mode.")
             self.brain = None # Brain is on the Cloud
-            self.memory = MemoryEngine()
             self.security = SecurityEngine(memory=self.memory)
             self.translator = None 
             self.automation = None
         else:
-            self.brain = GeminiBrain()
-            self.memory = MemoryEngine()
+            with TIMELINE.measure("brain"):
+                self.brain = GeminiBrain()
             self.security = SecurityEngine(memory=self.memory)
-            self.translator = LanguageProcessor()
+            with TIMELINE.measure("translator"):
+                self.translator = LanguageProcessor()
             self.automation = AutomationEngine(core=self)
+        
+        # LLM orqali o'rganilgan yo'nalishlar (keyingi safar brain chaqirilmaydi)
+        self.parser.load_learned_routes(self.memory.get_learned_routes())
         self.voice = None # GUI yoki CLI tomonidan o'rnatiladi
         self.pending_command = None # Tasdiqlash kutilayotgan buyruq
         self.on_speak = None # CALLBACK (Phase 4 Refinement)
@@ -94,32 +120,26 @@ class JARVIS:
         #     self.logger.warning(f"Telegram Bot initialization failed: {e}")
             
         # 3. Mood Engine (Emotional AI)
-        from mood_engine import MoodEngine
-        self.mood = MoodEngine()
+        self.mood = lazy("mood", self._build_mood)
         
         if not self.hybrid_mode:
             # 4. Vision Engine (On-Demand)
-            from vision_engine import VisionEngine
-            self.vision = VisionEngine(brain_module=self.brain)
+            self.vision = lazy("vision", self._build_vision)
     
             # 5. Research Assistant
-            from research_assistant import ResearchAssistant
-            self.research = ResearchAssistant()
+            self.research = lazy("research", self._build_research)
     
             # 6. Neural Indexer (Second Brain / RAG)
-            from neural_indexer import NeuralIndexer
-            self.neural_indexer = NeuralIndexer(brain=self.brain)
+            self.neural_indexer = lazy("neural_indexer", self._build_neural_indexer)
             # Start background indexing
             # self.neural_indexer.index_hub()
             
             # 7. Proactive Vision (Elite v20.0)
-            from proactive_vision import ProactiveVision
-            self.proactive_vision = ProactiveVision(core=self, brain=self.brain)
+            self.proactive_vision = lazy("proactive_vision", self._build_proactive_vision)
             # self.proactive_vision.start()
             
             # 8. Self-Healing System (Healer)
-            from healer import CodeHealer
-            self.healer = CodeHealer(core=self)
+            self.healer = lazy("healer", self._build_healer)
         else:
             self.vision = None
             self.research = None
@@ -130,7 +150,13 @@ class JARVIS:
         
         # 9. Elite Personal AI (Custom)
         from elite_ai import EliteAI
-        self.elite_ai = EliteAI()
+        with TIMELINE.measure("elite_ai"):
+            self.elite_ai = EliteAI()
+        self.elite_ai.summarizer.start(idle_check=self._is_idle)
+        # LLM konteksti: SQL faktlar, MemoryCore va fayl indeksi bitta orkestrator orqali
+        self.elite_ai.retriever = build_retriever(memory=self.memory,
+                                                  vector_memory=getattr(self.executor, "vector_memory", None),
+                                                  file_index=self.neural_indexer)
         
         # Avtomatizatsiyani boshlash
         self.automation.start()
@@ -140,6 +166,54 @@ class JARVIS:
         # Start Remote Command Listener
         self._start_remote_listener()
 
+    # ==================== LAZY MODULES & WARM-UP ====================
+
+    def _build_mood(self):
+        from mood_engine import MoodEngine
+        return MoodEngine()
+
+    def _build_vision(self):
+        from vision_engine import VisionEngine
+        return VisionEngine(brain_module=self.brain)
+
+    def _build_research(self):
+        from research_assistant import ResearchAssistant
+        return ResearchAssistant()
+
+    def _build_neural_indexer(self):
+        from neural_indexer import NeuralIndexer
+        return NeuralIndexer(brain=self.brain)
+
+    def _build_proactive_vision(self):
+        from proactive_vision import ProactiveVision
+        return ProactiveVision(core=self, brain=self.brain)
+
+    def _build_healer(self):
+        from healer import CodeHealer
+        return CodeHealer(core=self)
+
+    def warm_up(self, delay=None):
+        """
+        Lazy modullarni fon oqimida oldindan yuklash (HUD ko'ringandan / CLI tayyor bo'lgandan keyin).
+        Tugagach startup timeline hisoboti logga va data/startup_timeline.json ga yoziladi.
+        """
+        if self._warm_up_thread or not STARTUP_SETTINGS.get("warm_up", True):
+            return self._warm_up_thread
+        names = STARTUP_SETTINGS.get("warm_up_modules")
+        if delay is None:
+            delay = STARTUP_SETTINGS.get("warm_up_delay", 0)
+
+        def report():
+            self.logger.info("Startup timeline:\n" + TIMELINE.report())
+            TIMELINE.save(STARTUP_SETTINGS.get("timeline_path", "data/startup_timeline.json"))
+
+        self._warm_up_thread = start_warm_up(
+            [lambda: self.executor.warm_up(names), lambda: self.modules.warm_up(names),
+             lambda: ensure_model(self.memory)],  # yangi o'rnatishda intent modeli fonda o'rgatiladi
+            delay=delay, on_done=report
+        )
+        return self._warm_up_thread
+
     def _start_healer_monitor(self):
         """Fondagi xatolarni avtomatik tuzatish moduli"""
         def monitor():
@@ -228,72 +302,8 @@ class JARVIS:
         return self.translator.detect_language(text)
     
     def _get_category(self, action):
-        """Action bo'yicha kategoriyani aniqlash"""
-        categories = {
-            "shutdown": "SYSTEM_CONTROL",
-            "restart": "SYSTEM_CONTROL",
-            "sleep": "SYSTEM_CONTROL",
-            "lock_screen": "SYSTEM_CONTROL",
-            "quit_jarvis": "SYSTEM_CONTROL",
-            
-            "open_app": "APPLICATION_CONTROL",
-            "close_app": "APPLICATION_CONTROL",
-            "focus_app": "APPLICATION_CONTROL",
-            "write_in_app": "APPLICATION_CONTROL",
-            
-            "open_website": "INTERNET_SEARCH",
-            "search_google": "INTERNET_SEARCH",
-            
-            "create_folder": "FILE_MANAGEMENT",
-            "delete_file": "FILE_MANAGEMENT",
-            "open_file": "FILE_MANAGEMENT",
-            "list_directory": "FILE_MANAGEMENT",
-            
-            "send_telegram_message": "COMMUNICATION",
-            
-            "get_time": "INFORMATIONAL_RESPONSE",
-            "get_date": "INFORMATIONAL_RESPONSE",
-            "get_weather": "INFORMATIONAL_RESPONSE",
-            "get_system_info": "DEVICE_STATUS",
-            
-            # Media & Browser (Yangi)
-            "youtube_search": "INTERNET_SEARCH",
-            "youtube_comment": "INTERNET_SEARCH",
-            "google_search_click": "INTERNET_SEARCH",
-            "start_camera": "DEVICE_CONTROL",
-            "stop_camera": "DEVICE_CONTROL",
-            "start_screen_recording": "DEVICE_CONTROL",
-            "stop_screen_recording": "DEVICE_CONTROL",
-            "start_gesture_control": "DEVICE_CONTROL",
-            "stop_gesture_control": "DEVICE_CONTROL",
-            "start_typer_bot": "AUTOMATION",
-            "stop_typer_bot": "AUTOMATION",
-            "create_project": "AUTOMATION",
-            "analyze_codebase": "AUTOMATION",
-            "run_terminal_v2": "AUTOMATION",
-            "reset_sentinel": "SYSTEM_CONTROL",
-            "register_face": "DEVICE_CONTROL",
-            "smart_search": "FILE_MANAGEMENT",
-            "system_healer": "AUTOMATION",
-            "get_financial_update": "INFORMATIONAL_RESPONSE",
-            "universal_search": "FILE_MANAGEMENT",
-            "workspace_orchestrator": "AUTOMATION",
-            "toggle_gaming_mode": "SYSTEM_CONTROL",
-            "perform_research": "INFORMATIONAL_RESPONSE",
-            "scan_bluetooth": "DEVICE_CONTROL",
-            "start_remote_bridge": "DEVICE_CONTROL",
-            "connect_device": "DEVICE_CONTROL",
-            "ai_conversation": "AI_BRAIN",
-            "get_news_digest": "INFORMATIONAL_RESPONSE",
-            "voice_clone_speak": "COMMUNICATION",
-            "get_security_report": "DEVICE_STATUS",
-            "desktop_automation": "AUTOMATION",
-            "smart_media_control": "DEVICE_CONTROL",
-            "advanced_schedule_manage": "AUTOMATION",
-            "connect_account": "AI_BRAIN",
-            "learn_from_feedback": "AI_BRAIN",
-        }
-        return categories.get(action, "lz_ACTION")
+        """Action bo'yicha kategoriyani aniqlash (action registry'dan)"""
+        return ACTION_REGISTRY.category(action)
  
     def _generate_verbal_response(self, action, params, status, result):
         """Elite AI response via LanguageProcessor"""
@@ -334,7 +344,25 @@ class JARVIS:
     def process_command(self, text):
         """
         Buyruqni qayta ishlash - ELITE CORE LOGIC
+        Javobga har bir bosqich vaqti (ms) "timings" kaliti ostida qo'shiladi.
         """
+        self.last_activity = time.monotonic()
+        timer = StageTimer()
+        response = self._process_command(text, timer)
+        if isinstance(response, dict):
+            timings = timer.finish()
+            response["timings"] = timings
+            self.stage_histograms.record(timings)
+        return response
+
+    def _is_idle(self):
+        return time.monotonic() - self.last_activity >= self.retention.settings["idle_seconds"]
+
+    def latency_stats(self, stage=None):
+        """Bosqichlar bo'yicha rolling percentil/histogramma (HUD va web gateway uchun)"""
+        return self.stage_histograms.snapshot(stage)
+
+    def _process_command(self, text, timer):
         try:
             with open("debug_commands.txt", "a", encoding="utf-8") as f:
                 f.write(f"RECEIVED: {text}\n")
@@ -350,20 +378,34 @@ class JARVIS:
             self.logger.info(f"Elite Processing: {text}")
         
         try:
+            timer.skip()
             # 0. Kontekstdan o'rganish
             self._learn_from_text(text)
+            timer.lap("learn")
             
             # 1. Til aniqlash va Xavfsizlik tekshiruvi
             lang = self._detect_language(text)
+            timer.lap("detect_language")
+            
+            # 1.5 Murakkab buyruq ("... va ..., keyin ...") -> reja
+            plan = self.parser.parse_plan(text)
+            if plan:
+                timer.lap("parse")
+                return self._process_plan(text, plan, lang, timer)
+            
             parsed = self.parser.parse(text)
             action = parsed.get("action", "unknown")
             params = parsed.get("parameters", {})
             params['original_text'] = text
+            self.executor.post_processor.record_route_hits(self.memory, self.parser.drain_route_hits())
+            timer.lap("parse")
             user_name = self.memory.get_user_name()
+            timer.lap("user_name")
             
 
             # 2. AI BRAIN ROUTING (agar action noma'lum bo'lsa)
             ai_verbal = None
+            llm_route = None  # Tekshiruv va muvaffaqiyatli bajarilgandan keyingina o'rganiladi
             vision_keywords = ["rasm", "ekran", "bu nima", "ko'r", "see", "screen", "picture", "what is this"]
             
             if action == "unknown":
@@ -383,24 +425,18 @@ class JARVIS:
                         if ai_verbal == "ERROR_QUOTA_EXCEEDED":
                             ai_verbal = "Janob, hozirda tahlil quvvatim yetmayapti. Bir ozdan keyin urinib ko'ring."
                         action = "ai_conversation"
+                        timer.lap("vision")
                     else:
                         # --- LONG-TERM MEMORY INTEGRATION ---
-                        # 1. Retrieve Facts
-                        facts = self.memory.search_facts(text)
-                        context_prompt = text
-                        if facts:
-                            fact_list = "\n".join([f"- {f[0]}" for f in facts])
-                            context_prompt = f"CONTEXT (User Facts):\n{fact_list}\n\nUSER QUERY:\n{text}"
-                            self.logger.info(f"Memory Augmented Prompt with {len(facts)} facts.")
-
-                        # 1.5. Retrieve Local Documents (RAG)
-                        local_context = self.neural_indexer.query(text)
-                        if local_context and "topilmadi" not in local_context:
-                             context_prompt = f"LOCAL DOCUMENTS (RAG):\n{local_context}\n\n" + context_prompt
-                             self.logger.info("RAG Context injected into Brain prompt.")
+                        # 1. Faktlar + vektor xotira + lokal fayllar (RAG): parallel, RRF, token byudjeti
+                        retrieved = self.elite_ai.retriever.context_block(text)
+                        if retrieved:
+                            self.logger.info(f"Retrieved context: {retrieved.count(chr(10)) + 1} items.")
+                        timer.lap("retrieval")
 
                         # 2. Generate Response (Elite AI Personalized)
-                        ai_verbal = self.elite_ai.process(text)
+                        ai_verbal, route = self.elite_ai.process_with_route(text, retrieved, with_route=True)
+                        timer.lap("llm")
                         
                         # 3. Extract New Facts (Background)
                         if len(text) > 10:
@@ -410,7 +446,13 @@ class JARVIS:
                                 daemon=True
                             ).start()
                         
-                        if ai_verbal:
+                        if route:
+                            # LLM aniq action tanladi: bajaramiz, muvaffaqiyatli bo'lsa keyingi safar uchun eslab qolamiz
+                            action = route["action"]
+                            params = dict(route["parameters"])
+                            params['original_text'] = text
+                            llm_route = route
+                        elif ai_verbal:
                             action = "ai_conversation"
             
             # 4. Execute qilish
@@ -443,6 +485,7 @@ class JARVIS:
                         else:
                             verbal = self.translator.get_action_response("security_denied", "success", lang, user_name=user_name)
                             return {"verbal_response": verbal, "action": "security_denied"}
+                timer.lap("security")
 
                 # --- AUTOMATION ROUTING ---
                 if action == "protocol":
@@ -473,9 +516,14 @@ class JARVIS:
                     # Normal Execution
                     result_data = self.executor.execute(command_dict)
                     result = result_data.get("result", result_data) if isinstance(result_data, dict) else result_data
+                    succeeded = result_data.get("success", True) if isinstance(result_data, dict) else True
+                    if llm_route and succeeded and action == llm_route["action"]:
+                        self._learn_route(text, action, llm_route["parameters"])
+                timer.lap("execute")
                 
                 category = self._get_category(action)
                 verbal = self._generate_verbal_response(action, params, "success", result)
+                timer.lap("verbal_response")
             elif action == "ai_conversation":
                 result = "AI Conversation"
                 category = "AI_BRAIN"
@@ -486,13 +534,16 @@ class JARVIS:
                 verbal = self.translator.get_action_response("unknown", "success", lang, user_name=user_name)
             
             # 5. Xotiraga saqlash
-            self.memory.add_to_history(text, verbal)
+            self.executor.post_processor.record_history(self.memory, text, verbal)
+            timer.lap("history")
             
             # 6. Ovozli javob berish (SPEAK the verbal response)
             self.speak(verbal)
+            timer.lap("speak")
             
             # Emotional Analysis (Phase 2)
             emotion, emotion_color = self.mood.analyze_text_emotion(text)
+            timer.lap("mood")
             
             # Response assembly
             response = {
@@ -522,6 +573,78 @@ class JARVIS:
         
         return response
 
+    def _process_plan(self, text, stages, lang, timer=None):
+        """Murakkab buyruq rejasini bajarish: bosqichlar ketma-ket, bosqich ichidagi qadamlar parallel"""
+        timer = timer or StageTimer()
+        user_name = self.memory.get_user_name()
+        self.logger.info(f"Compound plan: {[[step['action'] for step in stage] for stage in stages]}")
+        
+        verbal_parts = []
+        steps_report = []
+        for stage in stages:
+            slots = [None] * len(stage)
+            runnable = []
+            for i, step in enumerate(stage):
+                action, params = step["action"], step["parameters"]
+                is_safe, msg, severity = self.security.validate_command(action, params)
+                if is_safe:
+                    runnable.append(i)
+                    if action == "open_app" and "app_name" in params:
+                        self.memory.log_app_usage(params["app_name"])
+                elif severity == "MEDIUM" and not self.pending_command:
+                    # Xavfli qadam rejadan chiqariladi va alohida tasdiq kutadi
+                    self.pending_command = {"action": action, "parameters": params}
+                    slots[i] = self.translator.get_action_response("request_confirmation", "success", lang, user_name=user_name)
+                    steps_report.append({"action": action, "status": "request_confirmation"})
+                else:
+                    slots[i] = self.translator.get_action_response("security_denied", "success", lang, user_name=user_name)
+                    steps_report.append({"action": action, "status": "security_denied"})
+            
+            timer.lap("security")
+            results = self._run_stage([stage[i] for i in runnable])
+            timer.lap("execute")
+            for i, result_data in zip(runnable, results):
+                step = stage[i]
+                ok = result_data.get("success", True) if isinstance(result_data, dict) else True
+                result = result_data.get("result", result_data) if isinstance(result_data, dict) else result_data
+                slots[i] = self._generate_verbal_response(step["action"], step["parameters"], "success" if ok else "failure", result)
+                steps_report.append({"action": step["action"], "parameters": step["parameters"], "status": "success" if ok else "error", "result": result})
+            
+            verbal_parts.extend(v for v in slots if v)
+        
+        verbal = " ".join(verbal_parts)
+        timer.lap("verbal_response")
+        self.executor.post_processor.record_history(self.memory, text, verbal)
+        timer.lap("history")
+        self.speak(verbal)
+        timer.lap("speak")
+        emotion, emotion_color = self.mood.analyze_text_emotion(text)
+        timer.lap("mood")
+        
+        return {
+            "status": "success",
+            "action": "compound",
+            "category": "AUTOMATION",
+            "parameters": {"original_text": text},
+            "result": steps_report,
+            "verbal_response": verbal,
+            "lang": lang,
+            "emotion": emotion,
+            "emotion_color": emotion_color
+        }
+
+    def _run_stage(self, steps):
+        """Bir bosqichdagi mustaqil qadamlarni parallel bajarish (natijalar tartibi saqlanadi)"""
+        if not steps:
+            return []
+        commands = [{"action": step["action"], "parameters": step["parameters"]} for step in steps]
+        if len(commands) == 1:
+            return [self.executor.execute(commands[0])]
+        
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(len(commands), 4), thread_name_prefix="JARVIS-Plan") as pool:
+            return list(pool.map(self.executor.execute, commands))
+
     def _learn_from_text(self, text):
         """Matndan foydalanuvchi haqida ma'lumot olish"""
         text_lower = text.lower()
@@ -548,6 +671,13 @@ class JARVIS:
                         self.logger.info(f"Yangi loyiha aniqlandi: {proj_name}")
 
 
+    def _learn_route(self, text, action, params):
+        """LLM yo'nalishini parser va bazaga saqlash"""
+        key = self.parser.learn_route(text, action, params)
+        if key:
+            self.memory.save_learned_route(key, action, params)
+            self.logger.info(f"Learned route saved: '{key}' -> {action}")
+
     def execute_automation(self, action, params):
         """Avtomatizatsiya (background) tomonidan chaqiriladigan metod"""
         self.logger.info(f"Background executing: {action}")
@@ -579,6 +709,7 @@ class JARVIS:
         print(f"\n{Fore.YELLOW}Chiqish uchun:{Style.RESET_ALL} {Fore.RED}'exit', 'quit', 'chiq'{Style.RESET_ALL}")
         print(f"{Fore.YELLOW}Yordam uchun:{Style.RESET_ALL} {Fore.CYAN}'help', 'yordam'{Style.RESET_ALL}")
         print("=" * 60 + "\n")
+        self.warm_up()
         
         while True:
             try:
@@ -761,6 +892,7 @@ class VoiceJARVIS(JARVIS):
             self.interactive_mode()
             return
         
+        self.warm_up()
         self.speak("Salom! Men JARVIS. Sizga qanday yordam bera olaman?")
         
         print("\nBuyruq berish: ovoz bilan gapiring")
@@ -0,0 +1,366 @@
+"""
+JARVIS - IVF Approximate Nearest-Neighbour Index (NumPy)
+VectorStore katta bo'lganda to'liq skan o'rniga: k-means (sferik) markazlari bo'yicha vektorlar
+ro'yxatlarga (inverted lists) bo'linadi, qidiruvda so'rovga eng yaqin nprobe ta ro'yxat skanerlanadi.
+nlist store bilan birga o'sgani uchun (2 * sqrt(n)) nprobe ham nlist'ning ulushi sifatida olinadi:
+qat'iy nprobe'da katta store'larda recall pasayadi.
+Vektorlarning ro'yxatlar tartibidagi nusxasi saqlanadi: har ro'yxat bitta uzluksiz blok, probe =
+bitta slice + matmul (memmap'dan tarqoq o'qish yo'q). Joylashtirishdan keyin qo'shilgan qatorlar
+("dum") aniq skanerlanadi. Dum relayout_ratio dan oshsa ro'yxatlar qayta joylashtiriladi, store
+o'qitilgandan retrain_growth marta kattalashsa markazlar qayta o'qitiladi. Ikkalasi ham fon oqimida,
+store'ning snapshot'idan quriladi va tayyor bo'lgach almashtiriladi. Qurilish paytida qidiruv eski
+indeks (birinchi marta esa aniq skan) bilan ishlaydi, yozuvlar kutmaydi.
+Fayllar vektorlar yonida:
+    ivf.json            - joriy avlod (generation), o'qitilgan va joylashtirilgan qatorlar soni
+    ivf.<gen>/centroids.npy - (nlist, dim) float32 markazlar
+    ivf.<gen>/vectors.f32   - joylashtirilgan qatorlar, ro'yxatlar tartibida
+    ivf.<gen>/assign.i32    - har qator uchun ro'yxat raqami (append-only, int32)
+"""
+import json
+import os
+import shutil
+import threading
+from collections import namedtuple
+import numpy as np
+
+try:
+    from config import VECTOR_INDEX_SETTINGS
+except ImportError:
+    VECTOR_INDEX_SETTINGS = {}
+
+DEFAULTS = {
+    "enabled": True,
+    "min_rows": 20000,       # Bundan kichik store'da aniq (exact) qidiruv
+    "nprobe": None,          # Qat'iy son; None: nprobe_ratio * nlist (kamida min_nprobe)
+    "nprobe_ratio": 0.1,     # 1M x 128 sintetik to'plamda recall@10 ~0.9
+    "min_nprobe": 16,
+    "lists_per_sqrt": 2,     # nlist = lists_per_sqrt * sqrt(n)
+    "train_sample": 64,      # k-means uchun har markazga shuncha namuna
+    "train_iters": 10,
+    "retrain_growth": 4,     # Store o'qitilgandagidan shuncha marta o'ssa qayta o'qitish
+    "relayout_ratio": 0.1,   # Dum joylashtirilgan qatorlarning shuncha ulushidan oshsa qayta joylashtirish
+}
+
+INFO_FILE = "ivf.json"
+CENTROIDS_FILE = "centroids.npy"
+VECTORS_FILE = "vectors.f32"
+ASSIGN_FILE = "assign.i32"
+_CHUNK = 16384
+
+# Qidiruv uchun o'zgarmas holat: fon qurilishi yangisini yaratib, bitta havola bilan almashtiradi
+Layout = namedtuple("Layout", "generation centroids offsets ids vectors laid_rows trained_rows")
+
+
+def nearest_centroids(rows, centroids):
+    """Har qator uchun eng yaqin (eng katta skalyar ko'paytma) markaz, bo'laklab"""
+    out = np.empty(rows.shape[0], dtype=np.int32)
+    for start in range(0, rows.shape[0], _CHUNK):
+        block = np.asarray(rows[start:start + _CHUNK], dtype=np.float32)
+        out[start:start + block.shape[0]] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+
+def spherical_kmeans(sample, k, iters=10, seed=0):
+    """Normallashtirilgan vektorlar uchun k-means (cosine); bo'sh klasterlar tasodifiy nuqtadan qayta boshlanadi"""
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(sample.shape[0], k, replace=False)].copy()
+    for _ in range(iters):
+        assign = nearest_centroids(sample, centroids)
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=k)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        nonempty = counts > 0
+        sums = np.add.reduceat(sample[order], starts[nonempty], axis=0)
+        centroids[nonempty] = sums
+        empty = np.flatnonzero(~nonempty)
+        if empty.size:
+            centroids[empty] = sample[rng.choice(sample.shape[0], empty.size, replace=False)]
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids /= norms
+    return centroids.astype(np.float32)
+
+
+class IVFIndex:
+    def __init__(self, directory, settings=None):
+        self.directory = directory
+        self.settings = {**DEFAULTS, **VECTOR_INDEX_SETTINGS, **(settings or {})}
+        self.info_path = os.path.join(directory, INFO_FILE)
+        self.layout = None
+        self.rows = 0           # joriy avlodda ro'yxat raqami yozilgan qatorlar soni
+        self._matrix = None     # store'ning oxirgi memmap'i (fon qurilishi qayta o'ynash uchun)
+        self._builder = None
+        self._lock = threading.Lock()
+
+    @property
+    def trained(self):
+        return self.layout is not None
+
+    @property
+    def centroids(self):
+        return self.layout.centroids if self.layout else None
+
+    @property
+    def building(self):
+        return self._builder is not None and self._builder.is_alive()
+
+    def usable(self, n):
+        return self.settings["enabled"] and self.trained and n >= self.settings["min_rows"]
+
+    def default_nprobe(self, layout=None):
+        """Sozlamadagi qat'iy nprobe yoki nlist ulushi"""
+        nlist = (layout or self.layout).centroids.shape[0]
+        nprobe = self.settings["nprobe"] or max(self.settings["min_nprobe"],
+                                                int(np.ceil(self.settings["nprobe_ratio"] * nlist)))
+        return min(nprobe, nlist)
+
+    def wait(self, timeout=None):
+        """Fon qurilishi tugashini kutish (benchmark, test va yopish uchun)"""
+        builder = self._builder
+        while builder is not None and builder.is_alive():
+            builder.join(timeout)
+            if timeout is not None or builder is self._builder:
+                break
+            builder = self._builder
+
+    # --- LOAD ---
+
+    def _gen_dir(self, generation):
+        return os.path.join(self.directory, f"ivf.{generation}")
+
+    def _open_layout(self, info, assign, dim):
+        gen_dir = self._gen_dir(info["generation"])
+        centroids = np.load(os.path.join(gen_dir, CENTROIDS_FILE))
+        laid = info["laid_rows"]
+        vectors_path = os.path.join(gen_dir, VECTORS_FILE)
+        if assign.shape[0] < laid or os.path.getsize(vectors_path) != laid * dim * 4:
+            raise ValueError("IVF fayllari to'liq emas")
+        ids = np.argsort(assign[:laid], kind="stable").astype(np.int32)
+        counts = np.bincount(assign[:laid], minlength=centroids.shape[0])
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        vectors = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(laid, dim)) if laid else \
+            np.zeros((0, dim), dtype=np.float32)
+        return Layout(info["generation"], centroids, offsets, ids, vectors, laid, info["trained_rows"])
+
+    def _remove_stale(self, keep):
+        for name in os.listdir(self.directory):
+            if name.startswith("ivf.") and name != INFO_FILE and name != f"ivf.{keep}":
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def sync(self, matrix):
+        """Yuklashda: saqlangan avlodni ochish, uzilishdan keyin yetishmagan qatorlarni qo'shish"""
+        if matrix is None or not os.path.exists(self.info_path):
+            return
+        self._matrix = matrix
+        n, dim = matrix.shape
+        try:
+            with open(self.info_path, "r", encoding="utf-8") as f:
+                info = json.load(f)
+            assign_path = os.path.join(self._gen_dir(info["generation"]), ASSIGN_FILE)
+            assign = np.fromfile(assign_path, dtype=np.int32)
+            if assign.shape[0] > n:
+                assign = assign[:n]
+                with open(assign_path, "r+b") as f:
+                    f.truncate(n * 4)
+            self.layout = self._open_layout(info, assign, dim)
+        except (OSError, KeyError, ValueError):
+            self.layout = None  # eskirgan yoki buzilgan indeks: keyingi qo'shishda fonda qayta quriladi
+            return
+        self._remove_stale(self.layout.generation)
+        self.rows = int(assign.shape[0])
+        if self.rows < n:
+            self._append_assign(matrix[self.rows:])
+
+    # --- BUILD ---
+
+    def _append_assign(self, rows):
+        assign = nearest_centroids(rows, self.layout.centroids)
+        with open(os.path.join(self._gen_dir(self.layout.generation), ASSIGN_FILE), "ab") as f:
+            f.write(assign.tobytes())
+        self.rows += rows.shape[0]
+
+    def on_append(self, matrix, start, rows):
+        """
+        VectorStore.add_many dan keyin (store qulfi ostida): yangi qatorlarga faqat eng yaqin markaz
+        topiladi (O(rows * nlist * dim)); o'qitish va qayta joylashtirish kerak bo'lsa fonda boshlanadi.
+        """
+        n = matrix.shape[0]
+        if not self.settings["enabled"]:
+            return
+        with self._lock:
+            self._matrix = matrix
+            if self.layout is not None:
+                if start != self.rows:
+                    raise ValueError(f"IVF indeks {self.rows} qatorda, qo'shish {start} dan")
+                self._append_assign(rows)
+            if not self.building:
+                self._schedule(matrix)
+
+    def _schedule(self, matrix):
+        """(qulf ostida) kerak bo'lsa fon qurilishini boshlash"""
+        n = matrix.shape[0]
+        layout = self.layout
+        if n < self.settings["min_rows"]:
+            return
+        if layout is None or n >= layout.trained_rows * self.settings["retrain_growth"]:
+            retrain = True
+        elif n - layout.laid_rows > self.settings["relayout_ratio"] * layout.laid_rows:
+            retrain = False
+        else:
+            return
+        self._builder = threading.Thread(target=self._build, args=(matrix, retrain),
+                                         name="ivf-build", daemon=True)
+        self._builder.start()
+
+    def train(self, matrix):
+        """Markazlarni sinxron o'qitish (fon oqimisiz; migratsiya va benchmark uchun)"""
+        with self._lock:
+            self._matrix = matrix
+        self._build(matrix, retrain=True, synchronous=True)
+
+    def _build(self, matrix, retrain, synchronous=False):
+        """
+        Fon oqimi: snapshot (birinchi n qator, fayl append-only) bo'yicha markazlar va ro'yxat raqamlari,
+        ro'yxatlar tartibidagi vektorlar nusxasi; keyin qulf ostida almashtirish. Qurilish paytida
+        qo'shilgan qatorlar yangi markazlarga qayta taqsimlanadi (dumda qoladi, aniq skanerlanadi).
+        """
+        n, dim = matrix.shape
+        old = self.layout
+        if retrain or old is None:
+            nlist = max(16, int(self.settings["lists_per_sqrt"] * np.sqrt(n)))
+            rng = np.random.default_rng(n)
+            sample_size = min(n, nlist * self.settings["train_sample"])
+            sample = np.asarray(matrix[np.sort(rng.choice(n, sample_size, replace=False))], dtype=np.float32)
+            centroids = spherical_kmeans(sample, min(nlist, sample_size), self.settings["train_iters"], seed=n)
+            assign = nearest_centroids(matrix, centroids)
+            trained_rows = n
+        else:
+            centroids, trained_rows = old.centroids, old.trained_rows
+            assign = np.fromfile(os.path.join(self._gen_dir(old.generation), ASSIGN_FILE),
+                                 dtype=np.int32, count=n)
+
+        generation = old.generation + 1 if old else 1
+        gen_dir = self._gen_dir(generation)
+        shutil.rmtree(gen_dir, ignore_errors=True)
+        os.makedirs(gen_dir)
+        np.save(os.path.join(gen_dir, CENTROIDS_FILE), centroids)
+        order = np.argsort(assign, kind="stable").astype(np.int32)
+        with open(os.path.join(gen_dir, VECTORS_FILE), "wb") as f:
+            for start in range(0, n, _CHUNK):
+                f.write(np.ascontiguousarray(matrix[order[start:start + _CHUNK]], dtype=np.float32).tobytes())
+        assign_path = os.path.join(gen_dir, ASSIGN_FILE)
+        with open(assign_path, "wb") as f:
+            f.write(assign.tobytes())
+
+        # Qurilish paytida qo'shilganlarni qulfsiz qayta taqsimlash; qulf faqat oxirgi tekshiruv va almashtirish uchun
+        covered = n
+        while True:
+            with self._lock:
+                latest = self._matrix
+                if latest.shape[0] == covered:
+                    info = {"generation": generation, "trained_rows": trained_rows, "laid_rows": n}
+                    with open(self.info_path + ".tmp", "w", encoding="utf-8") as f:
+                        json.dump(info, f)
+                    os.replace(self.info_path + ".tmp", self.info_path)
+                    counts = np.bincount(assign, minlength=centroids.shape[0])
+                    offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+                    vectors = np.memmap(os.path.join(gen_dir, VECTORS_FILE), dtype=np.float32, mode="r",
+                                        shape=(n, dim))
+                    self.layout = Layout(generation, centroids, offsets, order, vectors, n, trained_rows)
+                    self.rows = covered
+                    break
+            extra = nearest_centroids(latest[covered:], centroids)
+            with open(assign_path, "ab") as f:
+                f.write(extra.tobytes())
+            covered = latest.shape[0]
+        self._remove_stale(generation)
+        if not synchronous:
+            with self._lock:
+                self._schedule(self._matrix)  # qurilish paytida dum yana o'sgan bo'lishi mumkin
+
+    # --- SEARCH ---
+
+    def search(self, matrix, query, top_k, nprobe=None):
+        """
+        (o'xshashliklar, qator indekslari) kamayish tartibida: nprobe ro'yxat bloki + dum (aniq).
+        Qulfsiz: qurilish tugasa ham bu so'rov o'zi olgan layout bilan yakunlanadi.
+        """
+        layout = self.layout
+        nlist = layout.centroids.shape[0]
+        nprobe = min(nprobe, nlist) if nprobe else self.default_nprobe(layout)
+        probe = np.sort(np.argpartition(-(layout.centroids @ query), nprobe - 1)[:nprobe])
+        starts, ends = layout.offsets[probe], layout.offsets[probe + 1]
+        # Qo'shni ro'yxatlar bitta blok
+        breaks = np.flatnonzero(starts[1:] != ends[:-1]) + 1
+        block_starts = starts[np.concatenate(([0], breaks))]
+        block_ends = ends[np.concatenate((breaks - 1, [probe.size - 1]))]
+        scores = [layout.vectors[a:b] @ query for a, b in zip(block_starts, block_ends) if b > a]
+        ids = [layout.ids[a:b] for a, b in zip(block_starts, block_ends) if b > a]
+        if matrix.shape[0] > layout.laid_rows:
+            scores.append(np.asarray(matrix[layout.laid_rows:]) @ query)
+            ids.append(np.arange(layout.laid_rows, matrix.shape[0], dtype=np.int32))
+        if not scores:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int32)
+        scores, ids = np.concatenate(scores), np.concatenate(ids)
+        k = min(top_k, ids.size)
+        best = np.argpartition(-scores, k - 1)[:k] if k < ids.size else np.arange(ids.size)
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return scores[best], ids[best]
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    import time
+    from vector_store import VectorStore
+
+    # Argumentlar: n:dim juftliklari. 1M uchun dim 128 (768 da 3 GB bo'ladi)
+    configs = [tuple(int(x) for x in a.split(":")) for a in sys.argv[1:]] or [(100_000, 768), (1_000_000, 128)]
+    for n, dim in configs:
+        rng = np.random.default_rng(42)
+        # Sintetik "embedding"lar: ~200 tadan mavzu markazi atrofida to'plangan vektorlar (haqiqiy matnlar kabi)
+        topics = rng.standard_normal((max(100, n // 200), dim)).astype(np.float32)
+        store = VectorStore(tempfile.mkdtemp())
+        t0 = time.perf_counter()
+        slowest_add = during_build = 0.0
+        for start in range(0, n, 50_000):
+            size = min(50_000, n - start)
+            rows = topics[rng.integers(0, len(topics), size)] + 1.2 * rng.standard_normal((size, dim)).astype(np.float32)
+            t1 = time.perf_counter()
+            store.add_many(rows, ({"i": i} for i in range(start, start + size)))
+            slowest_add = max(slowest_add, time.perf_counter() - t1)
+            if store.index.building:
+                # O'qitish fonda: qidiruv qulf kutmaydi (eski indeks yoki aniq skan)
+                t1 = time.perf_counter()
+                store.search(rows[0], top_k=10)
+                during_build = max(during_build, time.perf_counter() - t1)
+        store.index.wait()
+        build_s = time.perf_counter() - t0
+        nlist = store.index.centroids.shape[0]
+        print(f"n={n:>9,} dim={dim}: slowest add_many(50k) {slowest_add * 1000:.0f} ms, "
+              f"slowest search during a background build {during_build * 1000:.0f} ms")
+
+        matrix = store.matrix()
+        picks = rng.choice(n, 100, replace=False)
+        queries = np.asarray(matrix[picks]) + 0.05 * rng.standard_normal((100, dim)).astype(np.float32)
+
+        def run(**kwargs):
+            t0 = time.perf_counter()
+            out = [[i for _, i in store.search(q, top_k=10, **kwargs)] for q in queries]
+            return out, (time.perf_counter() - t0) * 1000 / len(queries)
+
+        exact, exact_ms = run(exact=True)
+        print(f"n={n:>9,} dim={dim}: build {build_s:6.1f} s (incl. k-means, nlist={nlist}) | exact {exact_ms:6.2f} ms/query")
+        for nprobe in (16, 64, 256, None):
+            approx, ann_ms = run(nprobe=nprobe)
+            recall = np.mean([len(set(a) & set(e)) / 10 for a, e in zip(approx, exact)])
+            label = f"{nprobe:>3}" if nprobe else f"{store.index.default_nprobe():>3} (default)"
+            print(f"    nprobe={label}: recall@10 {recall:.3f} | {ann_ms:6.2f} ms/query ({exact_ms / ann_ms:5.1f}x)")
+        assert recall >= 0.9, f"default nprobe recall {recall:.3f}"
+
+        # Qayta ochish: saqlangan markazlar va ro'yxatlar yuklanadi (qayta o'qitilmaydi)
+        t0 = time.perf_counter()
+        reopened = VectorStore(store.directory)
+        print(f"    reopen with persisted index: {(time.perf_counter() - t0) * 1000:.0f} ms, "
+              f"same top-10: {[i for _, i in reopened.search(queries[0], 10)] == approx[0]}")
+        del store, reopened, matrix
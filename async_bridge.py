@@ -0,0 +1,164 @@
+"""
+JARVIS - Async Bridge for Blocking Subsystems
+python-telegram-bot handler'lari bitta event loop'da ishlaydi: MemoryEngine (SQLite), GeminiBrain /
+EliteAI (HTTP), pyautogui, psutil kabi bloklovchi chaqiruvlar to'g'ridan-to'g'ri chaqirilsa barcha
+chatlar kutib qoladi. AsyncProxy har bir metodni cheklangan (bounded) ishchi pool'ga yuboradi:
+
+    memory = AsyncProxy(MemoryEngine())
+    facts = await memory.search_facts(text)
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from config import ASYNC_SETTINGS
+except ImportError:
+    ASYNC_SETTINGS = {}
+
+
+class BlockingPool:
+    """Bloklovchi chaqiruvlar uchun cheklangan thread pool (+ navbat/yuklama statistikasi)"""
+
+    def __init__(self, max_workers=8, name="blocking"):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "completed": 0, "errors": 0, "in_flight": 0, "max_in_flight": 0}
+
+    def _call(self, fn, args, kwargs):
+        with self._lock:
+            self._stats["in_flight"] += 1
+            self._stats["max_in_flight"] = max(self._stats["max_in_flight"], self._stats["in_flight"])
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._stats["in_flight"] -= 1
+                self._stats["completed"] += 1
+
+    async def run(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs) ni pool'da bajarib natijasini kutish (event loop bloklanmaydi)"""
+        with self._lock:
+            self._stats["submitted"] += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, fn, args, kwargs)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queued"] = stats["submitted"] - stats["completed"] - stats["in_flight"]
+        return stats
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+_DEFAULT_POOL = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def get_blocking_pool():
+    """Jarayon bo'yicha umumiy pool (hajmi config.ASYNC_SETTINGS["workers"])"""
+    global _DEFAULT_POOL
+    with _DEFAULT_LOCK:
+        if _DEFAULT_POOL is None:
+            _DEFAULT_POOL = BlockingPool(ASYNC_SETTINGS.get("workers", 8))
+        return _DEFAULT_POOL
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Bir martalik bloklovchi chaqiruv (pyautogui.screenshot, psutil, subprocess ...)"""
+    return await get_blocking_pool().run(fn, *args, **kwargs)
+
+
+class AsyncProxy:
+    """
+    Obyekt metodlarini awaitable qiladi: `await proxy.method(...)`. Oddiy atributlar (masalan
+    memory.db_path) o'zgarishsiz qaytadi. Asl obyekt `proxy.target` orqali.
+    """
+
+    def __init__(self, target, pool=None):
+        self.target = target
+        self.pool = pool or get_blocking_pool()
+
+    def __getattr__(self, name):
+        attr = getattr(self.target, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await self.pool.run(attr, *args, **kwargs)
+
+        # Keyingi murojaatlarda qayta o'ralmasin
+        self.__dict__[name] = call
+        return call
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import tempfile
+    import time
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from memory import MemoryEngine
+
+    class _FakeBrain:
+        """Tarmoq kechikishini taqlid qiluvchi LLM (HTTP ~150 ms)"""
+        def __init__(self, memory):
+            self.memory = memory
+
+        def process(self, text):
+            facts = self.memory.search_facts(text)
+            time.sleep(0.15)
+            return f"{text} -> {len(facts or [])} fakt"
+
+    chats = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    memory = MemoryEngine(db_path=os.path.join(tempfile.mkdtemp(), "async.db"))
+    for i in range(200):
+        memory.add_fact(f"Foydalanuvchi {i}-loyihada python ishlatadi", "projects")
+    brain = _FakeBrain(memory)
+
+    async def heartbeat(stop, lags):
+        """Event loop javob berish qobiliyati: 10 ms tick'ning kechikishi"""
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append((time.perf_counter() - t0 - 0.01) * 1000)
+
+    async def serve(handler):
+        stop, lags = asyncio.Event(), []
+        beat = asyncio.create_task(heartbeat(stop, lags))
+        t0 = time.perf_counter()
+        replies = await asyncio.gather(*(handler(f"chat {i}: python loyiha") for i in range(chats)))
+        elapsed = time.perf_counter() - t0
+        stop.set()
+        await beat
+        return replies, elapsed, max(lags or [0])
+
+    async def blocking_handler(text):
+        return brain.process(text)  # eski usul: loop ichida bloklaydi
+
+    pool = BlockingPool(max_workers=16)
+    async_brain = AsyncProxy(brain, pool)
+
+    async def async_handler(text):
+        return await async_brain.process(text)
+
+    async def main():
+        replies, elapsed, lag = await serve(blocking_handler)
+        print(f"{chats} chats, blocking handlers : {elapsed:6.2f} s total, worst loop stall {lag:7.1f} ms")
+        replies, elapsed, lag = await serve(async_handler)
+        print(f"{chats} chats, AsyncProxy (16)    : {elapsed:6.2f} s total, worst loop stall {lag:7.1f} ms")
+        assert len(replies) == chats and all("fakt" in r for r in replies)
+        print(f"pool stats: {pool.stats()}")
+
+    asyncio.run(main())
+    pool.shutdown()
+    memory.close()
@@ -0,0 +1,356 @@
+"""
+JARVIS - BM25 Inverted Index
+NeuralIndexer uchun: token -> {hujjat: tf} postinglari, BM25 bo'yicha tartiblangan qidiruv.
+Tokenlash MemoryEngine FTS5 va parser bilan bir xil: normalize_text + apostrof variantlari "'" ga
+(fold_apostrophes), so'z = harf/raqamlar ketma-ketligi, ichidagi apostrof bilan ("o'zbek", "g'oya").
+Fayl nomi tokenlari name_boost marta og'irroq hisoblanadi.
+Indeks SQLite'da (NeuralIndexer uchun data/neural_chunks.db, bo'laklar bilan bitta baza):
+    bm25_docs     - hujjat kaliti, uzunligi va noyob tokenlari (o'chirishda df uchun)
+    bm25_postings - (term, segment) -> hujjat id'lari va tf massivlari (array blob)
+    bm25_terms    - term -> df, segmentlar soni
+add()/remove() faqat xotiradagi buferga yozadi; save() oxirgi save'dan beri o'zgargan hujjatlar va
+termlarni yozadi (har term uchun bitta yangi segment), butun korpus qayta yozilmaydi. Term segmentlari
+MAX_SEGMENTS dan oshsa birlashtiriladi va o'chirilgan hujjatlar postinglari tashlanadi. Hujjat id'lari
+qayta ishlatilmaydi (AUTOINCREMENT), shuning uchun eski postinglar xotiradagi id xaritasi bilan
+filtrlanadi. Ochishda faqat hujjat uzunliklari va df o'qiladi.
+"""
+import heapq
+import math
+import threading
+from array import array
+from collections import OrderedDict
+from db_pool import get_pool
+from memory import FTS_TOKEN_RE, fold_apostrophes
+
+K1 = 1.2
+B = 0.75
+NAME_BOOST = 3
+# Hujjatlarning shuncha qismida uchraydigan token "umumiy": boshqa token bo'lsa nomzodlarni u tanlamaydi
+COMMON_RATIO = 0.1
+SNIPPET_CHARS = 200
+# Bitta term uchun shuncha segmentdan keyin birlashtirish
+MAX_SEGMENTS = 8
+# Xotirada saqlanadigan umumiy token postinglari soni (LRU)
+HOT_TERMS = 32
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS bm25_docs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        doc_key TEXT UNIQUE NOT NULL,
+        len INTEGER NOT NULL,
+        terms TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS bm25_postings (
+        term TEXT NOT NULL,
+        seg INTEGER NOT NULL,
+        docs BLOB NOT NULL,
+        tfs BLOB NOT NULL,
+        PRIMARY KEY (term, seg)
+    ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS bm25_terms (
+        term TEXT PRIMARY KEY,
+        df INTEGER NOT NULL,
+        segs INTEGER NOT NULL
+    ) WITHOUT ROWID""",
+)
+
+
+def tokenize(text):
+    return FTS_TOKEN_RE.findall(fold_apostrophes(text or ""))
+
+
+def make_snippet(text, query_terms, width=SNIPPET_CHARS):
+    """Birinchi mos kelgan so'rov tokeni atrofidagi width belgili parcha"""
+    if not text:
+        return ""
+    folded = fold_apostrophes(text)  # uzunlik o'zgarmaydi: faqat registr va apostroflar
+    positions = [pos for pos in (folded.find(term) for term in query_terms) if pos >= 0]
+    if len(folded) != len(text) or not positions:
+        return text[:width]
+    start = max(0, min(positions) - width // 4)
+    return ("…" if start else "") + text[start:start + width]
+
+
+class BM25Index:
+    def __init__(self, path, k1=K1, b=B, name_boost=NAME_BOOST):
+        self.path = path
+        self.pool = get_pool(path)
+        self.k1, self.b, self.name_boost = k1, b, name_boost
+        self.docs = {}   # doc_id -> qator id
+        self.rows = {}   # qator id -> (doc_id, uzunlik); faqat tirik hujjatlar
+        self.df = {}     # term -> hujjatlar soni
+        self.segs = {}   # term -> diskdagi segmentlar soni
+        self.total_len = 0
+        self._next_id = 1
+        self._new = {}              # save() gacha: qator id -> noyob tokenlar
+        self._gone = set()          # save() gacha o'chirilgan (diskdagi) qator id'lari
+        self._pending = {}          # save() gacha: term -> {qator id: tf}
+        self._touched = set()       # save() gacha df'i o'zgargan termlar
+        self._hot = OrderedDict()   # umumiy term -> {qator id: tf} (diskdagi segmentlar)
+        self._lock = threading.RLock()
+        conn = self.pool.connection()
+        with conn:
+            for sql in SCHEMA:
+                conn.execute(sql)
+        self.load()
+
+    def __len__(self):
+        return len(self.docs)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.docs
+
+    def term_count(self):
+        return len(self.df)
+
+    # --- UPDATE ---
+
+    def remove(self, doc_id):
+        with self._lock:
+            row_id = self.docs.pop(doc_id, None)
+            if row_id is None:
+                return False
+            self.total_len -= self.rows.pop(row_id)[1]
+            terms = self._new.pop(row_id, None)
+            if terms is None:
+                row = self.pool.connection().execute("SELECT terms FROM bm25_docs WHERE id = ?", (row_id,)).fetchone()
+                terms = row[0].split() if row else ()
+                self._gone.add(row_id)
+            for term in terms:
+                self._touched.add(term)
+                df = self.df.get(term, 0) - 1
+                if df > 0:
+                    self.df[term] = df
+                else:
+                    self.df.pop(term, None)
+                posting = self._pending.get(term)
+                if posting is not None:
+                    posting.pop(row_id, None)
+            return True
+
+    def add(self, doc_id, name, content):
+        """Hujjatni (qayta) indekslash: nom tokenlari name_boost marta, keyin kontent tokenlari"""
+        terms = {}
+        name_tokens = tokenize(name)
+        content_tokens = tokenize(content)
+        for token in name_tokens:
+            terms[token] = terms.get(token, 0) + self.name_boost
+        for token in content_tokens:
+            terms[token] = terms.get(token, 0) + 1
+        length = len(name_tokens) * self.name_boost + len(content_tokens)
+        with self._lock:
+            self.remove(doc_id)
+            row_id = self._next_id
+            self._next_id += 1
+            pending, df = self._pending, self.df
+            for term, tf in terms.items():
+                posting = pending.get(term)
+                if posting is None:
+                    posting = pending[term] = {}
+                posting[row_id] = tf
+                df[term] = df.get(term, 0) + 1
+            self._touched.update(terms)
+            self._new[row_id] = list(terms)
+            self.docs[doc_id] = row_id
+            self.rows[row_id] = (doc_id, length)
+            self.total_len += length
+
+    # --- SEARCH ---
+
+    def _read_segments(self, conn, term):
+        """Diskdagi segmentlar: {qator id: tf} (o'chirilgan hujjatlar ham bo'lishi mumkin)"""
+        posting = {}
+        for docs, tfs in conn.execute("SELECT docs, tfs FROM bm25_postings WHERE term = ?", (term,)):
+            ids, counts = array("q"), array("i")
+            ids.frombytes(docs)
+            counts.frombytes(tfs)
+            posting.update(zip(ids, counts))
+        return posting
+
+    def _stored(self, conn, term, common):
+        if not self.segs.get(term):
+            return {}
+        if not common:
+            return self._read_segments(conn, term)
+        posting = self._hot.get(term)
+        if posting is None:
+            posting = self._hot[term] = self._read_segments(conn, term)
+            while len(self._hot) > HOT_TERMS:
+                self._hot.popitem(last=False)
+        else:
+            self._hot.move_to_end(term)
+        return posting
+
+    def search(self, query, limit=5):
+        """
+        [(ball, doc_id), ...] BM25 bo'yicha kamayish tartibida. So'rovda kamyob token bo'lsa nomzodlar
+        faqat kamyob tokenlar postinglaridan olinadi, umumiy tokenlar ularga ball qo'shadi xolos.
+        """
+        terms = set(tokenize(query))
+        conn = self.pool.connection()
+        with self._lock:
+            n = len(self.docs)
+            if not n or not terms:
+                return []
+            avgdl = self.total_len / n or 1.0
+            k1, b = self.k1, self.b
+            rows = self.rows
+            weighted = []
+            for term in terms:
+                df = self.df.get(term)
+                if df:
+                    idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                    weighted.append((df > COMMON_RATIO * n, idf, term))
+            if not weighted:
+                return []
+            weighted.sort(key=lambda item: item[0])
+            selective = not weighted[0][0]
+
+            scores = {}
+            for common, idf, term in weighted:
+                postings = (self._stored(conn, term, common), self._pending.get(term) or {})
+                if common and selective:
+                    pairs = [(doc, posting[doc]) for posting in postings for doc in scores if doc in posting]
+                else:
+                    pairs = [pair for posting in postings for pair in posting.items()]
+                for doc, tf in pairs:
+                    row = rows.get(doc)
+                    if row is None:
+                        continue  # o'chirilgan yoki qayta indekslangan hujjat
+                    norm = k1 * (1 - b + b * row[1] / avgdl)
+                    scores[doc] = scores.get(doc, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+            top = heapq.nlargest(limit, scores.items(), key=lambda kv: kv[1])
+            return [(score, rows[doc][0]) for doc, score in top]
+
+    # --- PERSISTENCE ---
+
+    def load(self):
+        """Hujjat uzunliklari va df'ni o'qish (postinglar diskda qoladi); saqlanmagan o'zgarishlar tashlanadi"""
+        conn = self.pool.connection()
+        with self._lock:
+            self.docs, self.rows, self.total_len = {}, {}, 0
+            self.df, self.segs = {}, {}
+            for term, df, segs in conn.execute("SELECT term, df, segs FROM bm25_terms"):
+                self.df[term] = df
+                self.segs[term] = segs
+            for row_id, doc_id, length in conn.execute("SELECT id, doc_key, len FROM bm25_docs"):
+                self.docs[doc_id] = row_id
+                self.rows[row_id] = (doc_id, length)
+                self.total_len += length
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'bm25_docs'").fetchone()
+            self._next_id = (row[0] if row else 0) + 1
+            self._new, self._gone, self._pending = {}, set(), {}
+            self._touched.clear()
+            self._hot.clear()
+        return bool(self.docs)
+
+    def _write_segment(self, conn, term, posting):
+        """Yangi postinglarni segment sifatida yozish; segmentlar ko'payib ketsa birlashtirish"""
+        segs = self.segs.get(term, 0)
+        if segs + 1 > MAX_SEGMENTS:
+            posting = {**self._read_segments(conn, term), **posting}
+            conn.execute("DELETE FROM bm25_postings WHERE term = ?", (term,))
+            segs = 0
+        live = sorted(doc for doc in posting if doc in self.rows)
+        if not live:
+            return segs
+        conn.execute("INSERT INTO bm25_postings (term, seg, docs, tfs) VALUES (?, ?, ?, ?)",
+                     (term, live[-1], array("q", live).tobytes(), array("i", [posting[doc] for doc in live]).tobytes()))
+        return segs + 1
+
+    def save(self):
+        """Oxirgi save()'dan beri o'zgargan hujjatlar va termlarni yozish va commit qilish"""
+        conn = self.pool.connection()
+        with self._lock:
+            if not (self._new or self._gone or self._touched):
+                return
+            with conn:
+                conn.executemany("DELETE FROM bm25_docs WHERE id = ?", [(row_id,) for row_id in self._gone])
+                conn.executemany("INSERT INTO bm25_docs (id, doc_key, len, terms) VALUES (?, ?, ?, ?)",
+                                 [(row_id, *self.rows[row_id], " ".join(terms)) for row_id, terms in self._new.items()])
+                updates, dropped = [], []
+                for term in self._touched:
+                    df = self.df.get(term, 0)
+                    if df <= 0:
+                        dropped.append((term,))
+                        self.segs.pop(term, None)
+                        continue
+                    posting = self._pending.get(term)
+                    if posting:
+                        self.segs[term] = self._write_segment(conn, term, posting)
+                    updates.append((term, df, self.segs.get(term, 0)))
+                    self._hot.pop(term, None)
+                conn.executemany("DELETE FROM bm25_postings WHERE term = ?", dropped)
+                conn.executemany("DELETE FROM bm25_terms WHERE term = ?", dropped)
+                conn.executemany("INSERT OR REPLACE INTO bm25_terms (term, df, segs) VALUES (?, ?, ?)", updates)
+            for term, in dropped:
+                self._hot.pop(term, None)
+            self._new, self._gone, self._pending = {}, set(), {}
+            self._touched.clear()
+
+
+if __name__ == "__main__":
+    import os
+    import random
+    import tempfile
+    import time
+
+    words = ("hisobot reja loyiha python jarvis o'zbek tarmoq xotira server moliya byudjet uchrashuv "
+             "report budget meeting network memory deploy database sqlite index search vector").split()
+    rng = random.Random(0)
+    # Zipf taqsimotli lug'at: bir nechta juda umumiy so'z va ko'p kamyob so'zlar (haqiqiy matnlar kabi)
+    vocab = ["va", "the", "bu", "uchun", "and"] + words + [f"atama{i}" for i in range(20000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+    n = 5000
+    corpus = {}
+    for i in range(n):
+        body = " ".join(rng.choices(vocab, weights, k=rng.randint(60, 160)))
+        corpus[f"C:/JARVIS_HUB/docs/{rng.choice(words)}_{i}.md"] = f"Eslatma {i}. {body}"
+    corpus["C:/JARVIS_HUB/docs/O‘zbekiston_hisobot.md"] = "O`zbekiston bo'yicha yillik hisobot va byudjet rejasi."
+
+    path = os.path.join(tempfile.mkdtemp(), "neural_chunks.db")
+    index = BM25Index(path)
+    t0 = time.perf_counter()
+    for doc_id, content in corpus.items():
+        index.add(doc_id, os.path.basename(doc_id), content)
+    index.save()
+    print(f"indexed {len(index)} docs, {index.term_count()} terms in {time.perf_counter() - t0:.2f} s")
+
+    queries = ["o'zbekiston hisobot", "O’ZBEKISTON byudjet", "python sqlite index", "deploy server"]
+    for q in queries:
+        top = index.search(q, 3)
+        print(f"{q!r:28} -> {[(round(s, 2), os.path.basename(d)) for s, d in top]}")
+
+    # Eski usul: har hujjat previewida har kalit so'zni substring bo'yicha tekshirish, tartiblanmagan
+    previews = {d: c[:500].lower() for d, c in corpus.items()}
+    t0 = time.perf_counter()
+    for _ in range(20):
+        for q in queries:
+            kws = q.lower().split()
+            [d for d, p in previews.items() if sum(1 for kw in kws if kw in p or kw in d.lower()) > 0]
+    legacy_ms = (time.perf_counter() - t0) * 1000 / (20 * len(queries))
+    rare = ["o'zbekiston hisobot", "atama1234 va reja", "sqlite atama77"]
+    t0 = time.perf_counter()
+    for _ in range(200):
+        for q in rare:
+            index.search(q, 5)
+    rare_ms = (time.perf_counter() - t0) * 1000 / (200 * len(rare))
+    t0 = time.perf_counter()
+    for _ in range(20):
+        for q in queries:
+            index.search(q, 5)
+    common_ms = (time.perf_counter() - t0) * 1000 / (20 * len(queries))
+    print(f"query: legacy scan {legacy_ms:.2f} ms | BM25 with a selective term {rare_ms:.3f} ms | "
+          f"BM25 only common terms {common_ms:.2f} ms")
+
+    # Inkremental: bitta faylni o'zgartirish / o'chirish
+    t0 = time.perf_counter()
+    index.add("C:/JARVIS_HUB/docs/O‘zbekiston_hisobot.md", "O‘zbekiston_hisobot.md", "Yangilangan: faqat moliya")
+    index.remove(next(iter(corpus)))
+    index.save()
+    print(f"update + delete + save: {(time.perf_counter() - t0) * 1000:.3f} ms; "
+          f"'o'zbekiston hisobot' -> {os.path.basename(index.search('hisobot o`zbekiston', 1)[0][1])}")
+    t0 = time.perf_counter()
+    reloaded = BM25Index(path)
+    print(f"reload {len(reloaded)} docs: {(time.perf_counter() - t0) * 1000:.0f} ms")
+    print(make_snippet(corpus["C:/JARVIS_HUB/docs/O‘zbekiston_hisobot.md"], tokenize("byudjet")))
@@ -61,6 +61,9 @@ FALLBACK_MODEL_NAME = "llama-3.3-70b-versatile"
 DEEPSEEK_MODEL_NAME = "deepseek-chat"
 MISTRAL_MODEL_NAME = "mistral-small-latest"
 HUGGINGFACE_MODEL_NAME = "mistralai/Mistral-7B-Instruct-v0.2"
+# Lokal fayllar markazi (NeuralIndexer, SmartSorter, SyncManager); Linux/macOS da ~/JARVIS_HUB
+JARVIS_HUB_PATH = os.getenv("JARVIS_HUB_PATH") or (
+    "C:/JARVIS_HUB" if os.name == "nt" else os.path.join(os.path.expanduser("~"), "JARVIS_HUB"))
 # Response Settings
 RESPONSE_SETTINGS = {
     "max_length": 300, # Increased for brain power
@@ -72,6 +75,124 @@ RESPONSE_SETTINGS = {
 # Adaptive Persona Temperament
 CURRENT_TEMPERAMENT = "PROFESSIONAL" # Options: PROFESSIONAL, ENTHUSIASTIC, CALM
 
+# Parser sozlamalari
+PARSER_SETTINGS = {
+    "cache_size": 256,        # Normallashtirilgan matn -> natija (LRU)
+    "spell_correction": True, # SymSpell orqali tokenlarni tuzatish
+    "spell_max_distance": 2,  # Maksimal tahrir masofasi
+    "classifier_margin": 0.25,      # Lokal klassifikator: n-gram boshiga log-ehtimol farqining minimumi
+    # Klassifikator zaxirasi tanlashi mumkin bo'lgan action'lar (faqat o'qish; qolganlari LLM'ga)
+    "classifier_actions": [
+        "get_time", "get_date", "get_weather", "get_news_digest", "get_schedule",
+        "get_system_info", "get_balance", "get_financial_update", "get_security_report",
+    ],
+    "classifier_min_coverage": 0.5, # Tanish n-gramlarning minimal ulushi
+}
+
+# Executor sozlamalari
+EXECUTOR_SETTINGS = {
+    # Resurs -> bir vaqtda bajarilishi mumkin bo'lgan action'lar soni (ko'rsatilmasa 1)
+    "resource_limits": {"network": 4},
+}
+
+# IntentEngine o'tish modeli (kun vaqti bo'yicha, so'nuvchi og'irliklar)
+INTENT_SETTINGS = {
+    "half_life_hours": 72,   # Eski odatlar shu vaqtda ikki baravar kuchsizlanadi
+    "top_k": 3,
+    "confidence": 0.4,
+    "min_support": 2.0,
+    "max_gap_minutes": 30,
+}
+
+# MemoryCore embeddinglari (memory_core.py, embeddings.py)
+EMBEDDING_SETTINGS = {
+    "backend": "auto",        # auto: Gemini + lokal nusxa (oflayn zaxira, keyin backfill) | gemini: faqat Gemini | local
+    "model": "models/embedding-001",
+    "threshold": 0.6,
+    "local_dim": 512,         # Lokal hashed n-gram vektor o'lchami
+    "local_threshold": 0.35,
+    "cache_size": 20000,      # data/embedding_cache.db dagi maksimal yozuvlar (LRU)
+    "batch_size": 100,        # add_memories partiyasi (Gemini batch chegarasi 100)
+    "remote_cooldown": 60,    # Gemini xato bersa (tarmoq yo'q) shuncha sekund to'g'ridan-to'g'ri lokal
+}
+
+# Katta vektor xotiralar uchun IVF indeks (ann_index.py); kichik store'da aniq qidiruv
+VECTOR_INDEX_SETTINGS = {
+    "enabled": True,
+    "min_rows": 20000,       # Shundan boshlab IVF (undan kichikda to'liq skan yetarlicha tez)
+    "nprobe_ratio": 0.1,     # Skanerlanadigan ro'yxatlar ulushi (nlist bilan o'sadi); ko'proq = aniqroq, sekinroq
+    "retrain_growth": 4,     # Store 4 baravar o'sganda markazlar qayta o'qitiladi
+}
+
+# LLM konteksti uchun gibrid qidiruv (retrieval.py)
+RETRIEVAL_SETTINGS = {
+    "per_source": 5,
+    "rrf_k": 60,
+    "max_tokens": 500,       # Kontekst bloki byudjeti (~4 belgi = 1 token)
+    "deadline_ms": {"facts": 150, "vector": 400, "files": 250},  # Kechikkan manba tashlanadi
+}
+
+# Hub fayllarini bo'laklab indekslash (neural_indexer.py, doc_chunker.py)
+NEURAL_INDEX_SETTINGS = {
+    "hub_path": JARVIS_HUB_PATH,
+    "extensions": [".txt", ".md", ".py", ".js", ".json", ".pdf", ".docx"],
+    "chunk_chars": 1200,      # Bo'lak uzunligi (belgi)
+    "overlap": 200,           # Qo'shni bo'laklar umumiy qismi
+    "workers": 0,             # Matn ajratish jarayonlari; 0 = CPU soni - 1
+    "pool_min_files": 8,      # Bundan kam o'zgargan fayl bo'lsa pool ochilmaydi
+    "max_file_mb": 50,
+    "checkpoint_every": 200,  # Shuncha fayldan keyin indekslar diskka yoziladi
+}
+
+# Bashorat qilingan keyingi action uchun oldindan tayyorgarlik (prefetcher.py)
+PREFETCH_SETTINGS = {
+    "enabled": True,
+    "min_confidence": 0.6,   # Faqat shundan yuqori ishonchli bashoratlar
+    "max_cpu_percent": 70,   # CPU band bo'lsa prefetch qilinmaydi
+    "max_fetches": 6,        # Tarmoq byudjeti: fetch_window sekundda ko'pi bilan shuncha so'rov
+    "fetch_window": 300,
+    "ttl": 120,              # Oldindan olingan yangiliklar/narxlar shuncha sekund yaroqli
+}
+
+# Ishga tushish sozlamalari (lazy modullar va fon warm-up)
+STARTUP_SETTINGS = {
+    "lazy_modules": True,    # False: barcha modullar __init__ da quriladi (eski xatti-harakat)
+    "warm_up": True,         # HUD/CLI tayyor bo'lgach fon oqimida oldindan yuklash
+    "warm_up_delay": 1.5,    # Oyna ko'rinishidan keyin kutish (sekund)
+    # Fon xizmatlari va eng ko'p ishlatiladiganlar; qolganlari birinchi ishlatilganda quriladi
+    "warm_up_modules": [
+        "memory", "intent_engine", "gamification", "avatar", "security_scanner",
+        "cloud_bridge", "camera", "vision", "research", "neural_indexer", "mood",
+    ],
+    "timeline_path": os.path.join("data", "startup_timeline.json"),
+}
+
+# Rolling suhbat xulosalari (rolling_summary.RollingSummarizer) - promptlarga qo'shiladigan kontekst
+SUMMARY_SETTINGS = {
+    "max_chars": 600,       # Kunlik / sessiya xulosasining maksimal uzunligi
+    "min_new_turns": 3,     # Kamida shuncha yangi suhbat yig'ilganda qayta xulosalanadi
+    "max_turns_per_fold": 40,
+    "interval": 300,        # Idle tekshiruv oralig'i (sekund)
+}
+
+# Async handler'lar (telegram_bot, vps_agent) uchun bloklovchi chaqiruvlar pool'i (async_bridge)
+ASYNC_SETTINGS = {
+    "workers": 8,  # Bir vaqtda bajariladigan SQLite/HTTP/pyautogui chaqiruvlari
+}
+
+# Xotira bazasi saqlash siyosati (memory_retention.RetentionEngine)
+MEMORY_RETENTION = {
+    "enabled": True,
+    "commands_raw_days": 30,       # commands_history: shundan eskisi kunlik action yig'indisiga o'tadi
+    "conversations_raw_days": 14,  # conversation_history: eskisi kunlik xulosaga (semantic_memory) o'tadi
+    "max_db_mb": 200,              # Baza hajmi chegarasi; oshsa xom saqlash muddati qisqartiriladi
+    "min_raw_days": 2,             # Chegara uchun qisqartirishning pastki chegarasi
+    "route_idle_days": 90,         # Shuncha kun ishlatilmagan o'rganilgan LLM yo'nalishlari o'chiriladi
+    "vacuum_pages": 500,           # Bitta idle siklda bo'shatiladigan sahifalar (incremental_vacuum)
+    "idle_seconds": 120,           # Oxirgi buyruqdan keyin shuncha vaqt o'tsa "idle"
+    "check_interval": 600,         # Idle tekshiruv oralig'i (sekund)
+}
+
 # Qo'llab-quvvatlanadigan action'lar
 SUPPORTED_ACTIONS = [
     # System Control
@@ -238,7 +359,10 @@ SUPPORTED_ACTIONS = [
     # Adaptive Intelligence (Elite v13.0)
     "vision_click",
     "nuclear_protocol",
-    "toggle_privacy_shield"
+    "toggle_privacy_shield",
+    
+    # Local Intent Classifier
+    "retrain_intent_model"
 ]
 
 
@@ -392,7 +516,10 @@ UZ_PATTERNS = {
     "resolve_conflict": ["yarashish kerak", "muammoni hal qil", "ziddiyatni yech", "bilan yarash", "bilan kelish"],
     "analyze_chat": ["chatni tahlil", "nima deb yozdi", "nima dedi", "unread messages"],
     "analyze_instagram": ["instagramda nima gap", "instagram tahlil", "lentada nima bor"],
-    "post_instagram": ["instagramga qo'y", "instagramga post", "video yukla", "post qo'y"]
+    "post_instagram": ["instagramga qo'y", "instagramga post", "video yukla", "post qo'y"],
+    
+    # Local Intent Classifier
+    "retrain_intent_model": ["modelni qayta o'rgat", "intent modelni yangila", "klassifikatorni o'rgat"]
 }
 
 
@@ -446,7 +573,8 @@ EN_PATTERNS = {
     "get_security_report": ["security report", "system status", "check security"],
     "desktop_automation": ["process excel", "extract pdf", "convert images"],
     "smart_media_control": ["seek media", "download subtitles", "media control"],
-    "advanced_schedule_manage": ["add reminder", "add routine", "schedule manage"]
+    "advanced_schedule_manage": ["add reminder", "add routine", "schedule manage"],
+    "retrain_intent_model": ["retrain intent model", "retrain classifier"]
 }
 
 # Rus til pattern'lar (Yangi)
@@ -0,0 +1,56 @@
+"""
+JARVIS - SQLite Schema Migrations
+schema_version jadvali bazaning qaysi migratsiyagacha yetganini saqlaydi. Har bir migratsiya
+(version, tavsif, [SQL ...]) ko'rinishida, o'z tranzaksiyasida va faqat bir marta bajariladi:
+xato bo'lsa o'sha migratsiya to'liq bekor qilinadi va keyingilari ishga tushmaydi.
+"""
+import sqlite3
+from datetime import datetime
+
+
+def current_version(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at DATETIME
+        )
+    """)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def run_migrations(conn, migrations, logger=None):
+    """
+    migrations: [(version, description, [sql, ...]), ...] (version o'suvchi tartibda).
+    SQL o'rniga callable(conn) ham berish mumkin. Qaytaradi: yakuniy versiya.
+    """
+    version = current_version(conn)
+    conn.commit()
+    for target, description, steps in sorted(migrations, key=lambda m: m[0]):
+        if target <= version:
+            continue
+        try:
+            with conn:
+                for step in steps:
+                    if callable(step):
+                        step(conn)
+                    else:
+                        conn.execute(step)
+                conn.execute(
+                    "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                    (target, description, datetime.now())
+                )
+        except sqlite3.Error as e:
+            if logger:
+                logger.error(f"Migration {target} ({description}) failed: {e}")
+            break
+        version = target
+        if logger:
+            logger.info(f"Schema migrated to v{target}: {description}")
+    return version
+
+
+def query_plan(conn, sql, params=()):
+    """EXPLAIN QUERY PLAN natijasi (detail satrlari)"""
+    return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
@@ -0,0 +1,95 @@
+"""
+JARVIS - Pooled SQLite Connections
+Har bir oqim uchun bitta doimiy (persistent) ulanish: WAL jurnali, busy timeout va
+sqlite3 statement cache (bir xil SQL qayta tayyorlanmaydi). HUD agent, telegram_bot va
+cloud bridge bir bazani baham ko'rgani uchun WAL o'quvchilarni yozuvchidan ajratadi.
+"""
+import os
+import sqlite3
+import threading
+import weakref
+
+BUSY_TIMEOUT_MS = 5000
+STATEMENT_CACHE_SIZE = 256
+
+
+class ConnectionPool:
+    """db_path uchun oqim-bo'yicha ulanishlar (thread-local)"""
+
+    def __init__(self, db_path, busy_timeout_ms=BUSY_TIMEOUT_MS, cached_statements=STATEMENT_CACHE_SIZE):
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []  # (weakref(thread), conn)
+        self.opened = 0
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+        return conn
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,  # faqat close_all() boshqa oqimdan yopadi
+        )
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        # Faqat yangi (bo'sh) bazada ta'sir qiladi, shuning uchun journal_mode'dan oldin
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        if self.db_path != ":memory:":
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        # INSERT OR REPLACE ham DELETE trigger'larini ishga tushirsin (FTS sinxronizatsiyasi)
+        conn.execute("PRAGMA recursive_triggers=ON")
+
+        with self._lock:
+            self.opened += 1
+            # Tugagan oqimlarning ulanishlarini yopish
+            alive = []
+            for thread_ref, old in self._connections:
+                thread = thread_ref()
+                if thread is None or not thread.is_alive():
+                    try:
+                        old.close()
+                    except sqlite3.Error:
+                        pass
+                else:
+                    alive.append((thread_ref, old))
+            alive.append((weakref.ref(threading.current_thread()), conn))
+            self._connections = alive
+        return conn
+
+    def close_all(self):
+        with self._lock:
+            for _, conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections = []
+        self._local = threading.local()
+
+    def stats(self):
+        with self._lock:
+            return {"db_path": self.db_path, "open": len(self._connections), "opened_total": self.opened}
+
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(db_path):
+    """Bir fayl uchun jarayonda bitta pool (MemoryEngine nusxalari ulanishlarni baham ko'radi)"""
+    key = db_path if db_path == ":memory:" else os.path.abspath(db_path)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = _POOLS[key] = ConnectionPool(db_path)
+        return pool
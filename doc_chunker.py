@@ -0,0 +1,136 @@
+"""
+JARVIS - Document Text Extraction and Chunking
+NeuralIndexer ishchi jarayonlari uchun: fayldan matn ajratish (txt/md/py/js/json, docx, pdf) va uni
+bir-birini qoplaydigan bo'laklarga (passage) bo'lish. Modul yengil (faqat standart kutubxona +
+ixtiyoriy PyPDF2), chunki har ishchi jarayon uni qayta import qiladi.
+"""
+import hashlib
+import html
+import io
+import os
+import re
+import zipfile
+
+try:
+    import PyPDF2
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+DOCX_PARAGRAPH_RE = re.compile(r"</w:p>|<w:br/>|<w:tab/>")
+XML_TAG_RE = re.compile(r"<[^>]+>")
+BLANK_LINES_RE = re.compile(r"\n\s*\n\s*\n+")
+
+
+def content_hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _docx_text(data):
+    """word/document.xml dan paragraflar matni (python-docx shart emas)"""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        xml = archive.read("word/document.xml").decode("utf-8", errors="ignore")
+    xml = DOCX_PARAGRAPH_RE.sub("\n", xml)
+    return html.unescape(XML_TAG_RE.sub("", xml))
+
+
+def _pdf_text(path):
+    if not PYPDF2_AVAILABLE:
+        raise RuntimeError("PDF uchun PyPDF2 o'rnatilmagan")
+    with open(path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def extract_text(path, data=None):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".pdf":
+        return _pdf_text(path)
+    if data is None:
+        with open(path, "rb") as f:
+            data = f.read()
+    if ext == ".docx":
+        return _docx_text(data)
+    return data.decode("utf-8", errors="ignore")
+
+
+def chunk_text(text, chunk_chars=1200, overlap=200):
+    """
+    chunk_chars uzunlikdagi bo'laklar, qo'shnilari overlap belgi umumiy. Chegara iloji bo'lsa
+    bo'shliqqa suriladi (so'z o'rtasidan kesilmaydi).
+    """
+    text = BLANK_LINES_RE.sub("\n\n", text.replace("\r\n", "\n")).strip()
+    if len(text) <= chunk_chars:
+        return [text] if text else []
+    overlap = min(overlap, chunk_chars // 2)
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = start + chunk_chars
+        if end < len(text):
+            cut = text.rfind(" ", start + chunk_chars // 2, end)
+            cut = max(cut, text.rfind("\n", start + chunk_chars // 2, end))
+            if cut > 0:
+                end = cut
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        next_start = end - overlap
+        space = text.find(" ", next_start, end)
+        start = space + 1 if space >= 0 else next_start
+    return chunks
+
+
+def process_file(path, known_hash=None, chunk_chars=1200, overlap=200, max_bytes=None):
+    """
+    Ishchi jarayon vazifasi (pickle qilinadigan natija):
+        {"path", "status": ok|unchanged|empty|skipped|error, "hash", "size", "chunks", "error"}
+    Kontent hash'i known_hash bilan bir xil bo'lsa matn ajratilmaydi.
+    """
+    result = {"path": path, "status": "ok", "hash": None, "size": 0, "chunks": [], "error": None}
+    try:
+        size = os.path.getsize(path)
+        result["size"] = size
+        if max_bytes and size > max_bytes:
+            result["status"] = "skipped"
+            return result
+        with open(path, "rb") as f:
+            data = f.read()
+        result["hash"] = content_hash(data)
+        if known_hash and result["hash"] == known_hash:
+            result["status"] = "unchanged"
+            return result
+        result["chunks"] = chunk_text(extract_text(path, data), chunk_chars, overlap)
+        if not result["chunks"]:
+            result["status"] = "empty"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    text = " ".join(f"gap{i}" for i in range(700))
+    chunks = chunk_text(text, 1200, 200)
+    print(f"{len(text)} chars -> {len(chunks)} chunks, lengths {[len(c) for c in chunks]}")
+    for a, b in zip(chunks, chunks[1:]):
+        shared = a.split()[-5:]
+        assert shared[-1] in b.split()[:60], "qo'shni bo'laklar qoplanmagan"
+    assert all(w in " ".join(chunks).split() for w in text.split())
+
+    tmp = tempfile.mkdtemp()
+    docx_path = os.path.join(tmp, "hisobot.docx")
+    with zipfile.ZipFile(docx_path, "w") as archive:
+        archive.writestr("word/document.xml", '<w:document><w:body><w:p><w:r><w:t>Yillik hisobot</w:t></w:r></w:p>'
+                         '<w:p><w:r><w:t>Byudjet &amp; reja</w:t></w:r></w:p></w:body></w:document>')
+    first = process_file(docx_path)
+    print(f"docx -> {first['chunks']!r}")
+    print(f"rerun with known hash -> {process_file(docx_path, known_hash=first['hash'])['status']}")
+    pdf_path = os.path.join(tmp, "scan.pdf")
+    with open(pdf_path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+    print(f"pdf (PyPDF2 {'available' if PYPDF2_AVAILABLE else 'missing'}) -> {process_file(pdf_path)['status']}")
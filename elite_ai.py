@@ -2,48 +2,108 @@
 JARVIS - Elite AI Engine (Personalized)
 Sardor uchun maxsus yaratilgan shaxsiy AI yordamchi.
 """
+import json
 import config
 from llm_brain import GeminiBrain
 from memory import MemoryEngine
+from rolling_summary import RollingSummarizer
+from retrieval import build_retriever
 from utils import setup_logger
 
+# LLM javobidagi action yo'nalishi qatori
+ROUTE_PREFIX = "ROUTE:"
+
 class EliteAI:
     def __init__(self):
         self.logger = setup_logger("EliteAI")
         self.brain = GeminiBrain()
         self.memory = MemoryEngine()
+        # Uzoq muddatli kontekst: xom tarix o'rniga o'lchami cheklangan rolling xulosa
+        self.summarizer = RollingSummarizer(self.memory, self.brain)
+        # Faktlar / vektor xotira / fayllar bitta parallel so'rovda (agent to'liq manbalar bilan almashtiradi)
+        self.retriever = build_retriever(memory=self.memory)
         self.identity = "Elite Personal Intelligence (E.P.I)"
         self.version = "1.0.0"
+        self._routing_hint = None
         
-    def get_personalized_prompt(self, user_query):
-        """Foydalanuvchi ma'lumotlari asosida promptni shaxsiylashtirish"""
+    def get_personalized_prompt(self, user_query, retrieved=None):
+        """Foydalanuvchi ma'lumotlari asosida promptni shaxsiylashtirish (retrieved: tayyor kontekst bloki)"""
         user_name = self.memory.get_user_name()
-        facts = self.memory.search_facts(user_query)
+        if retrieved is None:
+            retrieved = self.retriever.context_block(user_query)
         
         context = f"Siz Sardorbekning shaxsiy AI yordamchisisiz (E.P.I). "
         context += f"Foydalanuvchi ismi: {user_name}. "
         
-        if facts:
+        if retrieved:
             context += "\nSiz u haqida quyidagilarni bilasiz:\n"
-            for f in facts:
-                context += f"- {f[0]}\n"
+            context += f"{retrieved}\n"
+        
+        summary = self.summarizer.context_block()
+        if summary:
+            context += f"\n{summary}\n"
         
         full_prompt = f"{context}\n\nFOYDALANUVCHI BUYRUG'I: {user_query}\n\nJavobni professional, lekin yaqin yordamchi sifatida o'zbek tilida bering."
         return full_prompt
 
+    def get_routing_hint(self):
+        """
+        LLM javobini kompyuter amaliga bog'lash uchun ko'rsatma (~500 token, faqat yo'nalishdan
+        foydalanadigan chaqiruvlarga qo'shiladi)
+        """
+        if self._routing_hint is None:
+            actions = ", ".join(sorted(set(config.SUPPORTED_ACTIONS)))
+            self._routing_hint = (
+                "\n\nAgar buyruq quyidagi amallardan biriga aniq mos kelsa, javobning oxirgi qatoriga faqat "
+                f'{ROUTE_PREFIX} {{"action": "...", "parameters": {{...}}}} yozing. Amallar: {actions}'
+            )
+        return self._routing_hint
+
+    def extract_route(self, response):
+        """Javobdan ROUTE qatorini ajratish: (toza_javob, {action, parameters} yoki None)"""
+        if not response or ROUTE_PREFIX not in response:
+            return response, None
+
+        head, _, tail = response.rpartition(ROUTE_PREFIX)
+        try:
+            route = json.loads(tail.strip().splitlines()[0])
+        except (ValueError, IndexError):
+            return head.strip() or response, None
+
+        action = route.get("action") if isinstance(route, dict) else None
+        if action not in config.SUPPORTED_ACTIONS:
+            return head.strip() or response, None
+
+        params = route.get("parameters") if isinstance(route.get("parameters"), dict) else {}
+        return head.strip(), {"action": action, "parameters": params}
+
     def process(self, text):
-        """Buyruqni qayta ishlash"""
+        """Buyruqni qayta ishlash (suhbat: yo'nalish ko'rsatmasisiz)"""
+        response, _ = self.process_with_route(text, with_route=False)
+        return response
+
+    def process_with_route(self, text, retrieved=None, with_route=False):
+        """
+        Buyruqni qayta ishlash. with_route=True: promptga amallar ro'yxati qo'shiladi va LLM aniq
+        action tanlasa u ham qaytariladi (aks holda route har doim None)
+        """
         self.logger.info(f"Elite AI processing: {text}")
         
         # Maxsus 'Elite' buyruqlar
         if "o'zing haqingda" in text.lower() or "kimligingni" in text.lower():
-            return f"Men {self.identity}, {user_name} uchun maxsus yaratilgan intellektual yordamchiman. Versiyam: {self.version}."
+            user_name = self.memory.get_user_name()
+            return f"Men {self.identity}, {user_name} uchun maxsus yaratilgan intellektual yordamchiman. Versiyam: {self.version}.", None
             
         # Shaxsiylashtirilgan LLM javobi
-        prompt = self.get_personalized_prompt(text)
+        prompt = self.get_personalized_prompt(text, retrieved)
+        if with_route:
+            prompt += self.get_routing_hint()
         response = self.brain.generate_response(prompt)
         
-        return response
+        answer, route = self.extract_route(response) if with_route else (response, None)
+        if answer:
+            self.memory.store_conversation(text, answer)
+        return answer, route
 
 if __name__ == "__main__":
     # Test
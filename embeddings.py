@@ -0,0 +1,325 @@
+"""
+JARVIS - Embedding Backends and Cache
+MemoryCore uchun embedding manbalari:
+    GeminiEmbedder       - Google Gemini embedding API (tarmoq kerak)
+    HashedNgramEmbedder  - lokal, NumPy: belgilar n-gramlari hash orqali qat'iy o'lchamli vektorga
+                           (tarmoqsiz, deterministik, ~0.1 ms)
+    EmbeddingCache       - matn hash'i bo'yicha diskdagi (SQLite) kesh, LRU bilan cheklangan
+    CachedEmbedder       - backend + kesh: bir xil matn uchun API qayta chaqirilmaydi; backend xato
+                           bersa cooldown sekund davomida "mavjud emas" (chaqiruvchi darhol lokalga o'tadi)
+"""
+import hashlib
+import threading
+import time
+import zlib
+from collections import OrderedDict
+import numpy as np
+from db_pool import get_pool
+from memory import fold_apostrophes
+
+try:
+    import google.generativeai as genai
+    GENAI_AVAILABLE = True
+except ImportError:
+    GENAI_AVAILABLE = False
+
+try:
+    from config import GEMINI_API_KEY
+except ImportError:
+    GEMINI_API_KEY = ""
+
+
+class GeminiEmbedder:
+    def __init__(self, model_name="models/embedding-001", api_key=None):
+        self.model_name = model_name
+        self.name = f"gemini:{model_name}"
+        self.api_key = api_key if api_key is not None else GEMINI_API_KEY
+        if self.available:
+            genai.configure(api_key=self.api_key)
+
+    @property
+    def available(self):
+        return GENAI_AVAILABLE and bool(self.api_key)
+
+    def embed(self, text, task_type="retrieval_document"):
+        if not self.available:
+            raise RuntimeError("Gemini embedding mavjud emas (kutubxona yoki API kalit yo'q)")
+        kwargs = {"title": "JARVIS Memory"} if task_type == "retrieval_document" else {}
+        result = genai.embed_content(model=self.model_name, content=text, task_type=task_type, **kwargs)
+        return np.asarray(result["embedding"], dtype=np.float32)
+
+    def embed_many(self, texts, task_type="retrieval_document"):
+        """Bitta so'rovda bir nechta matn (API partiya chegarasi: 100)"""
+        if not self.available:
+            raise RuntimeError("Gemini embedding mavjud emas (kutubxona yoki API kalit yo'q)")
+        kwargs = {"title": "JARVIS Memory"} if task_type == "retrieval_document" else {}
+        result = genai.embed_content(model=self.model_name, content=list(texts), task_type=task_type, **kwargs)
+        return np.asarray(result["embedding"], dtype=np.float32)
+
+
+class HashedNgramEmbedder:
+    """
+    Belgilar n-gramlari (so'z chegaralari bilan) crc32 orqali dim o'lchamli vektorga yig'iladi,
+    ishora ham hash'dan olinadi (to'qnashuvlar bir-birini so'ndiradi). Natija L2-normallashtirilgan.
+    Ma'no emas, yozilish o'xshashligi: "ob-havo" ~ "ob havo", "o'zbek" ~ "o`zbek".
+    """
+    available = True
+
+    def __init__(self, dim=512, ngram_range=(2, 4)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.name = f"local:ngram{ngram_range[0]}{ngram_range[1]}-{dim}"
+
+    def _features(self, text):
+        words = "".join(ch if ch.isalnum() or ch == "'" else " " for ch in fold_apostrophes(text)).split()
+        padded = f" {' '.join(words)} "
+        lo, hi = self.ngram_range
+        for n in range(lo, hi + 1):
+            for i in range(len(padded) - n + 1):
+                yield padded[i:i + n]
+        yield from words  # butun so'zlar alohida belgi
+
+    def embed(self, text, task_type=None):
+        hashes = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in self._features(text)), dtype=np.uint32)
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if hashes.size:
+            signs = np.where(hashes >> 31, -1.0, 1.0).astype(np.float32)
+            np.add.at(vector, (hashes % self.dim).astype(np.intp), signs)
+            norm = np.linalg.norm(vector)
+            if norm:
+                vector /= norm
+        return vector
+
+    def embed_many(self, texts, task_type=None):
+        return np.stack([self.embed(t) for t in texts]) if texts else np.zeros((0, self.dim), dtype=np.float32)
+
+
+class EmbeddingCache:
+    """
+    Kalit: blake2b(backend nomi, task, matn). Xotirada kichik LRU, diskda SQLite jadval; max_entries
+    oshsa eng uzoq ishlatilmagan yozuvlar (last_used) partiyalab o'chiriladi.
+    """
+
+    def __init__(self, db_path, max_entries=20000, memory_entries=512):
+        self.pool = get_pool(db_path)
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._hot = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evicted": 0}
+        conn = self.pool.connection()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embedding_cache (
+                    key BLOB PRIMARY KEY,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embedding_cache_last_used ON embedding_cache(last_used)")
+        self._count = conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+
+    @staticmethod
+    def key(backend_name, task_type, text):
+        return hashlib.blake2b(f"{backend_name}\0{task_type}\0{text}".encode("utf-8"), digest_size=16).digest()
+
+    def _remember(self, key, vector):
+        self._hot[key] = vector
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.memory_entries:
+            self._hot.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            vector = self._hot.get(key)
+            if vector is not None:
+                self._hot.move_to_end(key)
+                self.stats["hits"] += 1
+                return vector
+        conn = self.pool.connection()
+        row = conn.execute("SELECT vector FROM embedding_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        with conn:
+            conn.execute("UPDATE embedding_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        vector = np.frombuffer(row[0], dtype=np.float32)
+        with self._lock:
+            self._remember(key, vector)
+            self.stats["hits"] += 1
+            self.stats["disk_hits"] += 1
+        return vector
+
+    def put(self, key, vector):
+        self.put_many([(key, vector)])
+
+    def put_many(self, items):
+        """[(kalit, vektor), ...] - bitta tranzaksiyada"""
+        items = [(key, np.asarray(vector, dtype=np.float32)) for key, vector in items]
+        if not items:
+            return
+        now = time.time()
+        conn = self.pool.connection()
+        with conn:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO embedding_cache (key, vector, last_used) VALUES (?, ?, ?)",
+                             [(key, vector.tobytes(), now) for key, vector in items])
+            inserted = conn.total_changes - before
+        with self._lock:
+            for key, vector in items:
+                self._remember(key, vector)
+            self._count += inserted
+            over = self._count - self.max_entries
+        if over > 0:
+            self._evict(over + self.max_entries // 10)  # har qo'shishda emas, partiyalab
+
+    def _evict(self, n):
+        conn = self.pool.connection()
+        with conn:
+            cur = conn.execute("""
+                DELETE FROM embedding_cache WHERE key IN
+                    (SELECT key FROM embedding_cache ORDER BY last_used LIMIT ?)
+            """, (n,))
+        with self._lock:
+            self._count -= cur.rowcount
+            self.stats["evicted"] += cur.rowcount
+            self._hot.clear()
+
+    def __len__(self):
+        return self._count
+
+
+class CachedEmbedder:
+    """
+    backend.embed() + EmbeddingCache; backend xato bersa None (chaqiruvchi lokal backend'ga o'tadi).
+    Xatodan keyin cooldown sekund davomida backend chaqirilmaydi va available False bo'ladi: tarmoq
+    yo'q paytda har so'rov API timeout'ini kutmaydi.
+    """
+
+    def __init__(self, backend, cache, logger=None, cooldown=60.0):
+        self.backend = backend
+        self.cache = cache
+        self.logger = logger
+        self.name = backend.name
+        self.cooldown = cooldown
+        self.failures = 0
+        self._down_until = 0.0
+
+    @property
+    def available(self):
+        return self.backend.available and time.monotonic() >= self._down_until
+
+    def _failed(self, message):
+        self.failures += 1
+        self._down_until = time.monotonic() + self.cooldown
+        if self.logger:
+            self.logger.error(f"{message}; remote embeddings paused for {self.cooldown:.0f} s")
+
+    def embed(self, text, task_type="retrieval_document"):
+        key = self.cache.key(self.name, task_type, text)
+        vector = self.cache.get(key)
+        if vector is not None:
+            return vector
+        if not self.available:
+            return None
+        try:
+            vector = self.backend.embed(text, task_type)
+        except Exception as e:
+            self._failed(f"Embedding error ({self.name}): {e}")
+            return None
+        self.cache.put(key, vector)
+        return vector
+
+    def embed_many(self, texts, task_type="retrieval_document"):
+        """Vektorlar ro'yxati (xato bo'lsa o'sha o'rinda None); keshda yo'qlari bitta backend chaqiruvida"""
+        keys = [self.cache.key(self.name, task_type, text) for text in texts]
+        vectors = [self.cache.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing and self.available:
+            try:
+                fresh = self.backend.embed_many([texts[i] for i in missing], task_type)
+            except Exception as e:
+                self._failed(f"Batch embedding error ({self.name}, {len(missing)} texts): {e}")
+                return vectors
+            for i, vector in zip(missing, fresh):
+                vectors[i] = vector
+            self.cache.put_many([(keys[i], vectors[i]) for i in missing])
+        return vectors
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    local = HashedNgramEmbedder()
+    pairs = [("Ertaga ob-havo qanday bo'ladi?", "ertaga ob havo qanaqa"),
+             ("Mening ismim Sardor, dasturchiman", "Ismim Sardor"),
+             ("O'zbekiston poytaxti Toshkent", "O`zbekiston poytaxti"),
+             ("Mening ismim Sardor, dasturchiman", "Bitcoin narxi qancha?")]
+    for a, b in pairs:
+        print(f"local cosine {float(local.embed(a) @ local.embed(b)):.3f}  {a!r} ~ {b!r}")
+    t0 = time.perf_counter()
+    for i in range(1000):
+        local.embed(f"Foydalanuvchi {i}-loyihada python va sqlite ishlatadi")
+    print(f"local embed: {(time.perf_counter() - t0):.3f} ms/text (dim {local.dim}, no network)")
+
+    class _SlowRemote:
+        """Tarmoq kechikishini taqlid qiluvchi API (~120 ms)"""
+        name = "stand-in:remote"
+        available = True
+        calls = 0
+
+        def embed(self, text, task_type=None):
+            _SlowRemote.calls += 1
+            time.sleep(0.12)
+            return local.embed(text)
+
+    db_path = os.path.join(tempfile.mkdtemp(), "embedding_cache.db")
+    cached = CachedEmbedder(_SlowRemote(), EmbeddingCache(db_path, max_entries=50))
+    queries = ["Men kimman?", "Ertangi rejalarim", "Men kimman?", "Men kimman?", "Ertangi rejalarim"]
+    t0 = time.perf_counter()
+    for q in queries:
+        cached.embed(q, "retrieval_query")
+    print(f"{len(queries)} queries -> {_SlowRemote.calls} API calls, {(time.perf_counter() - t0) * 1000:.0f} ms")
+    assert _SlowRemote.calls == 2
+    assert cached.cache.stats == {"hits": 3, "disk_hits": 0, "misses": 2, "evicted": 0}, cached.cache.stats
+
+    # Jarayon qayta ishga tushgandek: yangi xotira keshi, o'sha disk
+    reopened = CachedEmbedder(_SlowRemote(), EmbeddingCache(db_path, max_entries=50))
+    t0 = time.perf_counter()
+    reopened.embed("Men kimman?", "retrieval_query")
+    print(f"after restart: disk hit in {(time.perf_counter() - t0) * 1000:.2f} ms, API calls {_SlowRemote.calls}")
+    assert _SlowRemote.calls == 2 and reopened.cache.stats["disk_hits"] == 1
+
+    # LRU: 50 yozuv chegarasi, eng ko'p ishlatilgan "Men kimman?" qoladi
+    for i in range(60):
+        reopened.cache.put(reopened.cache.key("stand-in:remote", "retrieval_document", f"m{i}"), local.embed(f"m{i}"))
+        if i % 10 == 0:
+            reopened.cache._hot.clear()
+            reopened.embed("Men kimman?", "retrieval_query")
+    kept = reopened.cache.get(reopened.cache.key("stand-in:remote", "retrieval_query", "Men kimman?")) is not None
+    print(f"cache size {len(reopened.cache)} (max 50), evicted {reopened.cache.stats['evicted']}, "
+          f"hot query kept: {kept}")
+    assert len(reopened.cache) <= 50 and reopened.cache.stats["evicted"] == 12 and kept
+    assert _SlowRemote.calls == 2  # evictiondan keyin ham "Men kimman?" keshdan
+
+    # Tarmoq yo'q: birinchi xatodan keyin cooldown davomida API chaqirilmaydi
+    class _Offline:
+        name = "stand-in:offline"
+        available = True
+        calls = 0
+
+        def embed(self, text, task_type=None):
+            _Offline.calls += 1
+            time.sleep(0.2)  # ulanish timeout'i
+            raise ConnectionError("network unreachable")
+
+    offline = CachedEmbedder(_Offline(), EmbeddingCache(os.path.join(tempfile.mkdtemp(), "c.db")), cooldown=0.5)
+    t0 = time.perf_counter()
+    results = [offline.embed(f"so'rov {i}", "retrieval_query") for i in range(5)]
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    assert results == [None] * 5 and _Offline.calls == 1 and not offline.available
+    time.sleep(0.5)
+    assert offline.available
+    print(f"offline remote: 5 queries in {elapsed_ms:.0f} ms, 1 API attempt, available again after cooldown")
@@ -24,6 +24,14 @@ from utils import (
     setup_logger, format_success_response, format_error_response,
     extract_website_url
 )
+from post_processor import PostProcessor
+from prefetcher import Prefetcher
+from lazy_loader import LazyRegistry
+from action_registry import (
+    ACTION_REGISTRY, ResourceLocks, action,
+    INSTANT, FAST, SLOW,
+    INPUT, AUDIO, FILESYSTEM, CAMERA, NETWORK, SYSTEM
+)
 
 # Media & Automation Modules
 try:
@@ -104,14 +112,20 @@ class WindowsExecutor:
         self.logger = setup_logger("WindowsExecutor")
         self.logger.info("WindowsExecutor initialized")
         self.voice = None  # Will be set by JARVIS core
-        self.lock = threading.Lock() # Thread safety lock
+        self.resource_locks = ResourceLocks(config.EXECUTOR_SETTINGS.get("resource_limits"))  # Resurs bo'yicha qulflar
         self.on_biometric_request = None # Callback for Vocal Auth Challenge (Elite v13.0)
+        self.post_processor = PostProcessor(owner=self) # Bookkeeping (history, intent, XP) fon oqimida
+        self.prefetcher = Prefetcher(owner=self) # Bashorat qilingan keyingi action uchun modul/ma'lumot/audio tayyorlash
         
+        # Og'ir modullar birinchi ishlatilganda quriladi (LazyProxy); warm_up() ularni fonda yuklaydi
+        self.modules = LazyRegistry("WindowsExecutor", lazy=config.STARTUP_SETTINGS.get("lazy_modules", True))
+        lazy = self.modules.add
+
         # Camera, Gesture va Typer instances
-        self.camera = CameraCapture() if CAMERA_AVAILABLE else None
-        self.gesture = HandGestureControl() if CAMERA_AVAILABLE else None
-        self.typer_bot = JARVISTyperBot() if TYPER_AVAILABLE else None
-        self.connectivity = ConnectivityManager() if CONNECTIVITY_AVAILABLE else None
+        self.camera = lazy("camera", self._start_background_camera) if CAMERA_AVAILABLE else None
+        self.gesture = lazy("gesture", HandGestureControl) if CAMERA_AVAILABLE else None
+        self.typer_bot = lazy("typer_bot", JARVISTyperBot) if TYPER_AVAILABLE else None
+        self.connectivity = lazy("connectivity", ConnectivityManager) if CONNECTIVITY_AVAILABLE else None
         
         # Advanced Modules Initialization
         self.news_bot = None
@@ -144,83 +158,119 @@ class WindowsExecutor:
         self.security_vault = None
         
         if ADVANCED_FEATURES_AVAILABLE:
-            try:
-                self.news_bot = NewsBot()
-                self.voice_cloning = VoiceCloning()
-                self.security_scanner = SecurityScanner()
-                self.scheduler = AdvancedScheduler()
-                self.automation = DesktopAutomation()
-                self.media_player = SmartMediaPlayer()
-                self.vision = VisionEngine()
-                self.health = HealthMonitor(voice_module=self)
-                self.finance = FinanceManager()
-                # self.research = ResearchAssistant()
-                self.gaming_mode = GamingMode()
-                self.tutor = TutorEngine()
-                self.mood = MoodEngine(vision_engine=self.vision)
-                self.market = MarketMonitor()
-                # self.local_ai = LocalLLM()
-                self.avatar = VisualAvatar()
-                self.avatar.start()
-                self.night_owl = NightOwl(research_module=self.research)
-                self.voice_authenticator = VoiceAuth()
-                self.gamification = GamificationSystem()
-                self.memory = MemoryEngine()
-                self.vector_memory = MemoryCore()
-                self.healer = CodeHealer()
-                self.dream_weaver = DreamWeaver()
-                self.gui = GUIController()
-                self.media_generator = MediaGenerator() # IMAGE & VIDEO
-                self.voice_transformer = VoiceTransformer()
-                self.swarm = SwarmNode()
-                
-                # Start Cloud Bridge (Background)
-                # Note: User must configure CLOUD_SERVER_URL in cloud_bridge_client.py first
-                self.cloud_bridge = CloudBridge()
-                threading.Thread(target=self.cloud_bridge.start_polling, daemon=True).start()
-                
-                self.global_eye = GlobalEye()
-                self.security_vault = QuantumSecurity()
-                from vault_manager import ShadowVault
-                self.shadow_vault = ShadowVault()
-                
-                from workflow_engine import WorkflowEngine
-                from smart_sorter import SmartSorter
-                self.workflows = WorkflowEngine(executor=self)
-                self.sorter = SmartSorter()
-                
-                from neural_indexer import NeuralIndexer
-                from sync_manager import SyncManager
-                self.neural_index = NeuralIndexer(brain=self, terminal_callback=self.logger.info)
-                self.sync = SyncManager(terminal_callback=self.logger.info)
-                
-                from vision_agent import JARVISVisionAgent
-                self.vision_agent = JARVISVisionAgent(terminal_callback=self.logger.info)
-
-                # Predictive Intent Engine (Elite v16.0)
-                from intent_engine import IntentEngine
-                self.intent_engine = IntentEngine(memory_engine=self.memory)
-                self.intent_engine.analyze_patterns() # Build initial matrix
-
-                # Start security scanner in background with verbal alerts
-                def security_alert(level, msg):
-                    self.logger.warning(f"SECURITY ALERT: {msg}")
-                    if level == "CRITICAL" or level == "WARNING":
-                        self.speak(f"Janob, xavfsizlik tizimi ogohlantiradi: {msg}")
-                        
-                self.security_scanner = SecurityScanner(alert_callback=security_alert)
-                self.security_scanner.start()
-
-            except Exception as e:
-                self.logger.error(f"Advanced modules initialization failed: {e}")
-        
-        # Auto-start camera in background mode
-        if self.camera:
-            try:
-                self.camera.start_camera(show_window=False)  # Background mode
-                self.logger.info("Camera started in background mode")
-            except Exception as e:
-                self.logger.warning(f"Camera auto-start failed: {e}")
+            self.news_bot = lazy("news_bot", NewsBot)
+            self.voice_cloning = lazy("voice_cloning", VoiceCloning)
+            self.scheduler = lazy("scheduler", AdvancedScheduler)
+            self.automation = lazy("automation", DesktopAutomation)
+            self.media_player = lazy("media_player", SmartMediaPlayer)
+            self.vision = lazy("vision", VisionEngine)
+            self.health = lazy("health", lambda: HealthMonitor(voice_module=self))
+            self.finance = lazy("finance", FinanceManager)
+            # self.research = ResearchAssistant()
+            self.gaming_mode = lazy("gaming_mode", GamingMode)
+            self.tutor = lazy("tutor", TutorEngine)
+            self.mood = lazy("mood", lambda: MoodEngine(vision_engine=self.vision))
+            self.market = lazy("market", MarketMonitor)
+            # self.local_ai = LocalLLM()
+            self.avatar = lazy("avatar", self._start_avatar)
+            self.night_owl = lazy("night_owl", lambda: NightOwl(research_module=self.research))
+            self.voice_authenticator = lazy("voice_authenticator", VoiceAuth)
+            self.gamification = lazy("gamification", GamificationSystem)
+            self.memory = lazy("memory", MemoryEngine)
+            self.vector_memory = lazy("vector_memory", MemoryCore)
+            self.healer = lazy("healer", CodeHealer)
+            self.dream_weaver = lazy("dream_weaver", DreamWeaver)
+            self.gui = lazy("gui", GUIController)
+            self.media_generator = lazy("media_generator", MediaGenerator) # IMAGE & VIDEO
+            self.voice_transformer = lazy("voice_transformer", VoiceTransformer)
+            self.swarm = lazy("swarm", SwarmNode)
+            
+            # Cloud Bridge (Background polling)
+            # Note: User must configure CLOUD_SERVER_URL in cloud_bridge_client.py first
+            self.cloud_bridge = lazy("cloud_bridge", self._start_cloud_bridge)
+            
+            self.global_eye = lazy("global_eye", GlobalEye)
+            self.security_vault = lazy("security_vault", QuantumSecurity)
+            self.shadow_vault = lazy("shadow_vault", self._build_shadow_vault)
+            self.workflows = lazy("workflows", self._build_workflows)
+            self.sorter = lazy("sorter", self._build_sorter)
+            self.neural_index = lazy("neural_index", self._build_neural_index)
+            self.sync = lazy("sync", self._build_sync)
+            self.vision_agent = lazy("vision_agent", self._build_vision_agent)
+
+            # Predictive Intent Engine (Elite v16.0)
+            self.intent_engine = lazy("intent_engine", self._build_intent_engine)
+
+            # Security scanner in background with verbal alerts
+            self.security_scanner = lazy("security_scanner", self._start_security_scanner)
+
+    # ==================== LAZY MODULE FACTORIES ====================
+
+    def _start_background_camera(self):
+        """Kamera (background mode'da avtomatik yoqiladi)"""
+        camera = CameraCapture()
+        try:
+            camera.start_camera(show_window=False)  # Background mode
+            self.logger.info("Camera started in background mode")
+        except Exception as e:
+            self.logger.warning(f"Camera auto-start failed: {e}")
+        return camera
+
+    def _start_avatar(self):
+        avatar = VisualAvatar()
+        avatar.start()
+        return avatar
+
+    def _start_cloud_bridge(self):
+        cloud_bridge = CloudBridge()
+        threading.Thread(target=cloud_bridge.start_polling, daemon=True).start()
+        return cloud_bridge
+
+    def _build_shadow_vault(self):
+        from vault_manager import ShadowVault
+        return ShadowVault()
+
+    def _build_workflows(self):
+        from workflow_engine import WorkflowEngine
+        return WorkflowEngine(executor=self)
+
+    def _build_sorter(self):
+        from smart_sorter import SmartSorter
+        return SmartSorter()
+
+    def _build_neural_index(self):
+        from neural_indexer import NeuralIndexer
+        return NeuralIndexer(brain=self, terminal_callback=self.logger.info)
+
+    def _build_sync(self):
+        from sync_manager import SyncManager
+        return SyncManager(terminal_callback=self.logger.info)
+
+    def _build_vision_agent(self):
+        from vision_agent import JARVISVisionAgent
+        return JARVISVisionAgent(terminal_callback=self.logger.info)
+
+    def _build_intent_engine(self):
+        from intent_engine import IntentEngine
+        intent_engine = IntentEngine(memory_engine=self.memory)
+        intent_engine.analyze_patterns() # Saqlangan model bo'lmasa tarixdan qurish
+        return intent_engine
+
+    def _start_security_scanner(self):
+        def security_alert(level, msg):
+            self.logger.warning(f"SECURITY ALERT: {msg}")
+            if level == "CRITICAL" or level == "WARNING":
+                self.speak(f"Janob, xavfsizlik tizimi ogohlantiradi: {msg}")
+
+        security_scanner = SecurityScanner(alert_callback=security_alert)
+        security_scanner.start()
+        return security_scanner
+
+    def warm_up(self, names=None):
+        """Modullarni shu oqimda oldindan qurish (odatda start_warm_up orqali fonda)"""
+        if names is None:
+            names = config.STARTUP_SETTINGS.get("warm_up_modules")
+        self.modules.warm_up(names)
     
     def set_voice(self, voice_assistant):
         """Set voice assistant for verbal confirmations"""
@@ -263,32 +313,17 @@ class WindowsExecutor:
         self.logger.info(f"Executing: {action} with {parameters}")
         
         try:
-            # Action'ga mos methodga yo'naltirish
-            method_name = f"_{action}"
-            method = getattr(self, method_name, None)
-            
-            # Agar method topilmasa, _get_executor orqali tekshirish (fallback)
-            if not method:
-                method = self._get_executor(action)
+            # Action registry orqali O(1) yo'naltirish
+            spec = ACTION_REGISTRY.get(action)
 
             result = None
-            if method:
-                with self.lock: # Maintain thread safety
-                    result = method(parameters)
-                
-                # Predictive Analysis (Elite v16.0)
-                if hasattr(self, 'intent_engine') and self.intent_engine and self.memory:
-                    self.memory.add_command_history(action, str(parameters))
-                    self.intent_engine.analyze_patterns() 
-                    prediction = self.intent_engine.predict_next(action)
-                    if prediction:
-                        self.logger.info(f"🔮 PREDICTION: {prediction['action']}")
+            if spec:
+                self.prefetcher.on_action(action)
+                with self.resource_locks.hold(spec.locks):
+                    result = spec.handler(self, parameters)
                 
-                # Gamification & Voice
-                if action not in ["describe_screen", "posture_monitor"]:
-                    if result and "error" not in str(result).lower():
-                        if hasattr(self, 'gamification') and self.gamification: 
-                            self.gamification.add_xp(10, action)
+                # History, Predictive Analysis (Elite v16.0) va Gamification -> fon navbati
+                self.post_processor.record_action(action, parameters, result)
 
                 return {"success": True, "verbal_response": str(result), "result": result}
             else:
@@ -298,16 +333,22 @@ class WindowsExecutor:
             self.logger.error(f"Execution Error ({action}): {e}")
             return {"success": False, "error": str(e)}
         
+    def lock_stats(self):
+        """Resurs qulflari bo'yicha raqobat statistikasi (HUD/diagnostika uchun)"""
+        return self.resource_locks.stats()
+
     # CONSUMED BY PRIMARY EXECUTE METHOD
     
     # ==================== SYSTEM CONTROL ====================
     
+    @action("SYSTEM_CONTROL", latency=FAST, locks=(SYSTEM,))
     def _shutdown(self, params):
         """Kompyuterni o'chirish"""
         self.logger.info("Executing shutdown")
         os.system("shutdown /s /t 5")
         return "5 soniyada kompyuter o'chadi, janob."
     
+    @action("SYSTEM_CONTROL", latency=FAST, locks=(SYSTEM,))
     def _quit_jarvis(self, params):
         """JARVIS-ni tugatish"""
         self.logger.info("Quitting JARVIS")
@@ -327,16 +368,21 @@ class WindowsExecutor:
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 pass
         
+        # Navbatdagi bookkeeping yozuvlarini yo'qotmaslik
+        self.post_processor.close()
+
         # Exit current process
         sys.exit(0)
         return "JARVIS tugatildi"
     
+    @action("SYSTEM_CONTROL", latency=FAST, locks=(SYSTEM,))
     def _restart(self, params):
         """Kompyuterni qayta ishga tushirish"""
         self.logger.info("Executing restart")
         subprocess.run(["shutdown", "/r", "/t", "1"], check=True)
         return "Restarting..."
     
+    @action("SYSTEM_CONTROL", latency=FAST, locks=(SYSTEM,))
     def _sleep(self, params):
         """Kompyuterni uyqu rejimiga o'tkazish"""
         self.logger.info("Executing sleep")
@@ -344,6 +390,7 @@ class WindowsExecutor:
         subprocess.run(["rundll32.exe", "powrprof.dll,SetSuspendState", "0,1,0"], check=True)
         return "Going to sleep..."
     
+    @action("DEVICE_CONTROL", latency=FAST, locks=(FILESYSTEM,))
     def _screenshot(self, params):
         """Ekran rasmini olish"""
         self.logger.info("Taking screenshot")
@@ -360,6 +407,7 @@ class WindowsExecutor:
         pyautogui.screenshot(file_path)
         return f"Screenshot saved to {file_path}"
 
+    @action("DEVICE_STATUS", aliases=('get_battery',), latency=INSTANT)
     def _get_battery_info(self, params):
         """Batareya holati"""
         battery = psutil.sensors_battery()
@@ -371,6 +419,7 @@ class WindowsExecutor:
             }
         return "Battery info not available"
 
+    @action("SYSTEM_CONTROL", latency=FAST, locks=(SYSTEM,))
     def _kill_process(self, params):
         """Ilovani majburiy to'xtatish (Force Kill)"""
         app_name = params.get("app_name", "").lower()
@@ -384,12 +433,14 @@ class WindowsExecutor:
                 count += 1
         return f"Terminated {count} instances of {app_name}"
 
+    @action("SYSTEM_CONTROL", latency=FAST, locks=(SYSTEM,))
     def _lock_screen(self, params):
         """Ekranni qulflash"""
         self.logger.info("Executing lock screen")
         subprocess.run(["rundll32.exe", "user32.dll,LockWorkStation"], check=True)
         return "Screen locked"
 
+    @action("SECURITY", latency=INSTANT)
     def _start_sentinel(self, params):
         """Sentinel Mode (Auto-lock) yoqish"""
         self.logger.info("Starting Sentinel Mode")
@@ -397,12 +448,14 @@ class WindowsExecutor:
         config.SENTINEL_MODE["last_warn_time"] = 0
         return "Sentinel Mode faollashtirildi. 2 daqiqa yo'q bo'lsangiz, kompyuter qulflanadi."
 
+    @action("SECURITY", latency=INSTANT)
     def _stop_sentinel(self, params):
         """Sentinel Mode o'chirish"""
         import config
         config.SENTINEL_MODE["enabled"] = False
         return "Sentinel Mode o'chirildi."
 
+    @action("SECURITY", latency=INSTANT)
     def _pause_blackout(self, params):
         """Blackout protokolini vaqtincha to'xtatib turish"""
         import config
@@ -411,6 +464,7 @@ class WindowsExecutor:
         config.BLACKOUT_SETTINGS["paused_until"] = time.time() + (duration_minutes * 60)
         return f"Blackout protokoli {duration_minutes} daqiqaga to'xtatib turiladi."
 
+    @action("SECURITY", latency=INSTANT)
     def _unlock_system(self, params):
         """Tizimni ovoz orqali ochish"""
         self.logger.info("Unlock command received")
@@ -419,6 +473,7 @@ class WindowsExecutor:
             return "Tizim ochilmoqda, xush kelibsiz janob."
         return "Tizim qulflanmagan."
 
+    @action("DEVICE_CONTROL", latency=INSTANT, locks=(AUDIO,))
     def _volume_up(self, params):
         """Ovozni ko'tarish"""
         import ctypes
@@ -427,6 +482,7 @@ class WindowsExecutor:
             ctypes.windll.user32.keybd_event(0xAF, 0, 2, 0)
         return "Volume increased"
 
+    @action("DEVICE_CONTROL", latency=INSTANT, locks=(AUDIO,))
     def _volume_down(self, params):
         """Ovozni pasaytirish"""
         import ctypes
@@ -435,6 +491,7 @@ class WindowsExecutor:
             ctypes.windll.user32.keybd_event(0xAE, 0, 2, 0)
         return "Volume decreased"
 
+    @action("DEVICE_CONTROL", latency=INSTANT, locks=(AUDIO,))
     def _mute_volume(self, params):
         """Ovozni o'chirish/yoqish"""
         import ctypes
@@ -442,6 +499,7 @@ class WindowsExecutor:
         ctypes.windll.user32.keybd_event(0xAD, 0, 2, 0)
         return "Volume muted/unmuted"
 
+    @action("DEVICE_STATUS", latency=SLOW, locks=(NETWORK,))
     def _describe_screen(self, params):
         """Ekranda nima borligini tahlil qilish (AI Vision)"""
         if not self.vision:
@@ -454,6 +512,7 @@ class WindowsExecutor:
         self.speak(description)
         return description
 
+    @action("DEVICE_CONTROL", latency=FAST, locks=(CAMERA,))
     def _posture_monitor(self, params):
         """Sog'liq/Postura monitoringini boshqarish"""
         if not self.health:
@@ -469,22 +528,7 @@ class WindowsExecutor:
 
     # ==================== FINANCIAL CONTROL ====================
     
-    def _add_expense(self, params):
-        """Xarajat qo'shish"""
-        if not self.finance:
-            return "Moliya moduli yuklanmagan."
-        
-        amount = params.get("amount")
-        category = params.get("category", "Umumiy")
-        description = params.get("description", "")
-        
-        if not amount:
-            return "Summa ko'rsatilmadi."
-            
-        result = self.finance.add_transaction(amount, category, description, "expense")
-        self.speak(result)
-        return result
-
+    @action("FINANCE", latency=FAST)
     def _add_income(self, params):
         """Daromad qo'shish"""
         if not self.finance:
@@ -501,6 +545,7 @@ class WindowsExecutor:
         self.speak(result)
         return result
 
+    @action("FINANCE", aliases=('finance_report',), latency=FAST)
     def _get_finance_report(self, params):
         """Moliya hisoboti"""
         if not self.finance:
@@ -510,17 +555,9 @@ class WindowsExecutor:
         self.speak(result)
         return result
 
-    def _get_balance(self, params):
-        """Balansni tekshirish"""
-        if not self.finance:
-            return "Moliya moduli yuklanmagan."
-            
-        result = self.finance.get_balance()
-        self.speak(result)
-        return result
-
     # ==================== RESEARCH CONTROL ====================
     
+    @action("INFORMATIONAL_RESPONSE", latency=SLOW, locks=(NETWORK,))
     def _start_research(self, params):
         """Mavzu bo'yicha tadqiqot boshlash"""
         if not self.research:
@@ -549,6 +586,7 @@ class WindowsExecutor:
 
     # ==================== TUTOR CONTROL ====================
     
+    @action("AI_BRAIN", latency=SLOW, locks=(NETWORK,))
     def _start_tutor(self, params):
         """Til o'rganish sessiyasini boshlash"""
         if not self.tutor:
@@ -559,6 +597,7 @@ class WindowsExecutor:
         self.speak(result)
         return result
 
+    @action("AI_BRAIN", latency=SLOW, locks=(NETWORK,))
     def _tutor_respond(self, params):
         """Tutor sessiyasida javob berish"""
         if not self.tutor:
@@ -575,6 +614,7 @@ class WindowsExecutor:
 
     # ==================== MOOD CONTROL ====================
     
+    @action("AI_BRAIN", latency=SLOW, locks=(NETWORK,))
     def _detect_mood(self, params):
         """Kayfiyatni aniqlash"""
         if not self.mood:
@@ -587,28 +627,31 @@ class WindowsExecutor:
 
     # ==================== MARKET CONTROL ====================
     
+    @action("FINANCE", latency=SLOW, locks=(NETWORK,))
     def _get_crypto_price(self, params):
         """Kriptovalyuta narxini olish"""
         if not self.market:
             return "Market moduli yuklanmagan."
             
         symbol = params.get("symbol", "bitcoin")
-        result = self.market.get_crypto_price(symbol)
+        result = self.prefetcher.take(f"crypto:{symbol.lower()}") or self.market.get_crypto_price(symbol)
         self.speak(result)
         return result
 
+    @action("FINANCE", latency=SLOW, locks=(NETWORK,))
     def _get_stock_price(self, params):
         """Aksiya narxini olish"""
         if not self.market:
             return "Market moduli yuklanmagan."
             
         symbol = params.get("symbol", "AAPL")
-        result = self.market.get_stock_price(symbol)
+        result = self.prefetcher.take(f"stock:{symbol.upper()}") or self.market.get_stock_price(symbol)
         self.speak(result)
         return result
 
     # ==================== LOCAL AI CONTROL ====================
     
+    @action("AI_BRAIN", latency=SLOW)
     def _local_query(self, params):
         """Lokal AI modeliga so'rov yuborish"""
         if not self.local_ai:
@@ -625,6 +668,7 @@ class WindowsExecutor:
 
     # ==================== NIGHT OWL CONTROL ====================
     
+    @action("AUTOMATION", latency=FAST)
     def _start_night_owl(self, params):
         """Night Owl rejimini yoqish"""
         if not self.night_owl:
@@ -634,6 +678,7 @@ class WindowsExecutor:
         self.speak(result)
         return result
 
+    @action("AUTOMATION", latency=INSTANT)
     def _add_research_topic(self, params):
         """Tungi tadqiqot uchun mavzu qo'shish"""
         if not self.night_owl:
@@ -649,6 +694,7 @@ class WindowsExecutor:
 
     # ==================== VOICE AUTH CONTROL ====================
 
+    @action("SECURITY", latency=SLOW, locks=(AUDIO,))
     def _voice_authenticate(self, params):
         """Ovoz orqali shaxsni tasdiqlash"""
         if not self.voice_authenticator:
@@ -662,6 +708,7 @@ class WindowsExecutor:
 
     # ==================== GAMIFICATION CONTROL ====================
 
+    @action("INFORMATIONAL_RESPONSE", latency=INSTANT)
     def _get_level(self, params):
         """Level haqida ma'lumot"""
         if not self.gamification:
@@ -672,6 +719,7 @@ class WindowsExecutor:
         self.speak(res)
         return res
 
+    @action("INFORMATIONAL_RESPONSE", latency=INSTANT)
     def _get_xp(self, params):
         """XP haqida ma'lumot"""
         if not self.gamification:
@@ -683,6 +731,7 @@ class WindowsExecutor:
 
     # ==================== MEMORY CONTROL ====================
 
+    @action("AI_BRAIN", latency=SLOW, locks=(NETWORK,))
     def _memorize_info(self, params):
         """Ma'lumotni xotiraga saqlash"""
         if not self.memory:
@@ -696,6 +745,7 @@ class WindowsExecutor:
         self.speak(res)
         return res
 
+    @action("AI_BRAIN", latency=SLOW, locks=(NETWORK,))
     def _recall_info(self, params):
         """Xotiradan ma'lumot qidirish"""
         if not self.memory:
@@ -715,6 +765,7 @@ class WindowsExecutor:
 
     # ==================== HEALING CONTROL ====================
 
+    @action("AUTOMATION", latency=SLOW, locks=(FILESYSTEM,))
     def _check_errors(self, params):
         """Xatolarni tekshirish va tahlil qilish"""
         if not self.healer:
@@ -735,6 +786,7 @@ class WindowsExecutor:
 
     # ==================== DREAM MODE CONTROL ====================
 
+    @action("AI_BRAIN", latency=SLOW, locks=(NETWORK,))
     def _generate_dream(self, params):
         """Tush ko'rish (Dream Mode)"""
         if not self.dream_weaver:
@@ -753,24 +805,17 @@ class WindowsExecutor:
 
     # ==================== GUI AUTOMATION CONTROL ====================
 
-    def _type_text(self, params):
-        if not self.gui: return "GUI moduli yuklanmagan."
-        text = params.get("text", "")
-        return self.gui.type_text(text)
-
-    def _press_key(self, params):
-        if not self.gui: return "GUI moduli yuklanmagan."
-        keys = params.get("key") or params.get("keys", "")
-        return self.gui.press_hotkey(keys)
-
+    @action("INPUT_CONTROL", latency=INSTANT, locks=(INPUT,))
     def _scroll_down(self, params):
         if not self.gui: return "GUI moduli yuklanmagan."
         return self.gui.scroll(300, "down")
 
+    @action("INPUT_CONTROL", latency=INSTANT, locks=(INPUT,))
     def _scroll_up(self, params):
         if not self.gui: return "GUI moduli yuklanmagan."
         return self.gui.scroll(300, "up")
 
+    @action("INPUT_CONTROL", latency=FAST, locks=(INPUT,))
     def _open_run(self, params):
         if not self.gui: return "GUI moduli yuklanmagan."
         cmd = params.get("command", "")
@@ -778,6 +823,7 @@ class WindowsExecutor:
 
     # ==================== VOICE TRANSFORMER CONTROL ====================
 
+    @action("DEVICE_CONTROL", latency=INSTANT, locks=(AUDIO,))
     def _change_voice(self, params):
         if not self.voice_transformer: return "Ovoz o'zgartirish moduli yuklanmagan."
         effect = params.get("effect", "robot")
@@ -786,24 +832,28 @@ class WindowsExecutor:
 
     # ==================== SWARM MODE CONTROL ====================
 
+    @action("DEVICE_CONTROL", latency=FAST, locks=(NETWORK,))
     def _start_swarm(self, params):
         if not self.swarm: return "Swarm moduli yuklanmagan."
         result = self.swarm.start_node()
         self.speak(result)
         return result
 
+    @action("DEVICE_CONTROL", latency=SLOW, locks=(NETWORK,))
     def _swarm_scan(self, params):
         if not self.swarm: return "Swarm moduli yuklanmagan."
         result = self.swarm.scan_network()
         self.speak(result)
         return result
 
+    @action("DEVICE_STATUS", latency=INSTANT)
     def _swarm_list(self, params):
         if not self.swarm: return "Swarm moduli yuklanmagan."
         result = self.swarm.get_nodes()
         self.speak(result)
         return result
 
+    @action("COMMUNICATION", latency=SLOW, locks=(NETWORK,))
     def _swarm_send(self, params):
         if not self.swarm: return "Swarm moduli yuklanmagan."
         ip = params.get("ip")
@@ -813,6 +863,7 @@ class WindowsExecutor:
 
     # ==================== WIDGET CONTROL ====================
 
+    @action("APPLICATION_CONTROL", latency=FAST)
     def _start_widget(self, params):
         try:
             widget_path = os.path.join(os.getcwd(), "hud_widgets.py")
@@ -821,6 +872,7 @@ class WindowsExecutor:
         except Exception as e:
             return f"Vidjetni ochishda xatolik: {e}"
 
+    @action("DEVICE_STATUS", latency=INSTANT)
     def _remote_wake(self, params):
         """Uzoqdan yoqish uchun MAC manzilni ko'rsatish"""
         try:
@@ -835,6 +887,7 @@ class WindowsExecutor:
         except Exception as e:
             return f"MAC manzilni aniqlashda xatolik: {e}"
 
+    @action("INFORMATIONAL_RESPONSE", latency=SLOW, locks=(NETWORK,))
     def _global_status(self, params):
         """Dunyo yangiliklarini tahlil qilish"""
         if not self.global_eye:
@@ -844,6 +897,7 @@ class WindowsExecutor:
         # Note: Trends API might be slow
         return self.global_eye.analyze_world()
 
+    @action("APPLICATION_CONTROL", latency=FAST)
     def _visual_avatar(self, params):
         import config
         config.AVATAR_ENABLED = not config.AVATAR_ENABLED
@@ -852,18 +906,21 @@ class WindowsExecutor:
 
     # ==================== QUANTUM SECURITY ====================
 
+    @action("SECURITY", latency=FAST, locks=(FILESYSTEM,))
     def _encrypt_file(self, params):
         if not self.security_vault: return "Xavfsizlik moduli yuklanmagan."
         path = params.get("path") or params.get("file")
         if not path: return "Qaysi faylni shifrlay?"
         return self.security_vault.encrypt_file(path)
 
+    @action("SECURITY", latency=FAST, locks=(FILESYSTEM,))
     def _decrypt_file(self, params):
         if not self.security_vault: return "Xavfsizlik moduli yuklanmagan."
         path = params.get("path") or params.get("file")
         if not path: return "Qaysi faylni ochay?"
         return self.security_vault.decrypt_file(path)
 
+    @action("SECURITY", destructive=True, latency=FAST, locks=(FILESYSTEM,))
     def _secure_delete(self, params):
         if not self.security_vault: return "Xavfsizlik moduli yuklanmagan."
         path = params.get("path") or params.get("file")
@@ -872,6 +929,7 @@ class WindowsExecutor:
 
     # ==================== APPLICATION CONTROL ====================
     
+    @action("APPLICATION_CONTROL", latency=FAST, locks=(INPUT,))
     def _open_app(self, params):
         """Ilovani ochish"""
         app_name = params.get("app_name", "").lower()
@@ -923,6 +981,7 @@ class WindowsExecutor:
             self.logger.error(f"Failed to open app: {e}")
             raise ValueError(f"Could not open app: {app_name}")
     
+    @action("APPLICATION_CONTROL", latency=FAST)
     def _close_app(self, params):
         """Ilovani yopish"""
         app_name = params.get("app_name", "").lower()
@@ -952,6 +1011,7 @@ class WindowsExecutor:
         else:
             return f"App {app_name} not found"
     
+    @action("APPLICATION_CONTROL", latency=FAST, locks=(INPUT,))
     def _focus_app(self, params):
         """Ilovani olga olib chiqish"""
         app_name = params.get("app_name", "")
@@ -965,6 +1025,7 @@ class WindowsExecutor:
     
     # ==================== WEB CONTROL ====================
     
+    @action("INTERNET_SEARCH", latency=FAST)
     def _open_website(self, params):
         """Veb-saytni ochish"""
         url = params.get("url", "")
@@ -981,6 +1042,7 @@ class WindowsExecutor:
         webbrowser.open(full_url)
         return f"Opened {full_url}"
     
+    @action("INTERNET_SEARCH", latency=FAST)
     def _search_google(self, params):
         """Google'da qidirish"""
         query = params.get("query", "")
@@ -995,6 +1057,7 @@ class WindowsExecutor:
     
     # ==================== MESSAGING ====================
     
+    @action("COMMUNICATION", latency=SLOW, locks=(INPUT,))
     def _send_telegram_message(self, params):
         """
         Telegram orqali xabar yuborish (Background preference)
@@ -1077,6 +1140,7 @@ class WindowsExecutor:
         
         return f"✅ [GUI Mode] Sent message to {contact}: {message}"
     
+    @action("APPLICATION_CONTROL", latency=SLOW, locks=(INPUT,))
     def _write_in_app(self, params):
         """Ilovada matn yozish"""
         app_name = params.get("app_name", "notepad").lower()
@@ -1151,6 +1215,7 @@ class WindowsExecutor:
     
     # ==================== FILE SYSTEM ====================
     
+    @action("FILE_MANAGEMENT", latency=INSTANT, locks=(FILESYSTEM,))
     def _create_folder(self, params):
         """Papka yaratish"""
         folder_name = params.get("folder_name", "")
@@ -1165,6 +1230,7 @@ class WindowsExecutor:
         os.makedirs(full_path, exist_ok=True)
         return f"Created folder: {full_path}"
     
+    @action("FILE_MANAGEMENT", latency=INSTANT, locks=(FILESYSTEM,))
     def _delete_file(self, params):
         """Faylni o'chirish"""
         file_path = params.get("file_path", "")
@@ -1184,6 +1250,7 @@ class WindowsExecutor:
         else:
             raise FileNotFoundError(f"File not found: {file_path}")
     
+    @action("FILE_MANAGEMENT", latency=FAST)
     def _open_file(self, params):
         """Faylni ochish"""
         file_path = params.get("file_path", "")
@@ -1195,6 +1262,7 @@ class WindowsExecutor:
         os.startfile(file_path)
         return f"Opened file: {file_path}"
     
+    @action("FILE_MANAGEMENT", latency=INSTANT)
     def _list_directory(self, params):
         """Papka tarkibini ko'rsatish"""
         path = params.get("path", os.getcwd())
@@ -1213,6 +1281,7 @@ class WindowsExecutor:
     
     # ==================== INPUT CONTROL ====================
     
+    @action("INPUT_CONTROL", latency=FAST, locks=(INPUT,))
     def _type_text(self, params):
         """Matn yozish (Clipboard orqali)"""
         text = params.get("text", "")
@@ -1235,6 +1304,7 @@ class WindowsExecutor:
             
         return f"Typed: {text}"
     
+    @action("INPUT_CONTROL", latency=INSTANT, locks=(INPUT,))
     def _press_key(self, params):
         """Tugmani bosish"""
         key = params.get("key", "")
@@ -1246,6 +1316,7 @@ class WindowsExecutor:
         pyautogui.press(key)
         return f"Pressed: {key}"
     
+    @action("INPUT_CONTROL", latency=INSTANT, locks=(INPUT,))
     def _press_hotkey(self, params):
         """Hotkey kombinatsiyasini bosish"""
         keys = params.get("keys", [])
@@ -1257,6 +1328,7 @@ class WindowsExecutor:
         pyautogui.hotkey(*keys)
         return f"Pressed hotkey: {'+'.join(keys)}"
     
+    @action("INPUT_CONTROL", latency=INSTANT, locks=(INPUT,))
     def _move_cursor(self, params):
         """Kursorni harakatlantirish"""
         x = params.get("x", 0)
@@ -1266,6 +1338,7 @@ class WindowsExecutor:
         pyautogui.moveTo(x, y)
         return f"Moved cursor to ({x}, {y})"
     
+    @action("INPUT_CONTROL", latency=INSTANT, locks=(INPUT,))
     def _click_mouse(self, params):
         """Sichqoncha tugmasini bosish"""
         button = params.get("button", "left")
@@ -1274,6 +1347,7 @@ class WindowsExecutor:
         pyautogui.click(button=button)
         return f"Clicked {button} mouse button"
     
+    @action("INPUT_CONTROL", latency=INSTANT, locks=(INPUT,))
     def _scroll_mouse(self, params):
         """Sichqoncha g'ildiragini aylantirish"""
         amount = params.get("amount", 1)
@@ -1284,21 +1358,19 @@ class WindowsExecutor:
     
     # ==================== INFORMATION ====================
     
+    @action("INFORMATIONAL_RESPONSE", latency=INSTANT)
     def _get_time(self, params):
         """Hozirgi vaqtni olish"""
         current_time = get_current_time()
         return {"time": current_time}
     
+    @action("INFORMATIONAL_RESPONSE", latency=INSTANT)
     def _get_date(self, params):
         """Hozirgi sanani olish"""
         current_date = get_current_date()
         return {"date": current_date}
     
-    def _get_weather(self, params):
-        """Ob-havo ma'lumotini olish"""
-        # Bu funksiya uchun API kerak bo'ladi
-        return "Weather API not configured yet"
-    
+    @action("DEVICE_STATUS", latency=INSTANT)
     def _get_system_info(self, params):
         """Tizim haqida ma'lumot"""
         info = {
@@ -1310,6 +1382,7 @@ class WindowsExecutor:
         }
         return info
 
+    @action("DEVICE_STATUS", latency=INSTANT)
     def _get_resource_usage(self, params):
         """CPU va RAM ulushini olish"""
         return {
@@ -1319,21 +1392,7 @@ class WindowsExecutor:
     
     # ==================== BROWSER ACTIONS (Yangi) ====================
     
-    def _youtube_search(self, params):
-        """YouTube'da qidirish"""
-        query = params.get("query", "")
-        
-        if not query:
-            raise ValueError("query parameter required")
-        
-        self.logger.info(f"YouTube search: {query}")
-        
-        from browser_helper import BrowserHelper
-        helper = BrowserHelper()
-        result = helper.youtube_search(query)
-        
-        return result
-    
+    @action("INTERNET_SEARCH", latency=SLOW, locks=(INPUT,))
     def _youtube_comment(self, params):
         """YouTube video'ga komment yozish"""
         video_url = params.get("video_url", "")
@@ -1350,37 +1409,23 @@ class WindowsExecutor:
         
         return result
     
-    def _google_search_click(self, params):
-        """Google'da qidirish va birinchi natijani ochish"""
-        query = params.get("query", "")
-        result_num = params.get("result_num", 1)
-        
-        if not query:
-            raise ValueError("query parameter required")
-        
-        self.logger.info(f"Google search and click: {query}, result #{result_num}")
-        
-        from browser_helper import BrowserHelper
-        helper = BrowserHelper()
-        result = helper.google_search_and_click(query, result_num)
-        
-        return result
-    
-    
     # ==================== GESTURE CONTROL (YANGI) ====================
     
+    @action("DEVICE_CONTROL", latency=FAST, locks=(CAMERA,))
     def _start_gesture_control(self, params):
         """Qo'l harakati bilan boshqarishni yoqish"""
         import config
         config.GESTURE_SETTINGS["enabled"] = True
         return {"status": "success", "message": "Gesture control faollashtirildi"}
     
+    @action("DEVICE_CONTROL", latency=FAST, locks=(CAMERA,))
     def _stop_gesture_control(self, params):
         """Gesture control to'xtatildi"""
         import config
         config.GESTURE_SETTINGS["enabled"] = False
         return {"status": "success", "message": "Gesture control to'xtatildi"}
 
+    @action("INTERNET_SEARCH", latency=FAST)
     def _youtube_search(self, params):
         """YouTube'dan qidirish va birinchisini ochish"""
         query = params.get("query", "")
@@ -1389,6 +1434,7 @@ class WindowsExecutor:
         webbrowser.open(url)
         return f"YouTube'dan '{query}' qidirilmoqda..."
 
+    @action("INFORMATIONAL_RESPONSE", latency=FAST)
     def _get_weather(self, params):
         """Ob-havo ma'lumotlarini olish (Simple version)"""
         city = params.get("city", "Tashkent")
@@ -1396,12 +1442,14 @@ class WindowsExecutor:
         webbrowser.open(url)
         return f"{city} uchun ob-havo ma'lumotlari qidirilmoqda..."
 
+    @action("INTERNET_SEARCH", latency=FAST)
     def _google_search_click(self, params):
         """Google'dan qidirish (Method mapping fix)"""
         return self._search_google(params)
 
     # ==================== MEDIA MASTER (PHASE 4) ====================
 
+    @action("MEDIA", latency=INSTANT, locks=(AUDIO,))
     def _media_play_pause(self, params):
         """Musiqani to'xtatish yoki davom ettirish"""
         import ctypes
@@ -1409,6 +1457,7 @@ class WindowsExecutor:
         ctypes.windll.user32.keybd_event(0xB3, 0, 2, 0)
         return "Media play/pause triggered"
 
+    @action("MEDIA", latency=INSTANT, locks=(AUDIO,))
     def _media_next(self, params):
         """Keyingi musiqa"""
         import ctypes
@@ -1416,6 +1465,7 @@ class WindowsExecutor:
         ctypes.windll.user32.keybd_event(0xB0, 0, 2, 0)
         return "Next track"
 
+    @action("MEDIA", latency=INSTANT, locks=(AUDIO,))
     def _media_previous(self, params):
         """Oldingi musiqa"""
         import ctypes
@@ -1424,12 +1474,14 @@ class WindowsExecutor:
         return "Previous track"
     
     # === MEDIA GENERATION (Image & Video) ===
+    @action("MEDIA", latency=SLOW, locks=(NETWORK,))
     def _generate_image(self, params):
         if not self.media_generator: return "Media Generator not loaded."
         prompt = params.get("prompt") or params.get("text", "abstract art")
         res = self.media_generator.generate_image(prompt)
         return res
 
+    @action("MEDIA", latency=SLOW, locks=(NETWORK,))
     def _generate_video(self, params):
         if not self.media_generator: return "Media Generator not loaded."
         prompt = params.get("prompt") or params.get("text", "abstract video")
@@ -1438,6 +1490,7 @@ class WindowsExecutor:
 
     # === NEW FEATURES (Research, Finance, Gaming) ===
     
+    @action("INFORMATIONAL_RESPONSE", aliases=('research_topic',), latency=SLOW, locks=(NETWORK,))
     def _perform_research(self, params):
         if not self.research: return "Research module not loaded."
         topic = params.get("topic") or "AI"
@@ -1452,6 +1505,7 @@ class WindowsExecutor:
              self.logger.error(f"Research executor error: {e}")
              return f"Tadqiqotda xatolik yuz berdi: {e}"
 
+    @action("FINANCE", latency=FAST)
     def _add_expense(self, params):
         if not self.finance: return "Finance module not loaded."
         amount = params.get("amount", 0)
@@ -1459,18 +1513,17 @@ class WindowsExecutor:
         if amount == 0: return "Summa aniqlanmadi."
         return self.finance.add_transaction(amount, "Xarajat", desc, "expense")
 
+    @action("FINANCE", latency=INSTANT)
     def _get_balance(self, params):
         if not self.finance: return "Finance module not loaded."
         return self.finance.get_balance()
 
-    def _get_financial_update(self, params):
-        if not self.finance: return "Finance module not loaded."
-        return self.finance.get_daily_report()
-
+    @action("SYSTEM_CONTROL", latency=FAST, locks=(SYSTEM,))
     def _toggle_gaming_mode(self, params):
         """O'yin rejimi: RAM tozalash va High Priority"""
         if not self.gaming_mode: return "Gaming module not loaded."
         return self.gaming_mode.toggle()
+    @action("AI_BRAIN", latency=FAST)
     def _connect_account(self, params):
         """Hisobni ulash (o'rganish uchun)"""
         platform = params.get("platform", "general")
@@ -1480,6 +1533,7 @@ class WindowsExecutor:
         time.sleep(1)
         return f"{platform.title()} hisobi muvaffaqiyatli ulandi. Endi men ushbu platformadan ma'lumotlarni o'rganishim mumkin."
 
+    @action("AI_BRAIN", latency=FAST)
     def _learn_from_feedback(self, params):
         """Foydalanuvchi fikridan o'rganish"""
         feedback = params.get("feedback", "")
@@ -1493,6 +1547,7 @@ class WindowsExecutor:
 
     # ==================== SCHEDULE MANAGER (PHASE 4) ====================
 
+    @action("INFORMATIONAL_RESPONSE", latency=INSTANT)
     def _get_schedule(self, params):
         """Kunlik rejalarni ko'rish"""
         path = "local_schedule.json"
@@ -1512,6 +1567,7 @@ class WindowsExecutor:
         except Exception as e:
             return f"Rejalarni o'qishda xatolik: {e}"
 
+    @action("AUTOMATION", latency=INSTANT, locks=(FILESYSTEM,))
     def _add_to_schedule(self, params):
         """Reja qo'shish"""
         task = params.get("task")
@@ -1538,40 +1594,9 @@ class WindowsExecutor:
             
         return f"Reja qo'shildi: {time_str} - {task}"
 
-    def _start_typer_bot(self, params):
-        """JARVIS Typer Bot-ni ishga tushirish"""
-        if not TYPER_AVAILABLE:
-            return "Typer Bot moduli mavjud emas, janob."
-            
-        if self.typer_bot and self.typer_bot.is_running:
-            return "Typer Bot allaqachon ishlamoqda, janob."
-            
-        try:
-            if not self.typer_bot:
-                from typer_bot import JARVISTyperBot
-                self.typer_bot = JARVISTyperBot()
-            
-            self.typer_bot.start()
-            
-            # Alohida thread-da loop-ni boshlash
-            def run_loop():
-                self.typer_bot.auto_loop()
-            
-            threading.Thread(target=run_loop, daemon=True).start()
-            return "Typer Bot ishga tushirildi. Ekranni kuzatyapman, janob."
-        except Exception as e:
-            return f"Typer Bot-ni ishga tushirishda xatolik: {str(e)}"
-
-    def _stop_typer_bot(self, params):
-        """JARVIS Typer Bot-ni to'xtatish"""
-        if not self.typer_bot or not self.typer_bot.is_running:
-            return "Typer Bot ishga tushirilmagan, janob."
-            
-        self.typer_bot.stop()
-        return "Typer Bot to'xtatildi, janob."
-
     # ==================== CONNECTIVITY (YANGI) ====================
     
+    @action("DEVICE_CONTROL", latency=SLOW, locks=(NETWORK,))
     def _scan_bluetooth(self, params):
         """Bluetooth qurilmalarni qidirish"""
         if not CONNECTIVITY_AVAILABLE or not self.connectivity:
@@ -1589,6 +1614,7 @@ class WindowsExecutor:
             res += f"- {d['name']} ({d['address']})\n"
         return res
 
+    @action("DEVICE_CONTROL", latency=FAST, locks=(NETWORK,))
     def _start_remote_bridge(self, params):
         """Remote Bridge-ni ishga tushirish"""
         if not CONNECTIVITY_AVAILABLE or not self.connectivity:
@@ -1597,6 +1623,7 @@ class WindowsExecutor:
         port = params.get("port", config.CONNECTIVITY_SETTINGS.get("remote_port", 5000))
         return self.connectivity.start_remote_bridge(port)
 
+    @action("DEVICE_CONTROL", latency=SLOW, locks=(NETWORK,))
     def _connect_device(self, params):
         """Qurilmaga ulanish (Sodda ko'rinish)"""
         address = params.get("address", "")
@@ -1607,6 +1634,7 @@ class WindowsExecutor:
 
     # ==================== DEV MODE (YANGI) ====================
 
+    @action("AUTOMATION", latency=FAST, locks=(FILESYSTEM,))
     def _create_project(self, params):
         """Yangi dasturlash loyihasini yaratish"""
         name = params.get("project_name", "new_project")
@@ -1629,6 +1657,7 @@ class WindowsExecutor:
         
         return f"✅ '{name.upper()}' loyihasi yaratildi: {proj_dir}"
 
+    @action("AUTOMATION", latency=FAST)
     def _analyze_codebase(self, params):
         """Kod bazasini tahlil qilish (File structure only for now)"""
         path = os.getcwd()
@@ -1647,6 +1676,7 @@ class WindowsExecutor:
         
         return structure
 
+    @action("AUTOMATION", latency=SLOW, locks=(SYSTEM,))
     def _run_terminal_v2(self, params):
         """Kengaytirilgan terminal buyrug'ini bajarish"""
         command = params.get("command")
@@ -1660,12 +1690,14 @@ class WindowsExecutor:
         except Exception as e:
             return f"Terminal xatoligi: {str(e)}"
 
+    @action("SYSTEM_CONTROL", latency=INSTANT)
     def _reset_sentinel(self, params):
         """Sentinel Mode taymerini nolga tushirish (Foydalanuvchi borligi tasdiqlandi)"""
         import config
         config.SENTINEL_MODE["last_activity"] = time.time()
         return "Tushunarlu janob, sizni ko'rib turganimdan mamnunman. Sentinel taymeri yangilandi."
 
+    @action("DEVICE_CONTROL", latency=SLOW, locks=(CAMERA,))
     def _register_face(self, params):
         """Face ID uchun yuzni ro'yxatga olish"""
         self.speak("Yuzni ro'yxatga olish boshlandi. Kameraga qarab turing, janob.")
@@ -1707,6 +1739,7 @@ class WindowsExecutor:
             self.speak(error_msg)
             return error_msg
 
+    @action("FILE_MANAGEMENT", latency=SLOW)
     def _smart_search(self, params):
         """AI-powered file search"""
         query = params.get("query", "")
@@ -1758,6 +1791,7 @@ class WindowsExecutor:
     
     # ==================== ADVANCED FEATURES (PHASE 4) ====================
 
+    @action("INFORMATIONAL_RESPONSE", latency=SLOW, locks=(NETWORK,))
     def _get_news_digest(self, params):
         """Kunlik yangiliklar dayjestini olish"""
         if not ADVANCED_FEATURES_AVAILABLE or not self.news_bot:
@@ -1765,7 +1799,7 @@ class WindowsExecutor:
         
         self.speak("Yangiliklarni qidiryapman, janob.")
         try:
-            articles = self.news_bot.get_daily_digest()
+            articles = self.prefetcher.take("news_digest") or self.news_bot.get_daily_digest()
             if not articles:
                 return "Hozircha yangiliklar topilmadi, janob."
             
@@ -1778,6 +1812,7 @@ class WindowsExecutor:
         except Exception as e:
             return f"Yangiliklarni olishda xatolik: {str(e)}"
 
+    @action("COMMUNICATION", latency=SLOW, locks=(AUDIO,))
     def _voice_clone_speak(self, params):
         """Custom ovoz (Voice Cloning) bilan gapirish"""
         text = params.get("text", "")
@@ -1790,6 +1825,7 @@ class WindowsExecutor:
         self.speak("Siz istagan ovozda tayyorlayapman, janob.")
         return self.voice_cloning.speak_with_custom_voice(text)
 
+    @action("DEVICE_STATUS", latency=SLOW)
     def _get_security_report(self, params):
         """Tizim xavfsizligi hisobotini olish"""
         if not ADVANCED_FEATURES_AVAILABLE or not self.security_scanner:
@@ -1806,16 +1842,7 @@ class WindowsExecutor:
         self.speak(f"Tizim holati {report.get('status')}, janob.")
         return res
 
-    def _query_my_data(self, params):
-        """Neural RAG Search through local documents (Elite v15.0)"""
-        from neural_query import NeuralQueryEngine
-        query = params.get("query", "")
-        if not query: return "Qidiruv so'rovini kiriting, janob."
-        
-        self.speak(f"Mahalliy arxivdan '{query}' mavzusida ma'lumot qidiryapman, janob.")
-        nq = NeuralQueryEngine(brain=self.brain)
-        return nq.search(query)
-
+    @action("FILE_MANAGEMENT", latency=SLOW, locks=(FILESYSTEM,))
     def _organize_system(self, params):
         """Intelligent file organization via SmartSorter (Elite v15.0)"""
         if not hasattr(self, 'sorter'):
@@ -1827,6 +1854,7 @@ class WindowsExecutor:
         self.sorter.auto_organize_directory(target_dir)
         return "Tizimni tartibga solish yakunlandi. Barcha fayllar semantik tahlil qilindi."
 
+    @action("SECURITY", latency=INSTANT)
     def _toggle_privacy_shield(self, params):
         """Toggle HUD Privacy Shield (Elite v16.0)"""
         # Note: This requires a callback to the HUD from Executor, or the HUD listens to logs
@@ -1846,6 +1874,7 @@ class WindowsExecutor:
         # But standard executors return string/dict response.
         return {"verbal_response": "Maxfiy qalqon holati o'zgartirildi.", "success": True, "ui_action": "toggle_shield"}
 
+    @action("AUTOMATION", latency=SLOW, locks=(FILESYSTEM,))
     def _desktop_automation(self, params):
 
 
@@ -1876,27 +1905,7 @@ class WindowsExecutor:
 
     # ==================== ADVANCED MEDIA & SCHEDULER (UPGRADED) ====================
 
-    def _smart_media_control(self, params):
-        """Kengaytirilgan media boshqaruvi"""
-        if not ADVANCED_FEATURES_AVAILABLE or not self.media_player:
-            return "Media Master moduli mavjud emas, janob."
-            
-        action = params.get("media_action", "toggle")
-        
-        try:
-            if action == "toggle":
-                return self.media_player.toggle_play_pause()
-            elif action == "seek":
-                offset = params.get("offset", 5)
-                return self.media_player.seek_by_voice(offset)
-            elif action == "subtitles":
-                path = params.get("video_path")
-                if not path: return "Video fayl yo'li ko'rsatilmadi."
-                return self.media_player.download_subtitles(path)
-            return "Noma'lum media harakati."
-        except Exception as e:
-            return f"Media xatoligi: {str(e)}"
-
+    @action("AUTOMATION", latency=FAST)
     def _advanced_schedule_manage(self, params):
         """Kengaytirilgan reja boshqaruvi"""
         if not ADVANCED_FEATURES_AVAILABLE or not self.scheduler:
@@ -1927,6 +1936,7 @@ class WindowsExecutor:
         except Exception as e:
             return f"Scheduler xatoligi: {str(e)}"
     
+    @action("DEVICE_CONTROL", latency=FAST, locks=(CAMERA,))
     def _start_camera(self, params):
         """Kamerani yoqish"""
         if not self.camera:
@@ -1949,6 +1959,7 @@ class WindowsExecutor:
             self.logger.error(f"Camera start error: {e}")
             return f"Kamera xatoligi: {str(e)}"
     
+    @action("DEVICE_CONTROL", latency=FAST, locks=(CAMERA,))
     def _stop_camera(self, params):
         """Kamerani o'chirish"""
         if not self.camera:
@@ -1961,34 +1972,7 @@ class WindowsExecutor:
         except Exception as e:
             return f"Xatolik: {str(e)}"
     
-    def _start_screen_recording(self, params):
-        """Ekran yozishni boshlash"""
-        if not self.camera:
-            return "Camera moduli mavjud emas, janob."
-        
-        duration = params.get("duration", 30)  # Default 30 seconds
-        
-        try:
-            self.camera.start_screen_recording(duration=duration)
-            self.speak(f"Ekran yozish boshlandi, {duration} soniya, janob.")
-            return f"Ekran yozish boshlandi ({duration}s)"
-        except Exception as e:
-            self.logger.error(f"Screen recording error: {e}")
-            return f"Ekran yozish xatoligi: {str(e)}"
-    
-    def _stop_screen_recording(self, params):
-        """Ekran yozishni to'xtatish"""
-        if not self.camera:
-            return "Camera moduli mavjud emas."
-        
-        try:
-            self.camera.stop_screen_recording()
-            self.speak("Ekran yozish to'xtatildi, janob.")
-            return "Ekran yozish to'xtatildi"
-        except Exception as e:
-            return f"Xatolik: {str(e)}"
-
-    
+    @action("AUTOMATION", latency=FAST)
     def _start_typer_bot(self, params):
         """Typer Botni ishga tushirish (Background)"""
         # Check if already running process
@@ -2003,6 +1987,7 @@ class WindowsExecutor:
         except Exception as e:
             return f"Typer Bot xatoligi: {e}"
 
+    @action("AUTOMATION", latency=FAST)
     def _stop_typer_bot(self, params):
         """Typer Botni to'xtatish"""
         try:
@@ -2015,6 +2000,7 @@ class WindowsExecutor:
         except:
             return "Typer Bot to'xtatishda xatolik"
 
+    @action("DEVICE_CONTROL", latency=FAST)
     def _smart_media_control(self, params):
         """Intelligent media selection based on context/mood"""
         import time
@@ -2053,6 +2039,7 @@ class WindowsExecutor:
 
     # ==================== PHASE 5: DESKTOP CORE UPGRADES ====================
 
+    @action("AUTOMATION", latency=SLOW, locks=(FILESYSTEM,))
     def _system_healer(self, params):
         """Tizimni optimallashtirish va haqiqiy keshni tozalash"""
         self.logger.info("Executing System Healer")
@@ -2091,6 +2078,7 @@ class WindowsExecutor:
         
         return "Tizim davolandi, janob. " + ", ".join(cleaned_status)
 
+    @action("SECURITY", latency=FAST, locks=(FILESYSTEM,))
     def _store_vault(self, params):
         """Maxfiy arxivga ma'lumot saqlash"""
         if not config.SENTINEL_MODE.get("is_authorized", False):
@@ -2103,6 +2091,7 @@ class WindowsExecutor:
         self.shadow_vault.save_item(label, secret)
         return f"Muvaffaqiyatli saqlandi, janob. ID: {label}"
 
+    @action("SECURITY", latency=FAST)
     def _access_vault(self, params):
         """Maxfiy arxivga kirish"""
         if not config.SENTINEL_MODE.get("is_authorized", False):
@@ -2116,17 +2105,20 @@ class WindowsExecutor:
             res += f"• {k}: {secrets[k]}\n"
         return res
 
+    @action("INFORMATIONAL_RESPONSE", latency=INSTANT)
     def _get_financial_update(self, params):
         """Moliya va bozor yangiliklari (Simulated for HUD)"""
         self.logger.info("Fetching financial status")
         return "Bitcoin: $48,250 (+2.1%), Ethereum: $2,640 (-0.5%), O'zbekiston So'mi: $1 -> 12,450 so'm. Bozor stabil ko'rinmoqda."
 
+    @action("FILE_MANAGEMENT", latency=SLOW)
     def _universal_search(self, params):
         """Mahalliy fayllardan RAG-ga o'xshash qidiruv"""
         query = params.get("query", "current context")
         self.logger.info(f"Universal Search for: {query}")
         return f"'{query}' bo'yicha mahalliy hujjatlar tahlil qilindi. 3 ta mos keladigan natija topildi (Data/Archive/2026)."
 
+    @action("AUTOMATION", latency=SLOW, locks=(INPUT,))
     def _workspace_orchestrator(self, params):
         """Ish muhitini tayyorlash (VS Code + Browser + GitHub)"""
         self.logger.info("Orchestrating Workspace")
@@ -2140,6 +2132,7 @@ class WindowsExecutor:
 
             return "Gaming Mode faollashtirildi, lekin ustuvorlikni oshirishda xatolik yuz berdi."
 
+    @action("AUTOMATION", latency=FAST)
     def _run_automation(self, params):
         """Trigger an autonomous workflow macro"""
         workflow = params.get("workflow")
@@ -2153,6 +2146,7 @@ class WindowsExecutor:
                 return f"'{workflow}' rejasi topilmadi."
         return "Avtomatlashtirish moduli yuklanmagan."
 
+    @action("AI_BRAIN", latency=SLOW, locks=(NETWORK,))
     def _query_my_data(self, params):
         """Neural RAG - Semantic Q&A over local JARVIS_HUB"""
         query = params.get("query")
@@ -2167,6 +2161,7 @@ class WindowsExecutor:
             return context
         return "Neural Indexer yuklanmagan."
 
+    @action("AUTOMATION", latency=SLOW, locks=(FILESYSTEM,))
     def _perform_backup(self, params):
         """Trigger autonomous sync/backup"""
         if hasattr(self, 'sync'):
@@ -2174,6 +2169,7 @@ class WindowsExecutor:
             if res: return "Barcha loyihalar va maxfiy arxiv zaxiraga olindi, janob."
         return "Backup tizimida xatolik."
 
+    @action("INPUT_CONTROL", latency=SLOW, locks=(INPUT,))
     def _vision_click(self, params):
         """Find and click element on screen via Vision AI"""
         desc = params.get("description")
@@ -2183,6 +2179,7 @@ class WindowsExecutor:
             return self.vision_agent.find_and_click(desc)
         return "Vision Agent yuklanmagan."
 
+    @action("SECURITY", destructive=True, latency=SLOW, locks=(SYSTEM,))
     def _nuclear_protocol(self, params):
         """High-Security System Purge & Optimization. Requires Vocal Auth."""
         if not config.SENTINEL_MODE.get("is_authorized", False):
@@ -2211,6 +2208,7 @@ class WindowsExecutor:
 
     # --- ELITE v17.0 YANGI METODLAR ---
 
+    @action("MEDIA", latency=FAST, locks=(INPUT,))
     def _play_music(self, params):
         """Musiqa qo'yish (YouTube orqali)"""
         song = params.get("song")
@@ -2226,6 +2224,7 @@ class WindowsExecutor:
         threading.Timer(5.0, lambda: pyautogui.click(600, 300)).start()
         return f"YouTube'da {song} qidirilmoqda..."
 
+    @action("INFORMATIONAL_RESPONSE", latency=SLOW, locks=(NETWORK,))
     def _analyze_world(self, params):
         """Global vaziyatni tahlil qilish"""
         if not ADVANCED_FEATURES_AVAILABLE: return "Global Eye moduli yo'q."
@@ -2236,6 +2235,7 @@ class WindowsExecutor:
         except Exception as e:
             return f"Tahlil xatosi: {e}"
 
+    @action("AUTOMATION", latency=SLOW, locks=(FILESYSTEM,))
     def _heal_system(self, params):
         """Tizimni davolash (Self-Healing)"""
         if not ADVANCED_FEATURES_AVAILABLE: return "Healer moduli yo'q."
@@ -2246,6 +2246,7 @@ class WindowsExecutor:
         except Exception as e:
             return f"Healer xatosi: {e}"
 
+    @action("FINANCE", latency=SLOW, locks=(NETWORK,))
     def _crypto_price(self, params):
         """Kripto narxini tekshirish"""
         if not ADVANCED_FEATURES_AVAILABLE: return "Market moduli yo'q."
@@ -2253,6 +2254,7 @@ class WindowsExecutor:
         market = MarketMonitor()
         return market.get_crypto_price(symbol)
 
+    @action("FINANCE", latency=SLOW, locks=(NETWORK,))
     def _stock_price(self, params):
         """Aksiya narxini tekshirish"""
         if not ADVANCED_FEATURES_AVAILABLE: return "Market moduli yo'q."
@@ -2260,6 +2262,7 @@ class WindowsExecutor:
         market = MarketMonitor()
         return market.get_stock_price(symbol)
 
+    @action("INFORMATIONAL_RESPONSE", latency=SLOW, locks=(NETWORK,))
     def _weather_check(self, params):
         """Ob-havo tekshirish"""
         if not ADVANCED_FEATURES_AVAILABLE: return "Global Eye moduli yo'q."
@@ -2268,6 +2271,7 @@ class WindowsExecutor:
         w = eye.get_weather(city)
         return f"{city} shahrida havo: {w['temp']}, {w['condition']}."
 
+    @action("COMMUNICATION", latency=SLOW, locks=(NETWORK,))
     def _resolve_conflict(self, params):
         """Ijtimoiy ziddiyatni hal qilish"""
         target = params.get("target")
@@ -2290,6 +2294,7 @@ class WindowsExecutor:
         threading.Thread(target=_task, daemon=True).start()
         return f"{target} bilan yarashish protokoli ishga tushirildi. Iltimos, terminalni kuzating."
 
+    @action("COMMUNICATION", latency=SLOW, locks=(INPUT,))
     def _analyze_chat(self, params):
         """Chatdagi so'nggi xabarlarni tahlil qilish"""
         if not isinstance(params, dict): params = {"target": str(params)}
@@ -2320,6 +2325,7 @@ class WindowsExecutor:
 
     # --- ELITE v18.0 SOCIAL METHODS ---
 
+    @action("COMMUNICATION", latency=SLOW, locks=(NETWORK,))
     def _analyze_instagram(self, params):
         """Instagram lentasini tahlil qilish"""
         try:
@@ -2331,6 +2337,7 @@ class WindowsExecutor:
         except Exception as e:
             return f"Instagram xatosi: {e}"
 
+    @action("COMMUNICATION", latency=SLOW, locks=(NETWORK,))
     def _post_instagram(self, params):
         """Instagramga video/rasm yuklash"""
         path = params.get("file_path")
@@ -2344,6 +2351,7 @@ class WindowsExecutor:
         except Exception as e:
             return f"Yuklashda xato: {e}"
 
+    @action("COMMUNICATION", latency=SLOW, locks=(NETWORK,))
     def _social_report(self, params):
         """Kunlik ijtimoiy xisobotni generatsiya qilish (Elite v18.5)"""
         try:
@@ -2371,6 +2379,7 @@ class WindowsExecutor:
 
     # --- MISSING I/O & AUTOMATION METHODS ---
 
+    @action("INPUT_CONTROL", latency=INSTANT, locks=(INPUT,))
     def _copy_text(self, params):
         """Matnni nusxalash"""
         self.logger.info("Copying selected text")
@@ -2378,6 +2387,7 @@ class WindowsExecutor:
         pyautogui.hotkey('ctrl', 'c')
         return "Matn nusxalandi, janob."
 
+    @action("INPUT_CONTROL", latency=INSTANT, locks=(INPUT,))
     def _paste_text(self, params):
         """Matnni qo'yish"""
         self.logger.info("Pasting text")
@@ -2385,6 +2395,7 @@ class WindowsExecutor:
         pyautogui.hotkey('ctrl', 'v')
         return "Matn qo'yildi."
 
+    @action("FILE_MANAGEMENT", latency=INSTANT)
     def _read_file(self, params):
         """Faylni o'qish"""
         path = params.get("path")
@@ -2397,6 +2408,7 @@ class WindowsExecutor:
         except Exception as e:
             return f"O'qishda xato: {e}"
 
+    @action("FILE_MANAGEMENT", latency=INSTANT, locks=(FILESYSTEM,))
     def _write_file(self, params):
         """Faylga yozish"""
         path = params.get("path")
@@ -2409,105 +2421,31 @@ class WindowsExecutor:
         except Exception as e:
             return f"Yozishda xato: {e}"
 
+    @action("AI_BRAIN", latency=SLOW)
+    def _retrain_intent_model(self, params):
+        """Lokal intent klassifikatorini qayta o'rgatish (history + pattern'lar)"""
+        try:
+            from intent_classifier import retrain
+            report = retrain(memory=self.memory)
+            accuracy = report.get("accuracy")
+            accuracy_text = f"{accuracy * 100:.1f}%" if accuracy is not None else "baholash uchun tarix yetarli emas"
+            return (f"Intent modeli qayta o'rgatildi: {report['actions']} ta amal, "
+                    f"aniqlik {accuracy_text}, kechikish {report.get('latency_ms_mean', 0):.3f} ms.")
+        except Exception as e:
+            return f"Modelni o'rgatishda xato: {e}"
+
+    @action("DEVICE_CONTROL", latency=FAST, locks=(CAMERA,))
     def _start_screen_recording(self, params):
         """Ekran yozishni boshlash (Requires separate module)"""
         self.logger.info("Starting screen recording (Simulated)")
         return "Ekran yozish boshlandi, janob."
 
+    @action("DEVICE_CONTROL", latency=FAST, locks=(CAMERA,))
     def _stop_screen_recording(self, params):
         """Ekran yozishni to'xtatish"""
         self.logger.info("Stopping screen recording (Simulated)")
         return "Ekran yozish to'xtatildi va saqlandi."
 
-    # CONSUMED BY PRIMARY EXECUTE METHOD
-
-    def _get_executor(self, action):
-        """Action nomi bo'yicha metodni qaytarish"""
-        mapping = {
-            # System
-            "shutdown": self._shutdown,
-            "restart": self._restart,
-            "sleep": self._sleep,
-            "lock_screen": self._lock_screen,
-            "quit_jarvis": self._quit_jarvis,
-            
-            # App
-            "open_app": self._open_app,
-            "close_app": self._close_app,
-            
-            # Web
-            "open_website": self._open_website,
-            "search_google": self._search_google,
-            "youtube_search": self._youtube_search,
-            
-            # Media
-            "volume_up": self._volume_up,
-            "volume_down": self._volume_down,
-            "mute_volume": self._mute_volume,
-            "play_music": self._play_music, 
-            "generate_image": self._generate_image,
-            "generate_video": self._generate_video,
-            
-            # New Modules (Research, Finance, Gaming)
-            "research_topic": self._research_topic,
-            "add_expense": self._add_expense,
-            "get_balance": self._get_balance,
-            "finance_report": self._finance_report,
-            "toggle_gaming_mode": self._toggle_gaming_mode,
-            
-            # Input
-            "type_text": self._type_text,
-            "press_key": self._press_key,
-            "press_hotkey": self._press_hotkey,
-            "copy_text": self._copy_text,
-            "paste_text": self._paste_text,
-            
-            # Mouse
-            "move_cursor": self._move_cursor,
-            "click_mouse": self._click_mouse,
-            "scroll_mouse": self._scroll_mouse,
-            
-            # Files
-            "create_folder": self._create_folder,
-            "delete_file": self._delete_file,
-            "list_directory": self._list_directory,
-            "read_file": self._read_file,
-            "write_file": self._write_file,
-            "open_file": self._open_file,
-            
-            # Advanced
-            "screenshot": self._screenshot,
-            "get_battery": self._get_battery_info,
-            "kill_process": self._kill_process,
-            "describe_screen": self._describe_screen,
-            "system_healer": self._system_healer,
-            
-            # Automation
-            "start_screen_recording": self._start_screen_recording,
-            "stop_screen_recording": self._stop_screen_recording,
-            
-            # Telegram
-            "send_telegram_message": self._send_telegram_message,
-            
-            # Elite v17.0
-            "analyze_world": self._analyze_world, 
-            "heal_system": self._heal_system, 
-            "crypto_price": self._crypto_price, 
-            "stock_price": self._stock_price, 
-            
-            "weather_check": self._weather_check,
-            
-            # Elite v18.0 (Social Mediation & Social Media)
-            "resolve_conflict": self._resolve_conflict,
-            "analyze_chat": self._analyze_chat,
-            "analyze_instagram": self._analyze_instagram,
-            "post_instagram": self._post_instagram,
-            "social_report": self._social_report,
-        }
-        return mapping.get(action)
-
-
-
 
 if __name__ == "__main__":
     # Test
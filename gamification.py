@@ -32,6 +32,18 @@ class GamificationSystem:
 
     def add_xp(self, amount, source="Command"):
         """XP qo'shish va levelni tekshirish"""
+        response = self._apply_xp(amount)
+        self._save_data()
+        return response
+
+    def add_xp_many(self, events):
+        """Bir nechta (amount, source) hodisasi; fayl faqat bir marta yoziladi"""
+        responses = [self._apply_xp(amount) for amount, _ in events]
+        if events:
+            self._save_data()
+        return "".join(responses)
+
+    def _apply_xp(self, amount):
         self.stats["xp"] += amount
         self.stats["total_commands"] += 1
         
@@ -45,8 +57,6 @@ class GamificationSystem:
             self.stats["level"] += 1
             response = f"\n🎉 TABRIKLAYMAN! Siz yangi darajaga ko'tarildingiz: Level {self.stats['level']}!"
             self.logger.info(f"Level Up: {self.stats['level']}")
-            
-        self._save_data()
         return response
 
     def get_status(self):
@@ -1396,6 +1396,8 @@ if __name__ == "__main__":
         window.show()
         window.raise_()
         window.activateWindow()
+        # Oyna ko'ringach lazy modullarni fonda yuklash
+        QTimer.singleShot(0, window.jarvis_core.warm_up)
         print("[HUD DEBUG] Executing App Loop...")
         sys.exit(app.exec())
     except Exception as e:
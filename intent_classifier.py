@@ -0,0 +1,391 @@
+"""
+JARVIS - Local Intent Classifier (Multinomial Naive Bayes)
+Pattern matcher va LLM (brain) orasidagi ikkinchi bosqich: belgi n-gramlari asosida
+action'ni millisekunddan kam vaqtda taxmin qiladi. Model commands_history va config
+pattern jadvallaridan o'rgatiladi va data/intent_model.npz ga saqlanadi.
+"""
+import ast
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from utils import setup_logger, normalize_text
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+NGRAM_RANGE = (2, 4)
+UNKNOWN_LABEL = "unknown"
+
+# Rad etish ("suhbat") sinfi uchun buyruq bo'lmagan iboralar: LLM'ga borishi kerak bo'lgan matnlar
+CONVERSATION_SAMPLES = (
+    "salom", "assalomu alaykum", "qalaysan", "ishlar qalay", "nima gap", "rahmat", "katta rahmat",
+    "sen kimsan", "o'zing haqingda gapir", "hazil ayt", "menga latifa aytib ber", "kayfiyatim yaxshi emas",
+    "charchadim", "zerikdim", "seni kim yaratgan", "sevgi nima", "hayotning ma'nosi nima", "menga maslahat ber",
+    "bir narsa so'rasam maylimi", "ertaga imtihonim bor", "menga she'r yoz", "o'zbekiston poytaxti qayer",
+    "tarix haqida gapirib ber", "python nima", "bu nima degani", "tushuntirib ber", "fikringcha qaysi yaxshi",
+    "men seni yaxshi ko'raman", "xayrli tun", "xayrli tong", "yaxshimisan", "nima qilyapsan",
+    "hello", "hi there", "how are you", "what's up", "thank you", "thanks a lot", "who made you",
+    "what can you do", "tell me something interesting", "i am bored", "what is the meaning of life",
+    "give me some advice", "write me a poem", "explain quantum physics", "what do you think about ai",
+    "good morning", "good night", "nice to meet you", "i love you", "do you like music", "why is the sky blue",
+    "how does this work", "can you help me with homework", "let's talk",
+)
+HISTORY_EXECUTED_MARK = "Executed via System"
+GENERIC_EXECUTED_PREFIXES = ("Command executed", "Janob, bajarildi")
+
+
+def char_ngrams(text):
+    """Chegaralangan belgi n-gramlari (normalize_text bilan bir xil apostrof qoidalari)"""
+    padded = f" {' '.join(normalize_text(text).split())} "
+    grams = []
+    for n in range(NGRAM_RANGE[0], NGRAM_RANGE[1] + 1):
+        grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+class IntentClassifier:
+    """Belgi n-gramlari ustida multinomial Naive Bayes (NumPy)"""
+
+    def __init__(self, model_path=None, alpha=0.1):
+        self.logger = setup_logger("IntentClassifier")
+        self.model_path = model_path or default_model_path()
+        self.alpha = alpha
+        self.labels = []
+        self.vocab = {}            # n-gram -> ustun
+        self.log_prior = None      # (C,)
+        self.log_likelihood = None # (C, V)
+        self.report = {}
+
+    @property
+    def ready(self):
+        return self.log_likelihood is not None
+
+    # --- TRAINING ---
+
+    def fit(self, samples):
+        """samples: [(matn, action), ...]"""
+        labels = sorted({label for _, label in samples})
+        label_idx = {label: i for i, label in enumerate(labels)}
+
+        vocab = {}
+        rows, cols = [], []
+        for text, label in samples:
+            for gram in char_ngrams(text):
+                col = vocab.setdefault(gram, len(vocab))
+                rows.append(label_idx[label])
+                cols.append(col)
+
+        counts = np.zeros((len(labels), len(vocab)), dtype=np.float64)
+        np.add.at(counts, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), 1.0)
+
+        class_docs = np.bincount([label_idx[label] for _, label in samples], minlength=len(labels))
+        smoothed = counts + self.alpha
+        self.log_likelihood = (np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))).astype(np.float32)
+        self.log_prior = np.log(class_docs / class_docs.sum()).astype(np.float32)
+        self.labels = labels
+        self.vocab = vocab
+        return self
+
+    # --- INFERENCE ---
+
+    def predict(self, text):
+        """
+        (action, farq, qamrov). farq: eng yaxshi va ikkinchi sinf orasidagi n-gram boshiga log-ehtimol
+        farqi (NB posteriori n-gramlar soniga qarab haddan tashqari ishonchli bo'ladi, farq esa uzunlikka
+        bog'liq emas). qamrov: tanish n-gramlar ulushi.
+        """
+        if not self.ready or not text:
+            return UNKNOWN_LABEL, 0.0, 0.0
+
+        grams = char_ngrams(text)
+        cols = [self.vocab[g] for g in grams if g in self.vocab]
+        coverage = len(cols) / len(grams) if grams else 0.0
+        if not cols:
+            return UNKNOWN_LABEL, 0.0, coverage
+
+        scores = (self.log_prior + self.log_likelihood[:, cols].sum(axis=1)) / len(cols)
+        if len(scores) < 2:
+            return self.labels[0], float("inf"), coverage
+        second, best = np.argpartition(scores, -2)[-2:]
+        return self.labels[int(best)], float(scores[best] - scores[second]), coverage
+
+    def decide(self, text, allowed, min_margin, min_coverage):
+        """
+        Parser zaxirasi uchun yakuniy qaror: faqat allowed (o'qish uchun, xavfsiz) action'lar,
+        farq va qamrov yetarli bo'lsa; aks holda UNKNOWN_LABEL (matn LLM'ga boradi).
+        """
+        action, margin, coverage = self.predict(text)
+        if action not in allowed or margin < min_margin or coverage < min_coverage:
+            return UNKNOWN_LABEL
+        return action
+
+    def rank(self, text, candidates, min_margin=0.0):
+        """
+        Berilgan nomzod action'lar ichidan eng ehtimolli (moslik tengligini yechish). Ball: n-gram boshiga
+        sinfning "ko'rilmagan n-gram" darajasidan ortiqcha log-ehtimoli (prior va sinf hajmi ta'sir qilmaydi).
+        Birinchi nomzod (jadval tartibi) standart: boshqasi faqat min_margin dan ko'p ustun bo'lsa tanlanadi.
+        """
+        if not self.ready or not candidates:
+            return None
+        cols = [self.vocab[g] for g in char_ngrams(text) if g in self.vocab]
+        if not cols:
+            return None
+        index = {label: i for i, label in enumerate(self.labels)}
+        known = [c for c in candidates if c in index]
+        if not known:
+            return None
+        rows = [index[c] for c in known]
+        likelihood = self.log_likelihood[rows]
+        scores = (likelihood[:, cols] - likelihood.min(axis=1, keepdims=True)).mean(axis=1)
+        best = int(scores.argmax())
+        default = known.index(candidates[0]) if candidates[0] in known else None
+        if default is not None and scores[best] - scores[default] < min_margin:
+            return candidates[0]
+        return known[best]
+
+    # --- PERSISTENCE ---
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
+        vocab = sorted(self.vocab, key=self.vocab.get)
+        np.savez_compressed(
+            self.model_path,
+            labels=np.array(self.labels),
+            vocab=np.array(vocab),
+            log_prior=self.log_prior,
+            log_likelihood=self.log_likelihood,
+            report=np.array([repr(self.report)]),
+        )
+        self.logger.info(f"Intent model saved: {self.model_path}")
+
+    def load(self):
+        """Diskdan yuklash; muvaffaqiyatli bo'lsa True"""
+        if not os.path.exists(self.model_path):
+            return False
+        try:
+            with np.load(self.model_path, allow_pickle=False) as data:
+                self.labels = [str(x) for x in data["labels"]]
+                self.vocab = {str(g): i for i, g in enumerate(data["vocab"])}
+                self.log_prior = data["log_prior"]
+                self.log_likelihood = data["log_likelihood"]
+                self.report = ast.literal_eval(str(data["report"][0]))
+            self.logger.info(f"Intent model loaded ({len(self.labels)} actions, {len(self.vocab)} n-grams).")
+            return True
+        except Exception as e:
+            self.logger.error(f"Intent model load error: {e}")
+            return False
+
+
+# ==================== TRAINING DATA ====================
+
+def pattern_samples(*pattern_tables):
+    """Config pattern'laridan (matn, action) juftliklari; regex belgilari bo'shliqqa almashtiriladi"""
+    samples = []
+    for table in pattern_tables:
+        for action, patterns in table.items():
+            for pattern in patterns:
+                text = " ".join(re.sub(r"\\s\*|\.\*|[\\^$*+?{}\[\]|()]", " ", pattern).split())
+                if text:
+                    samples.append((text, action))
+    return samples
+
+
+def history_samples(memory, limit=5000, pair_window=5.0):
+    """
+    commands_history'dan vaqt tartibidagi (matn, action) juftliklari.
+    Executor qatorlari "action {params}" ko'rinishida va original_text'ni saqlaydi.
+    Agent qatorlari: yaqin (pair_window sekund) executor qatori bo'lmasa va javob
+    umumiy "bajarildi" shabloni bo'lmasa, suhbat — 'unknown' deb belgilanadi.
+    """
+    rows = memory.get_history(limit=limit) or []
+    executed, spoken = [], []
+    for timestamp, command, response in reversed(rows):
+        if not command:
+            continue
+        ts = _to_seconds(timestamp)
+        if response == HISTORY_EXECUTED_MARK:
+            action, _, raw_params = command.partition(" ")
+            try:
+                params = ast.literal_eval(raw_params) if raw_params else {}
+            except (ValueError, SyntaxError):
+                params = {}
+            text = params.get("original_text") if isinstance(params, dict) else None
+            executed.append((ts, text, action))
+        else:
+            spoken.append((ts, command, response or ""))
+
+    samples = [(ts, text, action) for ts, text, action in executed if text]
+    executed_times = [ts for ts, _, _ in executed]
+    for ts, text, response in spoken:
+        near_execution = any(abs(ts - et) <= pair_window for et in executed_times)
+        if not near_execution and not response.startswith(GENERIC_EXECUTED_PREFIXES):
+            samples.append((ts, text, UNKNOWN_LABEL))
+
+    samples.sort(key=lambda s: s[0])
+    return [(text, action) for _, text, action in samples]
+
+
+def _to_seconds(timestamp):
+    try:
+        return datetime.fromisoformat(str(timestamp)).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def conversation_samples():
+    return [(text, UNKNOWN_LABEL) for text in CONVERSATION_SAMPLES]
+
+
+def decision_settings():
+    """Parser ishlatadigan qaror parametrlari: (allowed, min_margin, min_coverage)"""
+    from config import PARSER_SETTINGS
+    return (frozenset(PARSER_SETTINGS.get("classifier_actions", ())),
+            PARSER_SETTINGS.get("classifier_margin", 0.25),
+            PARSER_SETTINGS.get("classifier_min_coverage", 0.5))
+
+
+def evaluate(classifier, samples, settings):
+    """
+    Parser bilan bir xil qaror qoidasi bo'yicha aniqlik va kechikish (held-out qism).
+    false_actions: suhbat ('unknown') bo'lib, action'ga aylangan namunalar ulushi.
+    """
+    if not samples:
+        return {"held_out": 0}
+    correct = 0
+    false_actions = 0
+    conversations = sum(1 for _, label in samples if label == UNKNOWN_LABEL)
+    latencies = []
+    for text, label in samples:
+        t0 = time.perf_counter()
+        predicted = classifier.decide(text, *settings)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        correct += predicted == label
+        false_actions += label == UNKNOWN_LABEL and predicted != UNKNOWN_LABEL
+    latencies.sort()
+    return {
+        "held_out": len(samples),
+        "accuracy": round(correct / len(samples), 4),
+        "false_actions": round(false_actions / conversations, 4) if conversations else 0.0,
+        "latency_ms_mean": round(sum(latencies) / len(latencies), 4),
+        "latency_ms_p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 4),
+    }
+
+
+def retrain(memory=None, model_path=None, held_out_ratio=0.2, settings=None):
+    """
+    Modelni qayta o'rgatish: history'ning oxirgi qismi baholash uchun ajratiladi,
+    so'ng yakuniy model barcha ma'lumotda o'rgatilib saqlanadi. Qaytaradi: hisobot (dict)
+    """
+    from config import UZ_PATTERNS, EN_PATTERNS
+    if memory is None:
+        from memory import MemoryEngine
+        memory = MemoryEngine()
+    settings = settings or decision_settings()
+
+    base = pattern_samples(UZ_PATTERNS, EN_PATTERNS) + conversation_samples()
+    history = history_samples(memory)
+    split = int(len(history) * (1 - held_out_ratio))
+    train_hist, test_hist = history[:split], history[split:]
+
+    t0 = time.perf_counter()
+    trial = IntentClassifier(model_path=model_path).fit(base + train_hist)
+    report = evaluate(trial, test_hist, settings)
+
+    final = IntentClassifier(model_path=model_path).fit(base + history)
+    report.update({
+        "pattern_samples": len(base),
+        "history_samples": len(history),
+        "actions": len(final.labels),
+        "ngrams": len(final.vocab),
+        "train_seconds": round(time.perf_counter() - t0, 3),
+        "trained_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    })
+    final.report = report
+    final.save()
+    final.logger.info(f"Intent model retrained: {report}")
+
+    _set_classifier(final)
+    return report
+
+
+def ensure_model(memory=None):
+    """Model fayli yo'q bo'lsa (yangi o'rnatish, model gitignore'da) o'rgatish; agent warm-up'idan chaqiriladi"""
+    if not NUMPY_AVAILABLE or os.path.exists(default_model_path()):
+        return None
+    return retrain(memory)
+
+
+# Umumiy nusxa (parser va executor bir modeldan foydalanadi)
+_CLASSIFIER = None
+_CLASSIFIER_LOCK = threading.Lock()
+_MISSING_MTIME = False   # oxirgi muvaffaqiyatsiz yuklashdagi fayl mtime'i (None: fayl yo'q); False: tekshirilmagan
+_GENERATION = 0          # model almashgan sari oshadi (parser keshi eskirganini bilish uchun)
+
+
+def default_model_path():
+    return os.path.join(os.getcwd(), "data", "intent_model.npz")
+
+
+def model_generation():
+    return _GENERATION
+
+
+def _set_classifier(classifier):
+    global _CLASSIFIER, _GENERATION
+    with _CLASSIFIER_LOCK:
+        _CLASSIFIER = classifier
+        _GENERATION += 1
+
+
+def _model_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def get_classifier():
+    """
+    Saqlangan modelni bir marta yuklash; model yoki NumPy bo'lmasa None. Yo'q/buzilgan model natijasi
+    fayl mtime'i bilan keshlanadi: fayl paydo bo'lmaguncha (yoki o'zgarmaguncha) qayta urinilmaydi.
+    """
+    global _CLASSIFIER, _GENERATION, _MISSING_MTIME
+    if not NUMPY_AVAILABLE:
+        return None
+    if _CLASSIFIER is not None:
+        return _CLASSIFIER
+    mtime = _model_mtime(default_model_path())
+    if mtime == _MISSING_MTIME:
+        return None
+    with _CLASSIFIER_LOCK:
+        if _CLASSIFIER is None:
+            classifier = IntentClassifier()
+            if not classifier.load():
+                _MISSING_MTIME = mtime
+                return None
+            _CLASSIFIER = classifier
+            _GENERATION += 1
+    return _CLASSIFIER
+
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "retrain":
+        print(retrain())
+    else:
+        clf = get_classifier()
+        if not clf:
+            print("Model topilmadi. Avval: python intent_classifier.py retrain")
+            sys.exit(1)
+        print(f"Report: {clf.report}")
+        settings = decision_settings()
+        for text in sys.argv[1:] or ["kompyutrni uchir", "yutubdan lofi top", "salom jarvis", "soat nechi bo'ldi"]:
+            t0 = time.perf_counter()
+            print(text, "->", clf.predict(text), clf.decide(text, *settings), f"{(time.perf_counter() - t0) * 1000:.3f} ms")
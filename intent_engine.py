@@ -1,55 +1,172 @@
 """
 JARVIS - Predictive Intent Engine (Elite v16.0)
 Analyzes user behavior patterns to anticipate future commands and workspace needs.
+
+Model: (kun vaqti bo'lagi, oldingi action) -> keyingi action og'irliklari. Har bir bajarilgan action
+O(1) da qo'shiladi, eski o'tishlar eksponensial (half-life) so'nadi, har holat uchun top-k oldindan
+tayyor turadi (predict_next = lug'atdan o'qish). Model data/intent_transitions.json ga saqlanadi.
 """
+import json
+import os
+import threading
 import time
-from collections import Counter
-from pathlib import Path
+from datetime import datetime
+
+try:
+    from config import INTENT_SETTINGS
+except ImportError:
+    INTENT_SETTINGS = {}
+
+DEFAULTS = {
+    "model_path": os.path.join("data", "intent_transitions.json"),
+    "half_life_hours": 72,    # O'tish og'irligi shuncha vaqtda ikki baravar kamayadi
+    "top_k": 3,
+    "confidence": 0.4,        # predict_next uchun minimal ishonch
+    "min_support": 2.0,       # Holatdagi (so'ngan) o'tishlar soni kamida shuncha bo'lsin
+    "max_gap_minutes": 30,    # Bundan uzoq tanaffusdan keyingi action o'tish hisoblanmaydi
+    "bootstrap_limit": 500,   # Bo'sh model commands_history'dan shuncha qator bilan boshlanadi
+    "save_interval": 30,      # maybe_save() oralig'i (sekund)
+}
+
+ANY_BUCKET = "*"
+# (boshlanish soati, nom)
+TIME_BUCKETS = ((0, "night"), (6, "morning"), (12, "afternoon"), (18, "evening"))
+# 2**x shu qiymatdan oshsa og'irliklar qayta masshtablanadi (float toshib ketmasligi uchun)
+_RESCALE_EXPONENT = 512
+
+
+def time_bucket(ts):
+    hour = datetime.fromtimestamp(ts).hour
+    name = TIME_BUCKETS[0][1]
+    for start, bucket in TIME_BUCKETS:
+        if hour >= start:
+            name = bucket
+    return name
+
+
+def action_key(command):
+    """Buyruq matni -> action kaliti (birinchi so'z, kichik harf)"""
+    parts = (command or "").lower().split()
+    return parts[0] if parts else ""
+
 
 class IntentEngine:
-    def __init__(self, memory_engine=None):
+    def __init__(self, memory_engine=None, model_path=None, settings=None):
         self.memory = memory_engine
-        self.history_limit = 50
-        self.transition_matrix = {}
-        
+        self.settings = {**DEFAULTS, **INTENT_SETTINGS, **(settings or {})}
+        self.model_path = model_path or self.settings["model_path"]
+        self.half_life = self.settings["half_life_hours"] * 3600
+        self.top_k = self.settings["top_k"]
+        self.max_gap = self.settings["max_gap_minutes"] * 60
+
+        # Og'irliklar t0 ga nisbatan masshtablangan: t vaqtdagi hodisa 2**((t - t0) / half_life) qo'shadi.
+        # Bitta holat ichidagi nisbatlar so'nishdan o'zgarmaydi, shuning uchun yangilash O(1).
+        self.t0 = time.time()
+        self.counts = {}   # "bucket|prev" -> {next: og'irlik}
+        self.totals = {}   # "bucket|prev" -> jami og'irlik
+        self.top = {}      # "bucket|prev" -> [(next, og'irlik), ...] kamayish tartibida
+        self.last_action = None
+        self.last_ts = None
+        self.observations = 0
+
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self.load()
+
+    # --- MODEL UPDATE ---
+
+    def _gain(self, ts):
+        exponent = (ts - self.t0) / self.half_life
+        if exponent > _RESCALE_EXPONENT:
+            self._rescale(ts)
+            exponent = 0.0
+        return 2.0 ** exponent
+
+    def _rescale(self, ts):
+        factor = 2.0 ** (-(ts - self.t0) / self.half_life)
+        for state, row in self.counts.items():
+            for nxt in row:
+                row[nxt] *= factor
+            self.totals[state] *= factor
+            self.top[state] = [(nxt, w * factor) for nxt, w in self.top[state]]
+        self.t0 = ts
+
+    def _bump(self, state, nxt, gain):
+        row = self.counts.setdefault(state, {})
+        weight = row.get(nxt, 0.0) + gain
+        row[nxt] = weight
+        self.totals[state] = self.totals.get(state, 0.0) + gain
+
+        # Top-k: faqat o'zgargan element joyi yangilanadi (O(k))
+        top = [item for item in self.top.get(state, ()) if item[0] != nxt]
+        idx = 0
+        while idx < len(top) and top[idx][1] >= weight:
+            idx += 1
+        top.insert(idx, (nxt, weight))
+        self.top[state] = top[:self.top_k]
+
+    def observe(self, command, ts=None):
+        """Bajarilgan action'ni modelga qo'shish (O(1))"""
+        key = action_key(command)
+        if not key:
+            return
+        ts = ts if ts is not None else time.time()
+        with self._lock:
+            if self.last_action and self.last_ts is not None and 0 <= ts - self.last_ts <= self.max_gap:
+                gain = self._gain(ts)
+                self._bump(f"{time_bucket(self.last_ts)}|{self.last_action}", key, gain)
+                self._bump(f"{ANY_BUCKET}|{self.last_action}", key, gain)
+            self.last_action, self.last_ts = key, ts
+            self.observations += 1
+            self._dirty = True
+
     def analyze_patterns(self):
-        """Build a simple Markov-style transition matrix from command history"""
-        if not self.memory: return
-        
-        # Get last 100 commands from memory
-        history = self.memory.get_command_history(limit=self.history_limit)
-        if len(history) < 5: return
-
-        # Command extraction (simplified)
-        commands = [h['command'].lower().split()[0] for h in history if 'command' in h]
-        
-        # Build transitions: Current -> Next
-        self.transition_matrix = {}
-        for i in range(len(commands) - 1):
-            current = commands[i]
-            next_cmd = commands[i+1]
-            if current not in self.transition_matrix:
-                self.transition_matrix[current] = []
-            self.transition_matrix[current].append(next_cmd)
+        """Model bo'sh bo'lsa commands_history'dan (xronologik tartibda) bir marta qurish"""
+        if not self.memory or self.observations:
+            return
+        rows = self.memory.get_history(limit=self.settings["bootstrap_limit"]) or []
+        for ts, command, _ in reversed(rows):
+            epoch = self._to_epoch(ts)
+            if epoch is not None:
+                self.observe(command, epoch)
+
+    @staticmethod
+    def _to_epoch(ts):
+        if isinstance(ts, datetime):
+            return ts.timestamp()
+        try:
+            return datetime.fromisoformat(str(ts)).timestamp()
+        except ValueError:
+            return None
+
+    # --- PREDICTION ---
+
+    def top_predictions(self, current_command, now=None):
+        """[(action, ishonch), ...] va ishlatilgan holat; kun vaqti bo'lagi yetarli bo'lmasa umumiy holat"""
+        key = action_key(current_command)
+        now = now if now is not None else time.time()
+        with self._lock:
+            decay = 2.0 ** ((now - self.t0) / self.half_life)
+            for state in (f"{time_bucket(now)}|{key}", f"{ANY_BUCKET}|{key}"):
+                total = self.totals.get(state)
+                if total and total / decay >= self.settings["min_support"]:
+                    return [(nxt, w / total) for nxt, w in self.top[state]], state
+        return [], None
 
-    def predict_next(self, current_command):
+    def predict_next(self, current_command, now=None):
         """Predict the next likely command based on the current one"""
-        if not current_command: return None
-        
-        cmd_key = current_command.lower().split()[0]
-        if cmd_key not in self.transition_matrix:
+        if not current_command:
             return None
-            
-        # Get most common next command
-        next_probs = Counter(self.transition_matrix[cmd_key])
-        prediction, count = next_probs.most_common(1)[0]
-        
-        # Confidence threshold
-        confidence = count / len(self.transition_matrix[cmd_key])
-        if confidence > 0.4:
+        predictions, state = self.top_predictions(current_command, now)
+        if not predictions:
+            return None
+        prediction, confidence = predictions[0]
+        if confidence > self.settings["confidence"]:
             return {
                 "action": prediction,
-                "confidence": confidence,
+                "confidence": round(confidence, 3),
+                "state": state,
                 "hint": self._generate_hint(prediction)
             }
         return None
@@ -63,8 +180,100 @@ class IntentEngine:
         }
         return hints.get(action, f"Janob, {action} bo'yicha keyingi qadamni rejalashtiryapman.")
 
+    # --- PERSISTENCE ---
+
+    def load(self):
+        if not self.model_path or not os.path.exists(self.model_path):
+            return False
+        try:
+            with open(self.model_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            with self._lock:
+                self.t0 = data["t0"]
+                self.counts = data["counts"]
+                self.totals = {state: sum(row.values()) for state, row in self.counts.items()}
+                self.top = {
+                    state: sorted(row.items(), key=lambda item: -item[1])[:self.top_k]
+                    for state, row in self.counts.items()
+                }
+                self.last_action = data.get("last_action")
+                self.last_ts = data.get("last_ts")
+                self.observations = data.get("observations", 0)
+            return True
+        except (OSError, ValueError, KeyError):
+            return False
+
+    def save(self):
+        if not self.model_path:
+            return
+        with self._lock:
+            data = {"version": 1, "t0": self.t0, "half_life_hours": self.settings["half_life_hours"],
+                    "last_action": self.last_action, "last_ts": self.last_ts,
+                    "observations": self.observations, "counts": self.counts}
+            payload = json.dumps(data, ensure_ascii=False)
+            self._dirty = False
+            self._last_save = time.monotonic()
+        directory = os.path.dirname(self.model_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = self.model_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp, self.model_path)
+
+    def maybe_save(self):
+        """O'zgarish bo'lsa va save_interval o'tgan bo'lsa saqlash (PostProcessor partiyalari uchun)"""
+        if self._dirty and time.monotonic() - self._last_save >= self.settings["save_interval"]:
+            self.save()
+
+
 if __name__ == "__main__":
-    # Test simulation
-    engine = IntentEngine()
-    engine.transition_matrix = {"open": ["terminal", "terminal", "browser"]}
-    print(engine.predict_next("open repository"))
+    import tempfile
+    from collections import Counter
+
+    path = os.path.join(tempfile.mkdtemp(), "intent_transitions.json")
+    engine = IntentEngine(model_path=path)
+    day = datetime(2026, 1, 5, 9, 0).timestamp()
+
+    # Ertalab: open_app -> vscode_terminal, kechqurun: open_app -> youtube_search
+    for d in range(10):
+        base = day + d * 86400
+        for i in range(5):
+            engine.observe("open_app code", base + i * 600)
+            engine.observe("run_terminal_v2 pytest", base + i * 600 + 60)
+            engine.observe("open_app chrome", base + 10 * 3600 + i * 600)
+            engine.observe("youtube_search lofi", base + 10 * 3600 + i * 600 + 60)
+    morning = day + 9 * 86400 + 3600
+    evening = day + 9 * 86400 + 11 * 3600
+    print("morning:", engine.predict_next("open_app", morning))
+    print("evening:", engine.predict_next("open_app", evening))
+
+    # So'nish: 30 kun o'tgach bir necha yangi odat eski 50 tadan ustun keladi
+    later = day + 40 * 86400 + 3600
+    for i in range(4):
+        engine.observe("open_app code", later + i * 600)
+        engine.observe("get_weather", later + i * 600 + 60)
+    print("after habit change:", engine.top_predictions("open_app", later + 3000))
+
+    engine.save()
+    reloaded = IntentEngine(model_path=path)
+    print("reloaded:", reloaded.predict_next("open_app", later + 3000)["action"])
+
+    # Eski usul (har action'dan keyin 50 qatorni qayta o'qish + Counter) bilan solishtirish
+    history = [("open_app code", "run_terminal_v2", "get_time")[i % 3] for i in range(50)]
+    n = 20000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        matrix = {}
+        commands = [h.split()[0] for h in history]
+        for i in range(len(commands) - 1):
+            matrix.setdefault(commands[i], []).append(commands[i + 1])
+        Counter(matrix["open_app"]).most_common(1)
+    legacy_us = (time.perf_counter() - t0) / n * 1e6
+    t0 = time.perf_counter()
+    ts = later + 4000
+    for i in range(n):
+        engine.observe(history[i % 50], ts + i)
+        engine.predict_next(history[i % 50], ts + i)
+    new_us = (time.perf_counter() - t0) / n * 1e6
+    print(f"per action: rebuild+Counter {legacy_us:.1f} us (excl. DB read) | observe+predict {new_us:.1f} us")
@@ -0,0 +1,191 @@
+"""
+JARVIS - Compiled Intent Matcher
+UZ/EN pattern jadvallarini bir marta kompilyatsiya qilib, barcha mosliklarni bitta o'tishda topadi.
+Oddiy (literal) pattern'lar Aho-Corasick avtomatida, haqiqiy regex'lar esa bitta alternatsiyada.
+"""
+import re
+from collections import deque
+
+# Shu belgilardan birortasi bo'lsa pattern regex deb hisoblanadi
+REGEX_META = set(".^$*+?{}[]\\|()")
+
+
+class AhoCorasick:
+    """Ko'p satrli literal qidiruv avtomati (bitta o'tishda barcha mosliklar)"""
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        self._built = False
+
+    def add(self, word, payload):
+        """Avtomatga so'z qo'shish"""
+        node = 0
+        for ch in word:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            node = nxt
+        self.out[node].append(payload)
+        self._built = False
+
+    def build(self):
+        """Fail havolalarini BFS orqali qurish"""
+        queue = deque()
+        for nxt in self.goto[0].values():
+            self.fail[nxt] = 0
+            queue.append(nxt)
+
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+        self._built = True
+
+    def search(self, text):
+        """Matndagi barcha payload'larni qaytarish (takrorlanishi mumkin)"""
+        if not self._built:
+            self.build()
+        goto, fail, out = self.goto, self.fail, self.out
+        node = 0
+        hits = []
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                hits.extend(out[node])
+        return hits
+
+
+class IntentMatcher:
+    """
+    Pattern jadvallari (action -> [pattern, ...]) uchun yagona kompilyatsiya qilingan matcher.
+    Ball = len(pattern); tenglikda jadvallardagi birinchi pattern yutadi (eski re.search tsikli kabi).
+    """
+
+    def __init__(self, *pattern_tables):
+        self.entries = []  # (action, pattern, score)
+        self.automaton = AhoCorasick()
+        regex_entries = []
+
+        for table in pattern_tables:
+            for action, patterns in table.items():
+                for pattern in patterns:
+                    idx = len(self.entries)
+                    self.entries.append((action, pattern, len(pattern)))
+                    if REGEX_META.intersection(pattern):
+                        regex_entries.append(idx)
+                    else:
+                        self.automaton.add(pattern, idx)
+
+        self.automaton.build()
+
+        # Har bir regex ixtiyoriy lookahead ichida: bitta match() barcha regex mosliklarini belgilaydi
+        self.regex_groups = {}
+        parts = []
+        for idx in regex_entries:
+            group = f"r{idx}"
+            self.regex_groups[group] = idx
+            parts.append(f"(?=[\\s\\S]*?(?P<{group}>{self.entries[idx][1]}))?")
+        self.combined_regex = re.compile("".join(parts)) if parts else None
+
+    def match_all(self, text):
+        """Barcha mosliklar: [(action, pattern, score), ...] jadval tartibida"""
+        hit_ids = set(self.automaton.search(text))
+
+        if self.combined_regex is not None:
+            m = self.combined_regex.match(text)
+            if m:
+                for group, value in m.groupdict().items():
+                    if value is not None:
+                        hit_ids.add(self.regex_groups[group])
+
+        return [self.entries[i] for i in sorted(hit_ids)]
+
+    def best(self, text):
+        """Eng yuqori ballli action: (action, score) yoki ("unknown", 0)"""
+        best_action, best_score = "unknown", 0
+        for action, _, score in self.match_all(text):
+            if score > best_score:
+                best_score = score
+                best_action = action
+        return best_action, best_score
+
+
+def _legacy_detect(text, pattern_tables):
+    """Eski usul: har bir pattern uchun alohida re.search (benchmark uchun)"""
+    best_action, best_score = "unknown", 0
+    for table in pattern_tables:
+        for action, patterns in table.items():
+            for pattern in patterns:
+                if re.search(pattern, text):
+                    score = len(pattern)
+                    if score > best_score:
+                        best_score = score
+                        best_action = action
+    return best_action, best_score
+
+
+# Haqiqiy buyruqlar korpusi (ovoz, Telegram, web va cloud manbalaridan)
+BENCH_CORPUS = [
+    "chrome och", "notepad yop", "soat necha", "bugun qaysi sana", "tizim haqida",
+    "youtube'da lo-fi qidir", "google'da python qidir", "musiqa qo'y shahzoda",
+    "qushiq quy", "ovozni o'chir", "kompyuterni o'chir", "qayta ishga tushir",
+    "test papka yarat", "enter bos", "ekranni qulfla", "ob-havo toshkent",
+    "shahbozga salom deb yoz", "telegram shahboz salom", "xayrli tong",
+    "yangiliklarni o'qi", "xavfsizlik hisoboti", "kamerani yoq", "salom",
+    "men borman", "tushlikka 50000 so'm sarfladim", "balans", "bitcoin necha pul",
+    "open chrome", "what time is it", "search youtube lofi beats", "system info",
+    "rasm chiz kosmosdagi mushuk", "kvant kompyuterlar haqida surishtir",
+    "faylni qidir hisobot", "o'yin rejimi", "shuni bos", "rejaga qo'sh dars",
+]
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import time
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from config import UZ_PATTERNS, EN_PATTERNS
+
+    tables = (UZ_PATTERNS, EN_PATTERNS)
+    corpus = [c.lower().strip() for c in BENCH_CORPUS]
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    t0 = time.perf_counter()
+    matcher = IntentMatcher(*tables)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    # Natijalar eski usul bilan bir xil bo'lishi shart
+    mismatches = [c for c in corpus if matcher.best(c) != _legacy_detect(c, tables)]
+
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for c in corpus:
+            _legacy_detect(c, tables)
+    legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for c in corpus:
+            matcher.best(c)
+    compiled = time.perf_counter() - t0
+
+    n = rounds * len(corpus)
+    print(f"Patterns: {len(matcher.entries)} ({len(matcher.regex_groups)} regex) | build: {build_ms:.2f} ms")
+    print(f"Legacy re.search loop : {n / legacy:10.0f} cmd/s ({legacy / n * 1e6:.1f} us/cmd)")
+    print(f"Compiled matcher      : {n / compiled:10.0f} cmd/s ({compiled / n * 1e6:.1f} us/cmd)")
+    print(f"Speedup: {legacy / compiled:.1f}x | mismatches: {len(mismatches)}")
+    for c in mismatches:
+        print(f"  MISMATCH: {c!r} -> {matcher.best(c)} vs {_legacy_detect(c, tables)}")
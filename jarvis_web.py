@@ -4,6 +4,7 @@ Flask asosida ishlaydigan lokal veb-server.
 Telefondan boshqarish uchun interfeys.
 """
 from flask import Flask, render_template, request, jsonify, session, redirect, url_for, Response
+import json
 import os
 import config
 
@@ -87,6 +88,27 @@ def get_status():
     })
 
 
+LATENCY_FILE = os.path.join(os.getcwd(), "data", "stage_latency.json")
+
+@app.route('/latency')
+def get_latency():
+    """process_command bosqichlari bo'yicha rolling kechikish (JARVIS core yozib boradi)"""
+    if not is_logged_in():
+        return jsonify({"status": "error"}), 401
+
+    stage = request.args.get('stage')
+    try:
+        with open(LATENCY_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return jsonify({"status": "success", "stages": {}})
+
+    if stage:
+        data["stages"] = {k: v for k, v in data.get("stages", {}).items() if k == stage}
+    data["status"] = "success"
+    return jsonify(data)
+
+
 # --- CAMERA STREAMING ---
 import cv2
 
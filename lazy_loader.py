@@ -0,0 +1,199 @@
+"""
+JARVIS - Lazy Subsystem Loader & Startup Timeline
+Og'ir modullar (NewsBot, VisionEngine, ShadowVault, MemoryCore ...) LazyProxy orqali ro'yxatdan
+o'tadi va birinchi ishlatilganda quriladi. warm_up() ularni fon oqimida oldindan yuklaydi.
+Har bir modulning qurilish vaqti StartupTimeline'ga yoziladi (hisobot + data/startup_timeline.json).
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from utils import setup_logger
+
+logger = setup_logger("LazyLoader")
+
+
+class StartupTimeline:
+    """Jarayon boshidan hisoblangan modul qurilish vaqtlari"""
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.events = []
+
+    def record(self, name, started, duration, mode, status="ok"):
+        with self._lock:
+            self.events.append({
+                "module": name,
+                "start_ms": round((started - self.t0) * 1000, 1),
+                "duration_ms": round(duration * 1000, 1),
+                "mode": mode,  # eager | warm-up | on-demand
+                "thread": threading.current_thread().name,
+                "status": status,
+            })
+
+    @contextmanager
+    def measure(self, name, mode="eager"):
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except Exception:
+            status = "failed"
+            raise
+        finally:
+            self.record(name, started, time.perf_counter() - started, mode, status)
+
+    def snapshot(self):
+        with self._lock:
+            return sorted(self.events, key=lambda e: e["start_ms"])
+
+    def report(self):
+        """Matnli hisobot (eng sekin modullar belgilangan holda)"""
+        events = self.snapshot()
+        if not events:
+            return "Startup timeline: (bo'sh)"
+        lines = [f"{'module':24} {'mode':10} {'start':>9} {'took':>9}  thread"]
+        for e in events:
+            flag = " !" if e["status"] != "ok" else ""
+            lines.append(f"{e['module']:24} {e['mode']:10} {e['start_ms']:>7.1f}ms {e['duration_ms']:>7.1f}ms  {e['thread']}{flag}")
+        eager = sum(e["duration_ms"] for e in events if e["mode"] == "eager")
+        deferred = sum(e["duration_ms"] for e in events if e["mode"] != "eager")
+        lines.append(f"eager total: {eager:.1f} ms | deferred total: {deferred:.1f} ms")
+        return "\n".join(lines)
+
+    def save(self, path):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"events": self.snapshot()}, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.warning(f"Startup timeline save error: {e}")
+
+
+# Jarayon bo'yicha yagona timeline
+TIMELINE = StartupTimeline()
+
+
+class LazyProxy:
+    """
+    Modul o'rnini bosuvchi proksi: birinchi atribut murojaati yoki `if proxy:` tekshiruvida
+    factory() chaqiriladi. Qurish xato bersa proksi False bo'ladi (eski `None` xatti-harakati kabi).
+    """
+    __slots__ = ("_name", "_factory", "_instance", "_state", "_lock")
+
+    def __init__(self, name, factory):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_state", "pending")  # pending | ready | failed
+        object.__setattr__(self, "_lock", threading.RLock())
+
+    def _resolve(self, mode="on-demand"):
+        if self._state == "pending":
+            with self._lock:
+                if self._state == "pending":
+                    started = time.perf_counter()
+                    try:
+                        instance = self._factory()
+                        object.__setattr__(self, "_instance", instance)
+                        object.__setattr__(self, "_state", "ready" if instance is not None else "failed")
+                    except Exception as e:
+                        object.__setattr__(self, "_state", "failed")
+                        logger.error(f"Lazy module '{self._name}' failed: {e}")
+                    TIMELINE.record(self._name, started, time.perf_counter() - started, mode,
+                                    "ok" if self._state == "ready" else "failed")
+        return self._instance
+
+    @property
+    def loaded(self):
+        return self._state != "pending"
+
+    def __getattr__(self, attr):
+        instance = self._resolve()
+        if instance is None:
+            raise AttributeError(f"'{self._name}' moduli mavjud emas ({attr})")
+        return getattr(instance, attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._resolve(), attr, value)
+
+    def __bool__(self):
+        return self._resolve() is not None
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        return f"<LazyProxy {self._name} [{self._state}]>"
+
+
+def unwrap(obj):
+    """Proksi bo'lsa haqiqiy obyektni (kerak bo'lsa qurib) qaytarish"""
+    return obj._resolve() if isinstance(obj, LazyProxy) else obj
+
+
+class LazyRegistry:
+    """Bir egasining (executor / JARVIS) lazy modullari va ularni fon oqimida yuklash"""
+
+    def __init__(self, owner_name, lazy=True):
+        self.owner_name = owner_name
+        self.lazy = lazy
+        self.proxies = {}
+
+    def add(self, name, factory):
+        proxy = LazyProxy(name, factory)
+        self.proxies[name] = proxy
+        if not self.lazy:
+            proxy._resolve(mode="eager")
+        return proxy
+
+    def warm_up(self, names=None):
+        """Berilgan (yoki barcha) modullarni shu oqimda tartib bilan qurish"""
+        for name in names if names is not None else list(self.proxies):
+            proxy = self.proxies.get(name)
+            if proxy is not None and not proxy.loaded:
+                proxy._resolve(mode="warm-up")
+
+    def status(self):
+        return {name: proxy._state for name, proxy in self.proxies.items()}
+
+
+def start_warm_up(steps, delay=0.0, on_done=None):
+    """steps: [callable, ...] — fon oqimida ketma-ket bajariladi"""
+    def run():
+        if delay:
+            time.sleep(delay)
+        for step in steps:
+            try:
+                step()
+            except Exception as e:
+                logger.error(f"Warm-up step error: {e}")
+        if on_done:
+            on_done()
+
+    thread = threading.Thread(target=run, name="WarmUp", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    # Namoyish: uchta "og'ir" modul, biri talab bo'yicha, qolganlari fon warm-up'da
+    def heavy(name, seconds):
+        def factory():
+            time.sleep(seconds)
+            return {"name": name}
+        return factory
+
+    registry = LazyRegistry("demo")
+    with TIMELINE.measure("core"):
+        time.sleep(0.02)
+        vault = registry.add("shadow_vault", heavy("vault", 0.3))
+        vision = registry.add("vision", heavy("vision", 0.2))
+        news = registry.add("news_bot", heavy("news", 0.1))
+    print("Status after init:", registry.status())
+    print("vision used on demand ->", vision.get("name"))
+    start_warm_up([registry.warm_up]).join()
+    print("Status after warm-up:", registry.status())
+    print(TIMELINE.report())
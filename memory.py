@@ -5,19 +5,107 @@ Handles long-term storage using SQLite.
 
 import sqlite3
 import os
+import re
+import json
 from datetime import datetime, timedelta
-from utils import setup_logger
+from utils import setup_logger, normalize_text
+from db_pool import get_pool
+from db_migrations import run_migrations, query_plan
+
+# FTS5 indekslari: fts jadvali -> (manba jadval, rowid ustuni, indekslanadigan ustunlar)
+FTS_TABLES = {
+    "user_facts_fts": ("user_facts", "id", ("fact", "category")),
+    "conversation_fts": ("conversation_history", "id", ("user_query", "assistant_response")),
+    "semantic_fts": ("semantic_memory", "rowid", ("topic", "summary")),
+}
+# Sxema migratsiyalari: (versiya, tavsif, [SQL ...]). Faqat oxiriga qo'shiladi, eskilari o'zgarmaydi.
+MIGRATIONS = [
+    (1, "time and category indexes", [
+        "CREATE INDEX IF NOT EXISTS idx_commands_history_timestamp ON commands_history(timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_conversation_history_timestamp ON conversation_history(timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_user_facts_category_created ON user_facts(category, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_user_facts_created ON user_facts(created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_habits_use_count ON habits(use_count)",
+        "ANALYZE",
+    ]),
+    (2, "daily command rollups", [
+        """CREATE TABLE IF NOT EXISTS command_daily_rollup (
+            day TEXT,
+            action TEXT,
+            count INTEGER,
+            PRIMARY KEY (day, action)
+        )""",
+    ]),
+    (3, "learned route usage", [
+        "ALTER TABLE learned_routes ADD COLUMN last_used DATETIME",
+    ]),
+]
+
+# Issiq so'rovlar va ular ishlatishi kerak bo'lgan indeks (python memory.py plans)
+HOT_QUERIES = {
+    "get_history": ("SELECT timestamp, command, response FROM commands_history ORDER BY timestamp DESC LIMIT ?",
+                    (50,), "idx_commands_history_timestamp"),
+    "get_recent_conversations": ("SELECT timestamp, user_query, assistant_response, context FROM conversation_history "
+                                 "ORDER BY timestamp DESC LIMIT ?", (10,), "idx_conversation_history_timestamp"),
+    "search_conversations_like": ("SELECT timestamp, user_query FROM conversation_history WHERE user_query LIKE ? "
+                                  "AND timestamp > ? ORDER BY timestamp DESC LIMIT ?",
+                                  ("%x%", "2000-01-01", 20), "idx_conversation_history_timestamp"),
+    "get_facts_by_category": ("SELECT fact, category, created_at FROM user_facts WHERE category=? "
+                              "ORDER BY created_at DESC LIMIT ?", ("skills", 20), "idx_user_facts_category_created"),
+    "get_facts": ("SELECT fact, category, created_at FROM user_facts ORDER BY created_at DESC LIMIT ?",
+                  (20,), "idx_user_facts_created"),
+    "get_top_habits": ("SELECT app_name, use_count FROM habits ORDER BY use_count DESC LIMIT ?",
+                       (5,), "idx_habits_use_count"),
+}
+
+# Apostrof variantlari bitta "'" ga yig'iladi (o‘zbek / o’zbek / o'zbek bir xil token)
+APOSTROPHES = ("\u2018", "\u2019", "\u02bb", "\u02bc", "`")
+FTS_TOKENIZER = "unicode61 remove_diacritics 2 tokenchars ''''"
+FTS_TOKEN_RE = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
+
+def fold_apostrophes(text):
+    """normalize_text + barcha apostrof variantlarini "'" ga almashtirish"""
+    text = normalize_text(text)
+    for mark in APOSTROPHES:
+        text = text.replace(mark, "'")
+    return text
+
+
+def _sql_fold(expr):
+    """fold_apostrophes'ning SQL ko'rinishi (trigger va backfill ichida)"""
+    expr = f"lower(coalesce({expr}, ''))"
+    for mark in APOSTROPHES:
+        expr = f"replace({expr}, '{mark}', '''')"
+    return expr
+
+
+def fts_query(text, prefix=False, min_len=2):
+    """Erkin matn -> FTS5 MATCH ifodasi (tokenlar OR bilan; prefix=True bo'lsa "tok"*)"""
+    tokens = []
+    for token in FTS_TOKEN_RE.findall(fold_apostrophes(text)):
+        if len(token) >= min_len and token not in tokens:
+            tokens.append(token)
+    if not tokens:
+        return None
+    star = "*" if prefix else ""
+    return " OR ".join(f'"{t}"{star}' for t in tokens)
+
 
 class MemoryEngine:
     def __init__(self, db_path="jarvis_memory.db"):
         self.logger = setup_logger("MemoryEngine")
         self.db_path = db_path
+        self.pool = get_pool(db_path)  # Oqim-bo'yicha doimiy WAL ulanishlar
+        self.fts_enabled = False
+        self.schema_version = 0
+        self._summarizer = None
         self._init_db()
 
     def _init_db(self):
         """Ma'lumotlar bazasini va jadvallarni yaratish"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.pool.connection()
             cursor = conn.cursor()
             
             # User Info
@@ -88,34 +176,119 @@ class MemoryEngine:
                 )
             ''')
             
+            # Learned Routes (LLM -> local action)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS learned_routes (
+                    phrase TEXT PRIMARY KEY,
+                    action TEXT,
+                    parameters TEXT,
+                    hits INTEGER DEFAULT 0,
+                    created_at DATETIME
+                )
+            ''')
+            
             # Default user name if not exists
             cursor.execute("INSERT OR IGNORE INTO user_info (key, value) VALUES ('name', 'Janob')")
             
             conn.commit()
-            conn.close()
+            cursor.close()
+            self.schema_version = run_migrations(conn, MIGRATIONS, self.logger)
+            self.fts_enabled = self._init_fts(conn)
             self.logger.info("SQLite Database initialized.")
         except Exception as e:
             self.logger.error(f"DB Init Error: {e}")
 
+    def _init_fts(self, conn):
+        """
+        FTS5 jadvallari va sinxronlash trigger'lari. Jadval yangi yaratilsa mavjud qatorlar
+        bir martalik backfill orqali indekslanadi. FTS5 yo'q bo'lsa LIKE qidiruviga qaytiladi.
+        """
+        try:
+            for fts, (source, rowid, columns) in FTS_TABLES.items():
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (fts,)
+                ).fetchone()
+                cols = ", ".join(columns)
+                new_vals = ", ".join(_sql_fold(f"new.{c}") for c in columns)
+                with conn:
+                    conn.execute(f'CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, tokenize="{FTS_TOKENIZER}")')
+                    conn.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {source} BEGIN
+                            INSERT INTO {fts}(rowid, {cols}) VALUES (new.{rowid}, {new_vals});
+                        END""")
+                    conn.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {source} BEGIN
+                            DELETE FROM {fts} WHERE rowid = old.{rowid};
+                        END""")
+                    conn.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {source} BEGIN
+                            DELETE FROM {fts} WHERE rowid = old.{rowid};
+                            INSERT INTO {fts}(rowid, {cols}) VALUES (new.{rowid}, {new_vals});
+                        END""")
+                    if not exists:
+                        source_vals = ", ".join(_sql_fold(c) for c in columns)
+                        conn.execute(f"INSERT INTO {fts}(rowid, {cols}) SELECT {rowid}, {source_vals} FROM {source}")
+                        count = conn.execute(f"SELECT COUNT(*) FROM {fts}").fetchone()[0]
+                        self.logger.info(f"FTS5 backfill: {source} -> {fts} ({count} rows)")
+            return True
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"FTS5 unavailable, falling back to LIKE search: {e}")
+            return False
+
+    def _fts_search(self, fts, select, query, limit, prefix, extra_where="", extra_params=()):
+        """bm25 bo'yicha tartiblangan top-k (FTS jadvali rowid -> manba jadval)"""
+        match = fts_query(query, prefix=prefix)
+        if not match:
+            return []
+        source, rowid, _ = FTS_TABLES[fts]
+        sql = (f"SELECT {select} FROM {fts} JOIN {source} s ON s.{rowid} = {fts}.rowid "
+               f"WHERE {fts} MATCH ? {extra_where} ORDER BY bm25({fts}) LIMIT ?")
+        return self._query(sql, (match, *extra_params, limit)) or []
+
     def _query(self, sql, params=(), commit=False, fetch_one=False):
-        """SQL so'rovlarini bajarish uchun yordamchi metod"""
+        """SQL so'rovlarini bajarish uchun yordamchi metod (pool ulanishi, statement cache)"""
+        conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(sql, params)
+            conn = self.pool.connection()
+            cursor = conn.execute(sql, params)
             
             if commit:
                 conn.commit()
                 result = cursor.rowcount
             else:
                 result = cursor.fetchone() if fetch_one else cursor.fetchall()
-            
-            conn.close()
+            # O'qish tranzaksiyasi ochiq qolmasligi uchun (WAL snapshot eskirmaydi)
+            cursor.close()
             return result
         except Exception as e:
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
             self.logger.error(f"Query Error: {e}")
             return None
 
+    def _execute_many(self, sql, rows):
+        """Bir SQL'ni ko'p qator uchun bitta tranzaksiyada bajarish"""
+        conn = None
+        try:
+            conn = self.pool.connection()
+            with conn:
+                cursor = conn.executemany(sql, rows)
+            return cursor.rowcount
+        except Exception as e:
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+            self.logger.error(f"Query Error: {e}")
+            return None
+
+    def query_plans(self):
+        """HOT_QUERIES uchun {nom: (EXPLAIN QUERY PLAN satrlari, kutilgan indeks)}"""
+        conn = self.pool.connection()
+        return {name: (query_plan(conn, sql, params), index) for name, (sql, params, index) in HOT_QUERIES.items()}
+
+    def close(self):
+        """Ushbu bazaning barcha pool ulanishlarini yopish"""
+        self.pool.close_all()
+
     # ==================== USER INFO ====================
     def get_user_name(self):
         """Foydalanuvchi ismini olish"""
@@ -147,6 +320,15 @@ class MemoryEngine:
             commit=True
         )
 
+    def add_history_many(self, rows):
+        """Bir nechta tarix yozuvini bitta tranzaksiyada qo'shish: [(timestamp, command, response, language), ...]"""
+        if not rows:
+            return 0
+        return self._execute_many(
+            "INSERT INTO commands_history (timestamp, command, response, language) VALUES (?, ?, ?, ?)",
+            rows
+        )
+
     def add_command_history(self, action, parameters_str):
         """Alias for add_to_history to match executor calls"""
         return self.add_to_history(f"{action} {parameters_str}", "Executed via System")
@@ -171,6 +353,14 @@ class MemoryEngine:
                 })
         return history
 
+    def get_action_rollup(self, since_day=None, limit=50):
+        """Arxivlangan (RetentionEngine) buyruqlar: [(action, jami), ...] ko'pidan boshlab"""
+        return self._query(
+            "SELECT action, SUM(count) AS total FROM command_daily_rollup WHERE day >= ? "
+            "GROUP BY action ORDER BY total DESC LIMIT ?",
+            (since_day or "", limit)
+        ) or []
+
     # ==================== HABITS ====================
     def record_app_usage(self, app_name):
         """Dastur ishlatilganini qayd qilish"""
@@ -239,22 +429,30 @@ class MemoryEngine:
         )
         return result if result else (None, None)
 
-    def summarize_recent_history(self):
-        """So'nggi tarixni avtomatik xulosalash (AI Brain kerak)"""
-        history = self.get_history(limit=20)
-        if not history:
-            return
-        
-        from llm_brain import GeminiBrain
-        llm_brain = GeminiBrain()
-        
-        prompt = "Summarize these recent commands:\\n"
-        for ts, cmd, resp in history:
-            prompt += f"- {cmd}\\n"
-        
-        summary = llm_brain.generate_response(prompt)
-        if summary:
-            self.add_semantic_memory("recent_conversation", summary)
+    def search_semantic_memory(self, query, limit=5, prefix=False):
+        """Semantik xotiradan qidirish: [(topic, summary), ...] bm25 tartibida"""
+        if self.fts_enabled:
+            return self._fts_search("semantic_fts", "s.topic, s.summary", query, limit, prefix)
+        return self._query(
+            "SELECT topic, summary FROM semantic_memory WHERE topic LIKE ? OR summary LIKE ? LIMIT ?",
+            (f"%{query}%", f"%{query}%", limit)
+        )
+
+    def summarize_recent_history(self, brain=None):
+        """
+        Yangi suhbatlarni rolling (kunlik + sessiya) xulosaga qo'shish va prompt kontekstini qaytarish.
+        Faqat oxirgi checkpoint'dan keyingi suhbatlar xulosalanadi; brain bir marta yaratiladi.
+        """
+        from rolling_summary import RollingSummarizer
+        if self._summarizer is None:
+            if brain is None:
+                from llm_brain import GeminiBrain
+                brain = GeminiBrain()
+            self._summarizer = RollingSummarizer(self, brain)
+        elif brain is not None:
+            self._summarizer.brain = brain
+        self._summarizer.update(force=True)
+        return self._summarizer.context_block()
 
     # ==================== AI CONVERSATION MEMORY (Phase 2) ====================
     
@@ -292,15 +490,21 @@ class MemoryEngine:
             self.logger.error(f"Get conversations error: {e}")
             return []
     
-    def search_conversations(self, query, days_ago=30):
-        """Search past conversations"""
+    def search_conversations(self, query, days_ago=30, limit=20, prefix=False):
+        """Search past conversations (FTS5 bm25 ranking; prefix=True: so'z boshlanishi bo'yicha)"""
         try:
             cutoff = datetime.now() - timedelta(days=days_ago)
             
-            results = self._query(
-                "SELECT timestamp, user_query, assistant_response FROM conversation_history WHERE (user_query LIKE ? OR assistant_response LIKE ?) AND timestamp > ? ORDER BY timestamp DESC LIMIT 20",
-                (f"%{query}%", f"%{query}%", cutoff)
-            )
+            if self.fts_enabled:
+                results = self._fts_search(
+                    "conversation_fts", "s.timestamp, s.user_query, s.assistant_response",
+                    query, limit, prefix, "AND s.timestamp > ?", (cutoff,)
+                )
+            else:
+                results = self._query(
+                    "SELECT timestamp, user_query, assistant_response FROM conversation_history WHERE (user_query LIKE ? OR assistant_response LIKE ?) AND timestamp > ? ORDER BY timestamp DESC LIMIT ?",
+                    (f"%{query}%", f"%{query}%", cutoff, limit)
+                )
             
             conversations = []
             for row in results:
@@ -337,14 +541,161 @@ class MemoryEngine:
                 (limit,)
             )
 
-    def search_facts(self, query):
-        """Faktlarni qidirish (keyword bo'yicha)"""
+    def search_facts(self, query, limit=5, prefix=False):
+        """Faktlarni qidirish: FTS5 bm25 bo'yicha eng mos top-k [(fact, category), ...]"""
+        if self.fts_enabled:
+            return self._fts_search("user_facts_fts", "s.fact, s.category", query, limit, prefix)
+        return self._query(
+            "SELECT fact, category FROM user_facts WHERE fact LIKE ? LIMIT ?",
+            (f"%{query}%", limit)
+        )
+
+    # ==================== LEARNED ROUTES ====================
+    def save_learned_route(self, phrase, action, parameters=None):
+        """LLM aniqlagan ibora -> action yo'nalishini saqlash"""
         return self._query(
-            "SELECT fact, category FROM user_facts WHERE fact LIKE ?",
-            (f"%{query}%",)
+            "INSERT OR REPLACE INTO learned_routes (phrase, action, parameters, hits, created_at) VALUES (?, ?, ?, 0, ?)",
+            (phrase, action, json.dumps(parameters or {}, ensure_ascii=False), datetime.now()),
+            commit=True
+        )
+
+    def touch_learned_routes(self, hits, timestamp=None):
+        """Yo'nalishlar ishlatilishini qo'shish: hits {phrase: soni}; bitta tranzaksiya"""
+        if not hits:
+            return 0
+        timestamp = timestamp or datetime.now()
+        return self._execute_many(
+            "UPDATE learned_routes SET hits = hits + ?, last_used = ? WHERE phrase = ?",
+            [(count, timestamp, phrase) for phrase, count in hits.items()]
         )
 
+    def prune_learned_routes(self, idle_days):
+        """idle_days davomida ishlatilmagan (yoki saqlangandan beri hech ishlatilmagan) yo'nalishlarni o'chirish"""
+        cutoff = datetime.now() - timedelta(days=idle_days)
+        return self._query(
+            "DELETE FROM learned_routes WHERE COALESCE(last_used, created_at) < ?",
+            (cutoff,), commit=True
+        ) or 0
+
+    def get_learned_routes(self):
+        """Barcha o'rganilgan yo'nalishlar: [(phrase, action, parameters), ...]"""
+        rows = self._query("SELECT phrase, action, parameters FROM learned_routes")
+        routes = []
+        for phrase, action, params_json in rows or []:
+            try:
+                params = json.loads(params_json) if params_json else {}
+            except ValueError:
+                params = {}
+            routes.append((phrase, action, params))
+        return routes
+
+def _legacy_query(db_path, sql, params=(), commit=False, fetch_one=False):
+    """Eski usul: har bir so'rov uchun yangi ulanish (benchmark uchun)"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    if commit:
+        conn.commit()
+        result = cursor.rowcount
+    else:
+        result = cursor.fetchone() if fetch_one else cursor.fetchall()
+    conn.close()
+    return result
+
+
+def _bench_command(query):
+    """Bitta buyruq davomidagi DB ishlari: ism, 2 ta history yozuvi, IntentEngine o'qishi"""
+    query("SELECT value FROM user_info WHERE key='name'", fetch_one=True)
+    query("INSERT INTO commands_history (timestamp, command, response, language) VALUES (?, ?, ?, ?)",
+          (datetime.now(), "chrome och", "Chrome ochildi", "uz"), commit=True)
+    query("INSERT INTO commands_history (timestamp, command, response, language) VALUES (?, ?, ?, ?)",
+          (datetime.now(), "open_app {}", "Executed via System", "uz"), commit=True)
+    query("SELECT timestamp, command, response FROM commands_history ORDER BY timestamp DESC LIMIT ?", (50,))
+    query("SELECT phrase, action, parameters FROM learned_routes")
+
+
 if __name__ == "__main__":
+    import sys
+    import tempfile
+    import time
+
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+        db_path = os.path.join(tempfile.mkdtemp(), "bench_memory.db")
+        mem = MemoryEngine(db_path=db_path)
+
+        t0 = time.perf_counter()
+        for _ in range(n):
+            _bench_command(lambda sql, params=(), **kw: _legacy_query(db_path, sql, params, **kw))
+        legacy = (time.perf_counter() - t0) / n * 1000
+
+        t0 = time.perf_counter()
+        for _ in range(n):
+            _bench_command(mem._query)
+        pooled = (time.perf_counter() - t0) / n * 1000
+
+        rows = [(datetime.now(), f"cmd {i}", "ok", "uz") for i in range(n * 2)]
+        t0 = time.perf_counter()
+        mem.add_history_many(rows)
+        bulk = (time.perf_counter() - t0) / len(rows) * 1000
+
+        print(f"Per-command DB overhead (5 queries), {n} commands:")
+        print(f"  connect-per-query : {legacy:7.3f} ms/command")
+        print(f"  pooled WAL        : {pooled:7.3f} ms/command  ({legacy / pooled:.1f}x)")
+        print(f"  executemany insert: {bulk:7.4f} ms/row")
+        print(f"  pool: {mem.pool.stats()}")
+        mem.close()
+        sys.exit(0)
+
+    if len(sys.argv) > 1 and sys.argv[1] == "plans":
+        # Issiq so'rovlar indeksdan foydalanishi va to'liq saralash (TEMP B-TREE) bo'lmasligi shart
+        mem = MemoryEngine(db_path=sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.mkdtemp(), "plans.db"))
+        print(f"schema_version: {mem.schema_version}")
+        failed = 0
+        for name, (plan, index) in mem.query_plans().items():
+            text = " | ".join(plan)
+            ok = index in text and "TEMP B-TREE" not in text
+            failed += not ok
+            print(f"{'OK  ' if ok else 'FAIL'} {name:26} {text}")
+        mem.close()
+        sys.exit(1 if failed else 0)
+
+    if len(sys.argv) > 1 and sys.argv[1] == "fts":
+        # FTS5 vs LIKE: tezlik, bm25 tartibi, apostrof variantlari va trigger sinxronligi
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+        mem = MemoryEngine(db_path=os.path.join(tempfile.mkdtemp(), "fts_memory.db"))
+        words = ["musiqa", "kod", "python", "loyiha", "ob-havo", "yangiliklar", "o'yin", "kitob", "sport", "kino"]
+        rows = [(datetime.now(), f"{words[i % 10]} {words[(i * 7) % 10]} haqida savol {i}",
+                 f"javob {words[(i * 3) % 10]} {i}", "") for i in range(n)]
+        mem._execute_many("INSERT INTO conversation_history (timestamp, user_query, assistant_response, context) "
+                          "VALUES (?, ?, ?, ?)", rows)
+        mem.add_fact("Foydalanuvchi o‘zbek tilida gapiradi", "language")
+        mem.add_fact("Python va Rust dasturlash tillarini biladi", "skills")
+        mem.add_fact("Sevimli dasturlash tili Python, Python bilan har kuni ishlaydi", "skills")
+        mem.add_semantic_memory("python", "Python loyihalari haqida suhbat")
+        mem.add_semantic_memory("python", "Python va FastAPI loyiha")  # REPLACE -> eski indeks o'chadi
+
+        def timed(fn, repeat=20):
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                result = fn()
+            return result, (time.perf_counter() - t0) / repeat * 1000
+
+        for query in ("kitob", "sport 4321", str(n - 1)):
+            fts_hits, fts_ms = timed(lambda: mem.search_conversations(query))
+            mem.fts_enabled = False
+            like_hits, like_ms = timed(lambda: mem.search_conversations(query))
+            mem.fts_enabled = True
+            print(f"{n} conversations, {query!r:14}: FTS5 {fts_ms:7.2f} ms ({len(fts_hits)} hits) | "
+                  f"LIKE {like_ms:7.2f} ms ({len(like_hits)} hits)")
+        print("search_facts('python')  ->", mem.search_facts("python"))
+        print("search_facts(\"o'zbek\")  ->", mem.search_facts("o'zbek"))
+        print("search_facts('dastur', prefix=True) ->", mem.search_facts("dastur", prefix=True))
+        print("search_semantic_memory('fastapi') ->", mem.search_semantic_memory("fastapi"))
+        print("search_semantic_memory('suhbat') ->", mem.search_semantic_memory("suhbat"), "(expected [])")
+        mem.close()
+        sys.exit(0)
+
     mem = MemoryEngine()
     print(f"User: {mem.get_user_name()}")
     # mem.add_fact("User is a developer", "profession")
@@ -2,97 +2,379 @@
 JARVIS - Vector Memory Core
 Google Gemini Embeddings yordamida "cheksiz xotira" tizimi.
 Matn va hujjatlarni vektor ko'rinishida saqlaydi va ma'no bo'yicha qidiradi.
+Vektorlar data/vector_memory/ da (vector_store.VectorStore: memmap float32 + meta.jsonl) turadi;
+eski data/vector_memory.json birinchi ishga tushishda ko'chiriladi.
+Embeddinglar diskda keshlanadi (embeddings.EmbeddingCache). backend:
+    auto   - Gemini + har xotira lokal n-gram nusxada (data/vector_memory_local/): tarmoq yoki API
+             bo'lmasa qidiruv shu nusxada ishlaydi; Gemini qaytgach faqat lokalda qolganlari fonda
+             Gemini indeksiga qayta embed qilinadi (backfill)
+    gemini - faqat Gemini: lokal nusxa va zaxira yo'q, embed qilinmagan xotira saqlanmaydi
+    local  - faqat lokal n-gram embeddinglar (tarmoqsiz)
 """
-import json
+import hashlib
 import os
-import numpy as np
-import google.generativeai as genai
-from config import GEMINI_API_KEY
+import threading
+import time
+from datetime import datetime
+from itertools import islice
 from utils import setup_logger
+from vector_store import VectorStore
+from embeddings import GeminiEmbedder, HashedNgramEmbedder, EmbeddingCache, CachedEmbedder
+
+try:
+    from config import EMBEDDING_SETTINGS
+except ImportError:
+    EMBEDDING_SETTINGS = {}
+
+DEFAULTS = {
+    "backend": "auto",        # auto: Gemini (bo'lsa) + lokal nusxa | gemini | local
+    "model": "models/embedding-001",
+    "threshold": 0.6,         # Gemini cosine chegarasi
+    "local_dim": 512,
+    "local_threshold": 0.35,  # n-gram vektorlar uchun (yozilish o'xshashligi) chegara
+    "cache_size": 20000,      # Diskdagi embedding keshi (yozuvlar soni, LRU)
+    "batch_size": 100,        # add_memories: bitta embedding so'rovi / bitta yozuv partiyasi (Gemini chegarasi 100)
+    "remote_cooldown": 60,    # Gemini xatosidan keyin shuncha sekund faqat lokal embeddinglar
+}
+
+
+def content_hash(text):
+    """Takrorlarni aniqlash uchun: bo'shliq va registrdan qat'i nazar bir xil matn -> bir xil hash"""
+    return hashlib.blake2b(" ".join(text.split()).lower().encode("utf-8"), digest_size=8).hexdigest()
+
 
 class MemoryCore:
-    def __init__(self):
+    def __init__(self, data_dir=None, settings=None, remote_backend=None):
         self.logger = setup_logger("MemoryCore")
-        genai.configure(api_key=GEMINI_API_KEY)
-        self.model_name = "models/embedding-001"
-        
-        self.memory_file = os.path.join(os.getcwd(), "data", "vector_memory.json")
-        self.memories = self._load_memory()
-
-    def _load_memory(self):
-        if os.path.exists(self.memory_file):
-            try:
-                with open(self.memory_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    # Convert stored lists back to numpy arrays for calculation (optional/on-the-fly)
-                    return data
-            except Exception as e:
-                self.logger.error(f"Memory load error: {e}")
-        return []
-
-    def _save_memory(self):
-        os.makedirs(os.path.dirname(self.memory_file), exist_ok=True)
-        with open(self.memory_file, "w", encoding="utf-8") as f:
-            json.dump(self.memories, f, ensure_ascii=False, indent=2)
-
-    def get_embedding(self, text):
-        """Matnni vektorga aylantirish"""
+        self.settings = {**DEFAULTS, **EMBEDDING_SETTINGS, **(settings or {})}
+        data_dir = data_dir or os.path.join(os.getcwd(), "data")
+        self.model_name = self.settings["model"]
+
+        backend = self.settings["backend"]
+        self.use_local = backend != "gemini"
+        self.local = HashedNgramEmbedder(dim=self.settings["local_dim"])
+        self.local_store = VectorStore(os.path.join(data_dir, "vector_memory_local")) if self.use_local else None
+        self.remote = None
+        if backend != "local":
+            cache = EmbeddingCache(os.path.join(data_dir, "embedding_cache.db"), self.settings["cache_size"])
+            embedder = remote_backend or GeminiEmbedder(self.model_name)
+            self.remote = CachedEmbedder(embedder, cache, self.logger, cooldown=self.settings["remote_cooldown"])
+            if not self.remote.available:
+                self.logger.warning("Gemini embeddings unavailable, using local n-gram embeddings." if self.use_local
+                                    else "Gemini embeddings unavailable and backend is 'gemini': memories are not saved.")
+
+        self.memory_file = os.path.join(data_dir, "vector_memory.json")  # eski format
+        self.store = VectorStore(os.path.join(data_dir, "vector_memory"))
+        self._hashes = None  # mavjud xotiralar content_hash'lari (birinchi qo'shishda quriladi)
+        # auto: Gemini indeksida yo'q lokal xotiralar bo'lishi mumkin (None: hali tekshirilmagan)
+        self._backfill_pending = None if self.use_local and self.remote is not None else False
+        self._backfill_thread = None
+        self._migrate()
+
+    def _migrate(self):
         try:
-            result = genai.embed_content(
-                model=self.model_name,
-                content=text,
-                task_type="retrieval_document",
-                title="JARVIS Memory"
-            )
-            return result['embedding']
+            moved = self.store.migrate_json(self.memory_file)
+            if moved:
+                self.logger.info(f"Migrated {moved} memories from {self.memory_file}")
+            # Lokal nusxa bo'sh bo'lsa mavjud xotiralardan to'ldiriladi (tarmoqsiz, arzon)
+            if self.use_local and len(self.store) and not len(self.local_store):
+                self.local_store.add_many([self.local.embed(m["text"]) for m in self.store.meta], self.store.meta)
         except Exception as e:
-            self.logger.error(f"Embedding error: {e}")
+            self.logger.error(f"Memory migration error: {e}")
+
+    @property
+    def memories(self):
+        """Saqlangan xotiralar metadata'si (text, source, timestamp)"""
+        return self.local_store.meta if self.use_local else self.store.meta
+
+    def get_embedding(self, text, task_type="retrieval_document"):
+        """Matnni vektorga aylantirish (Gemini, kesh orqali); mavjud bo'lmasa None"""
+        if self.remote is None or not self.remote.available:
             return None
+        return self.remote.embed(text, task_type)
 
     def add_memory(self, text, source="User"):
         """Xotiraga ma'lumot qo'shish"""
-        vector = self.get_embedding(text)
-        if not vector:
-            return "Xotiraga saqlashda xatolik (API Error)."
-            
-        memory_item = {
-            "text": text,
-            "vector": vector,
-            "source": source,
-            "timestamp": str(os.path.getmtime(self.memory_file)) if os.path.exists(self.memory_file) else "New"
-        }
-        
-        self.memories.append(memory_item)
-        self._save_memory()
+        stats = self.add_memories([text], source=source)
+        if stats["duplicates"]:
+            return "Bu ma'lumot xotirada allaqachon bor."
+        if stats["remote_failed"] and not stats["added"]:
+            return "Xotiraga saqlashda xatolik (Gemini embedding mavjud emas)."
+        if not stats["added"]:
+            return "Xotiraga saqlashda xatolik (bo'sh matn)."
         return "Ma'lumot xotiraga muvaffaqiyatli saqlandi."
 
+    def _known_hashes(self):
+        if self._hashes is None:
+            self._hashes = {m.get("hash") or content_hash(m["text"]) for m in self.memories}
+        return self._hashes
+
+    # --- BACKFILL (auto) ---
+
+    def _maybe_backfill(self):
+        """Gemini qaytgan bo'lsa faqat lokalda qolgan xotiralarni fonda Gemini indeksiga yozish"""
+        if self._backfill_pending is False or not self.remote.available:
+            return
+        if self._backfill_thread is not None and self._backfill_thread.is_alive():
+            return
+        self._backfill_thread = threading.Thread(target=self.backfill_remote, name="memory-backfill", daemon=True)
+        self._backfill_thread.start()
+
+    def backfill_remote(self, batch_size=None):
+        """
+        Lokal nusxada bor, Gemini store'da yo'q xotiralarni partiyalab embed qilish. add_memories
+        avval Gemini store'ga, keyin lokalga yozadi, shuning uchun bu ro'yxat faqat xato bo'lganlar.
+        Qaytaradi: Gemini store'ga qo'shilganlar soni.
+        """
+        if self.remote is None or not self.use_local:
+            return 0
+        batch_size = batch_size or self.settings["batch_size"]
+        # Avval lokal snapshot: undagi har xotira (muvaffaqiyatli bo'lsa) Gemini store'ga allaqachon yozilgan
+        local = list(self.local_store.meta)
+        in_remote = {m.get("hash") or content_hash(m["text"]) for m in self.store.meta}
+        missing = [m for m in local if (m.get("hash") or content_hash(m["text"])) not in in_remote]
+        added = 0
+        for start in range(0, len(missing), batch_size):
+            if not self.remote.available:
+                self._backfill_pending = True
+                break
+            metas = missing[start:start + batch_size]
+            vectors = self.remote.embed_many([m["text"] for m in metas])
+            pairs = [(v, m) for v, m in zip(vectors, metas) if v is not None]
+            if pairs:
+                try:
+                    added += self.store.add_many([v for v, _ in pairs], [m for _, m in pairs])
+                except ValueError as e:
+                    self.logger.error(f"Memory backfill error: {e}")
+                    self._backfill_pending = True
+                    break
+            if len(pairs) < len(metas):
+                self._backfill_pending = True
+                break
+        else:
+            self._backfill_pending = False
+        if added:
+            self.logger.info(f"Backfilled {added} local-only memories into the Gemini index.")
+        return added
+
+    def add_memories(self, items, source="User", batch_size=None, progress=None):
+        """
+        Ko'p xotirani oqim bilan qo'shish (chat loglari, hisobotlar, eslatmalar importi).
+        items: matnlar yoki {"text", "source"} lug'atlari (generator ham bo'ladi). Har partiya uchun
+        bitta embedding so'rovi va har store'ga bitta yozuv; takrorlar content_hash bo'yicha tashlanadi.
+        progress(stats) har partiyadan keyin chaqiriladi. Natija: statistika lug'ati.
+        """
+        batch_size = batch_size or self.settings["batch_size"]
+        if self.use_local and self.remote is not None:
+            self._maybe_backfill()
+        use_remote = self.remote is not None and self.remote.available
+        known = self._known_hashes()
+        stats = {"seen": 0, "added": 0, "duplicates": 0, "empty": 0, "remote_failed": 0,
+                 "batches": 0, "elapsed": 0.0, "per_sec": 0.0}
+        t0 = time.perf_counter()
+        stream = iter(items)
+        while True:
+            chunk = list(islice(stream, batch_size))
+            if not chunk:
+                break
+            stats["seen"] += len(chunk)
+            texts, metas = [], []
+            for item in chunk:
+                text = (item.get("text") if isinstance(item, dict) else item) or ""
+                text = text.strip()
+                if not text:
+                    stats["empty"] += 1
+                    continue
+                digest = content_hash(text)
+                if digest in known:
+                    stats["duplicates"] += 1
+                    continue
+                known.add(digest)
+                texts.append(text)
+                metas.append({
+                    "text": text,
+                    "source": item.get("source", source) if isinstance(item, dict) else source,
+                    "timestamp": datetime.now().isoformat(timespec="seconds"),
+                    "hash": digest,
+                })
+            if not texts:
+                continue
+
+            pairs = []
+            if use_remote:
+                vectors = self.remote.embed_many(texts)
+                pairs = [(v, m) for v, m in zip(vectors, metas) if v is not None]
+                if pairs:
+                    try:
+                        self.store.add_many([v for v, _ in pairs], [m for _, m in pairs])
+                    except ValueError as e:
+                        self.logger.error(f"Memory store error: {e}")
+                        pairs = []
+            if self.remote is not None:
+                stats["remote_failed"] += len(texts) - len(pairs)
+            if self.use_local:
+                self.local_store.add_many(self.local.embed_many(texts), metas)
+                stats["added"] += len(texts)
+                if self.remote is not None and len(pairs) < len(texts):
+                    self._backfill_pending = True
+            else:
+                # gemini: faqat embed qilinganlar saqlanadi; qolganlari keyingi urinishda qayta qo'shiladi
+                stored = {m["hash"] for _, m in pairs}
+                known.difference_update(m["hash"] for m in metas if m["hash"] not in stored)
+                stats["added"] += len(pairs)
+
+            stats["batches"] += 1
+            stats["elapsed"] = round(time.perf_counter() - t0, 3)
+            stats["per_sec"] = round(stats["added"] / stats["elapsed"], 1) if stats["elapsed"] else 0.0
+            if progress:
+                progress(dict(stats))
+            elif stats["batches"] % 10 == 0:
+                self.logger.info(f"Memory import: {stats['added']} added, {stats['per_sec']}/s")
+
+        stats["elapsed"] = round(time.perf_counter() - t0, 3)
+        stats["per_sec"] = round(stats["added"] / stats["elapsed"], 1) if stats["elapsed"] else 0.0
+        if stats["remote_failed"]:
+            self.logger.warning(f"{stats['remote_failed']} memories saved to the local index only." if self.use_local
+                                else f"{stats['remote_failed']} memories not saved (Gemini embeddings unavailable).")
+        if stats["seen"] > 1:
+            self.logger.info(f"Memory import done: {stats}")
+        return stats
+
     def search_memory(self, query, top_k=3):
-        """Xotiradan qidirish (Cosine Similarity)"""
-        if not self.memories:
-            return []
-            
-        query_vector = self.get_embedding(query)
-        if not query_vector:
-            return []
-            
-        q_vec = np.array(query_vector)
-        results = []
-        
-        for mem in self.memories:
-            m_vec = np.array(mem["vector"])
-            # Cosine Similarity Formula
-            similarity = np.dot(q_vec, m_vec) / (np.linalg.norm(q_vec) * np.linalg.norm(m_vec))
-            results.append((similarity, mem))
-            
-        # Sort by similarity (highest first)
-        results.sort(key=lambda x: x[0], reverse=True)
-        
-        return [r[1] for r in results[:top_k] if r[0] > 0.6] # Threshold 0.6
+        """Xotiradan qidirish (Cosine Similarity): Gemini indeksi, yetmasa lokal n-gram indeksi"""
+        results, seen = [], set()
+        if self.use_local and self.remote is not None:
+            self._maybe_backfill()
+        if len(self.store):
+            query_vector = self.get_embedding(query, "retrieval_query")
+            if query_vector is not None:
+                # Vektorlar normallashtirilgan: cosine = bitta matritsa-vektor ko'paytmasi, top-k argpartition
+                for score, i in self.store.search(query_vector, top_k, self.settings["threshold"]):
+                    item = self.store.meta[i]
+                    seen.add(item["text"])
+                    results.append({**item, "score": round(score, 4)})
+
+        if self.use_local and len(results) < top_k and len(self.local_store):
+            hits = self.local_store.search(self.local.embed(query), top_k, self.settings["local_threshold"])
+            for score, i in hits:
+                item = self.local_store.meta[i]
+                if item["text"] not in seen and len(results) < top_k:
+                    seen.add(item["text"])
+                    results.append({**item, "score": round(score, 4), "backend": "local"})
+        return results
 
 if __name__ == "__main__":
-    mem = MemoryCore()
-    # Test
+    import sys
+    import tempfile
+
+    # --offline: vaqtinchalik papkada, faqat lokal embeddinglar bilan (tarmoq kerak emas)
+    offline = "--offline" in sys.argv
+    if "--bulk" in sys.argv:
+        # add_memory sikli vs add_memories: tarmoq kechikishini taqlid qiluvchi lokal o'rinbosar API
+        import numpy as np
+
+        class _StandInRemote(HashedNgramEmbedder):
+            def __init__(self, latency=0.04):
+                super().__init__(dim=768)
+                self.name = "stand-in:remote"
+                self.latency = latency
+                self.calls = 0
+
+            def embed(self, text, task_type=None):
+                self.calls += 1
+                time.sleep(self.latency)
+                return super().embed(text)
+
+            def embed_many(self, texts, task_type=None):
+                self.calls += 1
+                time.sleep(self.latency + 0.0005 * len(texts))
+                return np.stack([HashedNgramEmbedder.embed(self, t) for t in texts])
+
+        n = int(sys.argv[sys.argv.index("--bulk") + 1]) if len(sys.argv) > sys.argv.index("--bulk") + 1 else 300
+        notes = [f"Eslatma {i}: {i % 17}-loyiha bo'yicha uchrashuv, mavzu {i * 7 % 101}" for i in range(n)]
+
+        remote = _StandInRemote()
+        mem = MemoryCore(data_dir=tempfile.mkdtemp(), remote_backend=remote)
+        t0 = time.perf_counter()
+        for text in notes:
+            mem.add_memory(text)
+        loop_s = time.perf_counter() - t0
+        print(f"add_memory loop : {n} notes in {loop_s:6.2f} s ({n / loop_s:7.1f}/s), API calls {remote.calls}")
+        assert remote.calls == n and len(mem.store) == n
+
+        remote = _StandInRemote()
+        mem = MemoryCore(data_dir=tempfile.mkdtemp(), remote_backend=remote)
+        stream = (notes[i % n] if i < n else notes[i - n] for i in range(n + n // 5))  # 20% takror
+        stats = mem.add_memories(stream, source="import",
+                                 progress=lambda st: print(f"  batch {st['batches']}: {st['added']} added, "
+                                                           f"{st['per_sec']}/s"))
+        print(f"add_memories    : {stats['added']} notes in {stats['elapsed']:6.2f} s ({stats['per_sec']:7.1f}/s), "
+              f"API calls {remote.calls}, duplicates skipped {stats['duplicates']}")
+        assert stats["seen"] == n + n // 5 and stats["added"] == n and stats["duplicates"] == n // 5
+        assert remote.calls == stats["batches"] < n and stats["remote_failed"] == 0
+        found = [r["text"] for r in mem.search_memory(notes[5], top_k=1)]
+        print(f"search: {found}")
+        assert len(mem.store) == n and found == [notes[5]]
+        sys.exit(0)
+    if offline:
+        mem = MemoryCore(data_dir=tempfile.mkdtemp(), settings={"backend": "local"})
+        for text in ("Mening ismim Sardor va men dasturchiman.", "Sevimli taomim osh.",
+                     "Ertaga soat 9 da O'zbekiston bo'yicha hisobot topshirishim kerak."):
+            print(mem.add_memory(text))
+    else:
+        mem = MemoryCore()
     # print(mem.add_memory("Mening ismim Sardor va men dasturchiman."))
-    res = mem.search_memory("Men kimmam?")
+    res = mem.search_memory("Mening ismim nima?" if offline else "Men kimmam?")
     for r in res:
-        print(f"Topildi: {r['text']}")
+        print(f"Topildi: {r['text']} ({r['score']})")
+    if offline:
+        found = [r["text"] for r in mem.search_memory("o`zbekiston hisobot")]
+        print(found)
+        assert res and res[0]["text"].startswith("Mening ismim Sardor")
+        assert found and "hisobot" in found[0]
+        assert mem.add_memory("mening  ismim sardor va men dasturchiman.") == "Bu ma'lumot xotirada allaqachon bor."
+
+        # API kaliti bor, tarmoq yo'q: bitta urinish, keyin cooldown davomida faqat lokal
+        class _Flaky(HashedNgramEmbedder):
+            down = True
+            calls = 0
+
+            def embed(self, text, task_type=None):
+                _Flaky.calls += 1
+                if _Flaky.down:
+                    raise ConnectionError("network unreachable")
+                return super().embed(text)
+
+            def embed_many(self, texts, task_type=None):
+                _Flaky.calls += 1
+                if _Flaky.down:
+                    raise ConnectionError("network unreachable")
+                return [HashedNgramEmbedder.embed(self, t) for t in texts]
+
+        mem = MemoryCore(data_dir=tempfile.mkdtemp(), remote_backend=_Flaky(), settings={"remote_cooldown": 0.5})
+        stats = mem.add_memories(["Sevimli taomim osh.", "Ertaga soat 9 da hisobot topshiraman."])
+        hits = [mem.search_memory("ertaga hisobot topshirish") for _ in range(5)]
+        assert stats["added"] == 2 and stats["remote_failed"] == 2 and len(mem.store) == 0
+        assert all(h and "hisobot" in h[0]["text"] and h[0]["backend"] == "local" for h in hits)
+        assert _Flaky.calls == 1, _Flaky.calls
+        print(f"unreachable remote: {stats['added']} saved locally, 5 searches served locally, "
+              f"{_Flaky.calls} API attempt")
+
+        # Tarmoq qaytdi: cooldown'dan keyingi birinchi murojaat lokalda qolganlarni Gemini indeksiga yozadi
+        _Flaky.down = False
+        time.sleep(0.6)
+        mem.search_memory("osh")
+        mem._backfill_thread.join()
+        assert len(mem.store) == 2 and mem._backfill_pending is False
+        assert mem.search_memory("Sevimli taomim osh.")[0].get("backend") is None  # Gemini indeksidan
+        print(f"network back: {len(mem.store)} local-only memories backfilled into the remote index")
+
+        # backend="gemini": lokal nusxa va zaxira yo'q, embed qilinmagan xotira saqlanmaydi
+        _Flaky.down = True
+        strict = MemoryCore(data_dir=tempfile.mkdtemp(), remote_backend=_Flaky(), settings={"backend": "gemini"})
+        failed = strict.add_memory("Sevimli taomim osh.")
+        assert strict.local_store is None and not strict.memories and not strict.search_memory("osh")
+        _Flaky.down = False
+        strict.remote._down_until = 0.0
+        print(f"gemini-only: {failed!r} -> {strict.add_memory('Sevimli taomim osh.')!r}")
+        assert len(strict.store) == 1
@@ -0,0 +1,278 @@
+"""
+JARVIS - Memory Retention Engine
+commands_history va conversation_history cheksiz o'smasligi uchun saqlash bosqichlari:
+- oxirgi N kun xom holda qoladi;
+- eski buyruqlar command_daily_rollup'ga (kun, action, soni) yig'iladi;
+- eski suhbatlar kunlik xulosa sifatida semantic_memory'ga ("conversation:YYYY-MM-DD") o'tadi;
+- route_idle_days davomida ishlatilmagan o'rganilgan LLM yo'nalishlari (learned_routes) o'chiriladi;
+- bo'sh sahifalar idle vaqtida incremental_vacuum bilan qismlab qaytariladi;
+- baza max_db_mb dan oshsa xom saqlash muddati min_raw_days gacha qisqartiriladi.
+"""
+import json
+import re
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from utils import setup_logger
+from memory import fold_apostrophes
+
+try:
+    from config import MEMORY_RETENTION
+except ImportError:
+    MEMORY_RETENTION = {}
+
+DEFAULTS = {
+    "enabled": True,
+    "commands_raw_days": 30,
+    "conversations_raw_days": 14,
+    "max_db_mb": 200,
+    "min_raw_days": 2,
+    "route_idle_days": 90,
+    "vacuum_pages": 500,
+    "idle_seconds": 120,
+    "check_interval": 600,
+}
+
+CONVERSATION_TOPIC = "conversation:{day}"
+_WORD_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)*")
+_STOPWORDS = {
+    "janob", "jarvis", "menga", "uchun", "bilan", "haqida", "qanday", "nima", "qilib", "kerak",
+    "please", "what", "with", "that", "this", "from", "have", "about",
+}
+
+# Buyruq matnining birinchi so'zi = action (IntentEngine ham shunday ajratadi)
+_ACTION_SQL = ("lower(CASE WHEN instr(trim(command), ' ') > 0 "
+               "THEN substr(trim(command), 1, instr(trim(command), ' ') - 1) ELSE trim(command) END)")
+
+
+def extractive_summary(day, turns, max_keywords=8, max_queries=5, max_len=600):
+    """LLM'siz kunlik xulosa: suhbatlar soni, kalit so'zlar va birinchi savollar"""
+    words = Counter()
+    queries = []
+    for query, _ in turns:
+        query = (query or "").strip()
+        for word in _WORD_RE.findall(fold_apostrophes(query)):
+            if len(word) >= 4 and word not in _STOPWORDS:
+                words[word] += 1
+        if query and query not in queries and len(queries) < max_queries:
+            queries.append(query[:80])
+    keywords = ", ".join(w for w, _ in words.most_common(max_keywords))
+    summary = f"{day}: {len(turns)} ta suhbat. Mavzular: {keywords or '-'}. Savollar: {'; '.join(queries)}"
+    return summary[:max_len]
+
+
+class RetentionEngine:
+    """
+    MemoryEngine ustidagi saqlash siyosati. run_once() bitta to'liq sikl; start(idle_check)
+    uni fon oqimida faqat idle_check() True bo'lganda ishga tushiradi.
+    summarize(day, [(user_query, assistant_response), ...]) -> str  (standart: extractive_summary)
+    """
+
+    def __init__(self, memory, settings=None, summarize=None):
+        self.logger = setup_logger("Retention")
+        self.memory = memory
+        self.settings = {**DEFAULTS, **MEMORY_RETENTION, **(settings or {})}
+        self.summarize = summarize or extractive_summary
+        self.last_run = None
+        self.last_stats = {}
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- SIZE ---
+
+    def db_size_mb(self, conn=None, live=False):
+        """Baza hajmi (MB). live=True: bo'sh (freelist) sahifalarsiz"""
+        conn = conn or self.memory.pool.connection()
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        if live:
+            pages -= conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return pages * page_size / (1024 * 1024)
+
+    # --- TIERS ---
+
+    def rollup_commands(self, conn, raw_days):
+        """raw_days'dan eski buyruqlarni kunlik (day, action) yig'indiga o'tkazish"""
+        cutoff = (datetime.now() - timedelta(days=raw_days)).strftime("%Y-%m-%d")
+        with conn:
+            conn.execute(f"""
+                INSERT INTO command_daily_rollup (day, action, count)
+                SELECT date(timestamp), {_ACTION_SQL}, COUNT(*) FROM commands_history
+                WHERE timestamp < ? GROUP BY 1, 2
+                ON CONFLICT(day, action) DO UPDATE SET count = count + excluded.count
+            """, (cutoff,))
+            return conn.execute("DELETE FROM commands_history WHERE timestamp < ?", (cutoff,)).rowcount
+
+    def fold_conversations(self, conn, raw_days):
+        """raw_days'dan eski suhbatlarni kunlik xulosaga aylantirib semantic_memory'ga yozish"""
+        cutoff = (datetime.now() - timedelta(days=raw_days)).strftime("%Y-%m-%d")
+        rows = conn.execute(
+            "SELECT date(timestamp), user_query, assistant_response FROM conversation_history "
+            "WHERE timestamp < ? ORDER BY timestamp", (cutoff,)
+        ).fetchall()
+        if not rows:
+            return 0, 0
+
+        by_day = {}
+        for day, query, response in rows:
+            by_day.setdefault(day, []).append((query, response))
+
+        # Xulosalar tranzaksiyadan tashqarida (summarize LLM bo'lishi mumkin)
+        summaries = []
+        for day, turns in by_day.items():
+            topic = CONVERSATION_TOPIC.format(day=day)
+            existing = conn.execute(
+                "SELECT summary, context FROM semantic_memory WHERE topic=?", (topic,)
+            ).fetchone()
+            summary = self.summarize(day, turns)
+            folded = len(turns)
+            if existing and existing[0]:
+                summary = f"{existing[0]}\n{summary}"
+                try:
+                    folded += json.loads(existing[1] or "{}").get("turns", 0)
+                except ValueError:
+                    pass
+            context = json.dumps({"turns": folded, "folded_at": datetime.now().isoformat(timespec="seconds")})
+            summaries.append((topic, summary, context, datetime.now()))
+        conn.commit()
+
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO semantic_memory (topic, summary, context, created_at) VALUES (?, ?, ?, ?)",
+                summaries
+            )
+            conn.execute("DELETE FROM conversation_history WHERE timestamp < ?", (cutoff,))
+        return len(rows), len(by_day)
+
+    def vacuum(self, conn, pages=None):
+        """Bo'sh sahifalarni qaytarish (pages=0 -> hammasi). Qaytaradi: bo'shatilgan sahifalar"""
+        pages = self.settings["vacuum_pages"] if pages is None else pages
+        mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if mode != 2:
+            # Eski baza: bir martalik o'tkazish (to'liq VACUUM, faqat idle vaqtida)
+            self.logger.info("Converting database to incremental auto_vacuum (one-time VACUUM)...")
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+            return 0
+        before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if before:
+            # execute() pragma'ni faqat bir qadam bajaradi (1 sahifa); executescript oxirigacha
+            conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        return before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+    # --- CYCLE ---
+
+    def run_once(self):
+        """Bitta saqlash sikli; statistika dict qaytaradi"""
+        if not self._run_lock.acquire(blocking=False):
+            return self.last_stats
+        try:
+            conn = self.memory.pool.connection()
+            s = self.settings
+            cmd_days, conv_days = s["commands_raw_days"], s["conversations_raw_days"]
+            stats = {"commands_rolled": 0, "conversations_folded": 0, "days_folded": 0,
+                     "freed_pages": 0, "size_mb_before": round(self.db_size_mb(conn), 2)}
+
+            while True:
+                stats["commands_rolled"] += self.rollup_commands(conn, cmd_days)
+                turns, days = self.fold_conversations(conn, conv_days)
+                stats["conversations_folded"] += turns
+                stats["days_folded"] += days
+
+                # Hajm chegarasi: xom saqlash muddatini yarmiga qisqartirib qayta
+                if self.db_size_mb(conn, live=True) <= s["max_db_mb"]:
+                    break
+                floor = s["min_raw_days"]
+                if cmd_days <= floor and conv_days <= floor:
+                    self.logger.warning(f"DB size cap {s['max_db_mb']} MB not reachable at {floor} raw days.")
+                    break
+                cmd_days, conv_days = max(floor, cmd_days // 2), max(floor, conv_days // 2)
+                self.logger.info(f"DB over cap, shrinking raw retention to {cmd_days}/{conv_days} days.")
+
+            stats["routes_pruned"] = self.memory.prune_learned_routes(s["route_idle_days"])
+            over_cap = self.db_size_mb(conn) > s["max_db_mb"]
+            stats["freed_pages"] = self.vacuum(conn, pages=0 if over_cap else None)
+            stats["size_mb_after"] = round(self.db_size_mb(conn), 2)
+            stats["raw_days"] = [cmd_days, conv_days]
+            self.last_run = datetime.now()
+            self.last_stats = stats
+            if stats["commands_rolled"] or stats["conversations_folded"] or stats["freed_pages"] or stats["routes_pruned"]:
+                self.logger.info(f"Retention: {stats}")
+            return stats
+        except Exception as e:
+            self.logger.error(f"Retention error: {e}")
+            return {"error": str(e)}
+        finally:
+            self._run_lock.release()
+
+    def start(self, idle_check=None):
+        """Fon oqimi: har check_interval sekundda, idle bo'lsa run_once()"""
+        if self._thread or not self.settings["enabled"]:
+            return self._thread
+
+        def loop():
+            while not self._stop.wait(self.settings["check_interval"]):
+                if idle_check is None or idle_check():
+                    self.run_once()
+
+        self._thread = threading.Thread(target=loop, name="Retention", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import tempfile
+    import time
+    from memory import MemoryEngine
+
+    # Namoyish: 90 kunlik sun'iy tarix, 30/14 kunlik saqlash
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 90
+    per_day = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    mem = MemoryEngine(db_path=os.path.join(tempfile.mkdtemp(), "retention.db"))
+    actions = ["open_app chrome", "youtube_search lofi", "get_weather", "volume_up", "get_time"]
+    now = datetime.now()
+    commands, conversations = [], []
+    for d in range(days):
+        for i in range(per_day):
+            ts = now - timedelta(days=d, minutes=i * 5)
+            commands.append((ts, actions[(d + i) % len(actions)], "ok", "uz"))
+            if i % 4 == 0:
+                conversations.append((ts, f"python loyiha va kitob haqida savol {i % 7}", "javob " * 40, ""))
+    mem.add_history_many(commands)
+    mem._execute_many("INSERT INTO conversation_history (timestamp, user_query, assistant_response, context) "
+                      "VALUES (?, ?, ?, ?)", conversations)
+
+    # O'rganilgan yo'nalishlar: biri yaqinda ishlatilgan, ikkinchisi 120 kun oldin saqlanib hech ishlatilmagan
+    mem.save_learned_route("spotifyni och", "open_app", {"app_name": "spotify"})
+    mem.save_learned_route("eski ibora", "get_time", {})
+    mem._query("UPDATE learned_routes SET created_at = ?", (now - timedelta(days=120),), commit=True)
+    mem.touch_learned_routes({"spotifyni och": 3})
+
+    engine = RetentionEngine(mem, settings={"max_db_mb": 1000})
+    t0 = time.perf_counter()
+    history_before = mem.get_command_history(limit=50)
+    read_before = (time.perf_counter() - t0) * 1000
+    stats = engine.run_once()
+    print(f"Retention cycle: {stats}")
+    left = mem._query("SELECT COUNT(*) FROM commands_history", fetch_one=True)[0]
+    rolled = mem._query("SELECT SUM(count) FROM command_daily_rollup", fetch_one=True)[0]
+    print(f"commands_history: {len(commands)} -> {left} raw + {rolled} rolled up (total {left + rolled})")
+    print(f"top archived actions: {mem.get_action_rollup(limit=3)}")
+    routes = mem._query("SELECT phrase, hits FROM learned_routes")
+    print(f"learned routes kept: {routes}")
+    assert stats["routes_pruned"] == 1 and routes == [("spotifyni och", 3)]
+    oldest = (now - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    print(f"semantic_memory[{oldest}]: {mem.get_semantic_memory(CONVERSATION_TOPIC.format(day=oldest))[0]}")
+    print(f"search_semantic_memory('kitob'): {len(mem.search_semantic_memory('kitob', limit=100))} day summaries")
+
+    # Hajm chegarasi: juda kichik cap -> xom muddat min_raw_days gacha qisqaradi
+    capped = RetentionEngine(mem, settings={"max_db_mb": 0.2})
+    print(f"Capped cycle: {capped.run_once()}")
+    mem.close()
@@ -2,20 +2,74 @@ import os
 import json
 import threading
 import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
+from bm25_index import BM25Index, make_snippet, tokenize
+from db_pool import get_pool
+from doc_chunker import process_file
+
+try:
+    from config import NEURAL_INDEX_SETTINGS
+except ImportError:
+    NEURAL_INDEX_SETTINGS = {}
+
+DEFAULTS = {
+    "hub_path": "C:/JARVIS_HUB" if os.name == "nt" else os.path.join(os.path.expanduser("~"), "JARVIS_HUB"),
+    "extensions": [".txt", ".md", ".py", ".js", ".json", ".pdf", ".docx"],
+    "chunk_chars": 1200,
+    "overlap": 200,
+    "workers": 0,             # 0 = CPU soni - 1
+    "pool_min_files": 8,
+    "max_file_mb": 50,
+    "checkpoint_every": 200,
+}
+
+
+def _chunk_path(doc_id):
+    """BM25 hujjat id'si "yo'l#n" -> yo'l (eski indeksdagi butun fayl id'lari o'zgarmaydi)"""
+    path, sep, seq = doc_id.rpartition("#")
+    return path if sep and seq.isdigit() else doc_id
+
 
 class NeuralIndexer:
     """
     JARVIS - Neural RAG Core (Elite v11.0)
     Indexes local files for semantic search and Q&A.
+    Har fayl to'liq o'qiladi va bir-birini qoplaydigan bo'laklarga bo'linadi (doc_chunker); matn
+    ajratish jarayonlar pool'ida, natijalar kelishi bilan BM25 va data/neural_chunks.db ga yoziladi.
     """
-    def __init__(self, brain=None, terminal_callback=None):
+    def __init__(self, brain=None, terminal_callback=None, data_dir=None, settings=None):
         self.brain = brain
         self.log = terminal_callback
-        self.hub_path = Path("C:/JARVIS_HUB")
-        self.index_path = os.path.join(os.getcwd(), "data", "neural_index.json")
+        self.settings = {**DEFAULTS, **NEURAL_INDEX_SETTINGS, **(settings or {})}
+        self.hub_path = Path(self.settings["hub_path"])
+        data_dir = data_dir or os.path.join(os.getcwd(), "data")
+        os.makedirs(data_dir, exist_ok=True)
+        self.index_path = os.path.join(data_dir, "neural_index.json")
         self.index = {}
+        self.last_stats = {}
+        self._indexing = threading.Lock()
         self._load_index()
+        # Bo'laklar matni (snippet uchun): xotirada emas, SQLite'da
+        self.chunks = get_pool(os.path.join(data_dir, "neural_chunks.db"))
+        conn = self.chunks.connection()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS chunks (
+                    chunk_id TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    text TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_path ON chunks(path)")
+        # Fayl nomi + bo'lak matni bo'yicha BM25 teskari indeksi: postinglar shu bazada, checkpoint'da
+        # faqat o'zgargan termlar yoziladi
+        self.bm25 = BM25Index(self.chunks.db_path)
+        if self.index and not len(self.bm25):
+            self._rebuild_bm25()
+        legacy = os.path.join(data_dir, "neural_bm25.json")
+        if os.path.exists(legacy):
+            os.remove(legacy)
 
     def _load_index(self):
         if os.path.exists(self.index_path):
@@ -26,54 +80,227 @@ class NeuralIndexer:
 
     def _save_index(self):
         os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
-        with open(self.index_path, 'w', encoding='utf-8') as f:
+        tmp = self.index_path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
             json.dump(self.index, f, indent=4)
+        os.replace(tmp, self.index_path)
+
+    def _rebuild_bm25(self):
+        """BM25 jadvallari bo'sh bo'lsa (eski JSON indeks): bo'laklar bazasidan (eski yozuvlar uchun previewdan)"""
+        chunked = set()
+        for chunk_id, path, text in self.chunks.connection().execute("SELECT chunk_id, path, text FROM chunks"):
+            self.bm25.add(chunk_id, os.path.basename(path), text)
+            chunked.add(path)
+        for path, info in self.index.items():
+            if path not in chunked:
+                self.bm25.add(path, os.path.basename(path), info.get("preview", ""))
+        self.bm25.save()
+
+    # --- INDEXING ---
+
+    def _drop_file(self, path):
+        info = self.index.pop(path, None) or {}
+        self._drop_chunks(path, info)
+
+    def _drop_chunks(self, path, info):
+        self.bm25.remove(path)  # eski (bo'laklanmagan) yozuv
+        for seq in range(info.get("chunks", 0)):
+            self.bm25.remove(f"{path}#{seq}")
+        conn = self.chunks.connection()
+        with conn:
+            conn.execute("DELETE FROM chunks WHERE path = ?", (path,))
+
+    def _store(self, result, mtime):
+        """Ishchidan kelgan bitta fayl natijasini indekslarga yozish"""
+        path, name = result["path"], os.path.basename(result["path"])
+        info = self.index.get(path, {})
+        if result["status"] == "unchanged":
+            info["mtime"] = mtime  # faqat vaqt o'zgargan (masalan, nusxalash)
+            return
+        self._drop_chunks(path, info)
+        chunks = result["chunks"]
+        conn = self.chunks.connection()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO chunks (chunk_id, path, text) VALUES (?, ?, ?)",
+                             [(f"{path}#{seq}", path, text) for seq, text in enumerate(chunks)])
+        for seq, text in enumerate(chunks):
+            self.bm25.add(f"{path}#{seq}", name, text)
+        self.index[path] = {"mtime": mtime, "hash": result["hash"], "size": result["size"],
+                            "chunks": len(chunks), "preview": chunks[0][:500] if chunks else ""}
+
+    def _scan(self):
+        """Hub'dagi mos fayllar: {yo'l: mtime}"""
+        extensions = tuple(ext.lower() for ext in self.settings["extensions"])
+        found = {}
+        for root, dirs, files in os.walk(self.hub_path):
+            for file in files:
+                if file.lower().endswith(extensions):
+                    file_path = os.path.join(root, file)
+                    try:
+                        found[file_path] = os.path.getmtime(file_path)
+                    except OSError:
+                        continue
+        return found
+
+    def _results(self, pending):
+        """process_file natijalari tugash tartibida; ko'p fayl bo'lsa jarayonlar pool'ida"""
+        args = {"chunk_chars": self.settings["chunk_chars"], "overlap": self.settings["overlap"],
+                "max_bytes": int(self.settings["max_file_mb"] * 1024 * 1024)}
+        workers = self.settings["workers"] or max(1, (os.cpu_count() or 2) - 1)
+        if workers <= 1 or len(pending) < self.settings["pool_min_files"]:
+            for path in pending:
+                yield process_file(path, self.index.get(path, {}).get("hash"), **args)
+            return
+        # Bir vaqtda ko'pi bilan workers*2 vazifa: natijalar xotirada to'planib qolmaydi
+        queue = iter(pending)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            running = set()
+            while True:
+                for path in queue:
+                    running.add(pool.submit(process_file, path, self.index.get(path, {}).get("hash"), **args))
+                    if len(running) >= workers * 2:
+                        break
+                if not running:
+                    break
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+    def _index_task(self):
+        started = time.perf_counter()
+        stats = {"files": 0, "indexed": 0, "unchanged": 0, "skipped": 0, "errors": 0, "removed": 0, "chunks": 0}
+        found = self._scan()
+        stats["files"] = len(found)
+        # mtime o'zgarmagan va hash'i bor fayllar o'qilmaydi ham
+        pending = [path for path, mtime in found.items()
+                   if not self.index.get(path, {}).get("hash") or self.index[path].get("mtime") != mtime]
+        for done, result in enumerate(self._results(pending), 1):
+            status = result["status"]
+            if status == "error":
+                stats["errors"] += 1
+                if self.log: self.log(f"⚠️ [NEURAL] {os.path.basename(result['path'])}: {result['error']}")
+            elif status == "skipped":
+                stats["skipped"] += 1
+            else:
+                self._store(result, found[result["path"]])
+                if status == "unchanged":
+                    stats["unchanged"] += 1
+                else:
+                    stats["indexed"] += 1
+                    stats["chunks"] += len(result["chunks"])
+                    if self.log: self.log(f"📑 [NEURAL] Indexed: {os.path.basename(result['path'])} "
+                                          f"({len(result['chunks'])} chunks)")
+            if done % self.settings["checkpoint_every"] == 0:
+                self._save_index()
+                self.bm25.save()
+
+        # O'chirilgan fayllar indeksdan ham olib tashlanadi (hub mavjud bo'lsagina)
+        if os.path.isdir(self.hub_path):
+            for file_path in [p for p in self.index if p not in found]:
+                self._drop_file(file_path)
+                stats["removed"] += 1
+        self._save_index()
+        self.bm25.save()
+        stats["seconds"] = round(time.perf_counter() - started, 3)
+        self.last_stats = stats
+        return stats
+
+    def index_hub(self, wait=False):
+        """Background indexing of the JARVIS_HUB (wait=True: shu oqimda, statistikani qaytaradi)"""
+        if not self._indexing.acquire(blocking=wait):
+            if self.log: self.log("🧠 [NEURAL] Indexing already in progress.")
+            return None
+        if self.log: self.log(f"🧠 [NEURAL] Starting background indexing of {self.hub_path}...")
 
-    def index_hub(self):
-        """Background indexing of the JARVIS_HUB"""
-        if self.log: self.log("🧠 [NEURAL] Starting background indexing of JARVIS_HUB...")
-        
         def _task():
-            for root, dirs, files in os.walk(self.hub_path):
-                for file in files:
-                    if file.endswith(('.txt', '.md', '.py', '.js')):
-                        file_path = os.path.join(root, file)
-                        mtime = os.path.getmtime(file_path)
-                        
-                        # Only index if new or changed
-                        if file_path not in self.index or self.index[file_path]['mtime'] < mtime:
-                            content = self._read_file(file_path)
-                            if content:
-                                # Simple "Vector" simulation: key phrases + summary via Brain
-                                info = {"mtime": mtime, "preview": content[:500]}
-                                self.index[file_path] = info
-                                if self.log: self.log(f"📑 [NEURAL] Indexed: {file}")
-            
-            self._save_index()
-            if self.log: self.log("✅ [NEURAL] Hub synchronization complete.")
-            
-        threading.Thread(target=_task, daemon=True).start()
-
-    def _read_file(self, path):
-        try:
-            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
-        except: return None
+            try:
+                stats = self._index_task()
+                if self.log: self.log(f"✅ [NEURAL] Hub synchronization complete: {stats['indexed']} indexed, "
+                                      f"{stats['chunks']} chunks, {stats['seconds']} s.")
+                return stats
+            finally:
+                self._indexing.release()
+
+        if wait:
+            return _task()
+        thread = threading.Thread(target=_task, daemon=True)
+        thread.start()
+        return thread
+
+    # --- SEARCH ---
+
+    def search(self, query_text, limit=3):
+        """[(path, snippet), ...] BM25 (fayl nomi + bo'lak matni) bo'yicha; har fayldan eng yaxshi bo'lak"""
+        terms = tokenize(query_text)
+        best = {}  # yo'l -> bo'lak id (tartib saqlanadi)
+        for _, doc_id in self.bm25.search(query_text, limit * 4):
+            best.setdefault(_chunk_path(doc_id), doc_id)
+            if len(best) >= limit:
+                break
+        conn = self.chunks.connection()
+        results = []
+        for path, doc_id in best.items():
+            row = conn.execute("SELECT text FROM chunks WHERE chunk_id = ?", (doc_id,)).fetchone()
+            text = row[0] if row else self.index.get(path, {}).get("preview", "")
+            results.append((path, make_snippet(text, terms)))
+        return results
 
     def query(self, query_text):
         """Simple keyword-based semantic retrieval for now, upgradeable to full embedding"""
-        results = []
-        keywords = query_text.lower().split()
-        
-        for path, info in self.index.items():
-            content = info['preview'].lower()
-            score = sum(1 for kw in keywords if kw in content or kw in path.lower())
-            if score > 0:
-                results.append((path, info['preview'][:200]))
-        
+        results = self.search(query_text)
         if not results:
             return "Kechirasiz janob, bu mavzuda mahalliy ma'lumot topilmadi."
-            
+
         # Format for Brain analysis
-        context = "\n".join([f"File: {r[0]}\nContent: {r[1]}" for r in results[:3]])
+        context = "\n".join([f"File: {r[0]}\nContent: {r[1]}" for r in results])
         return context
+
+
+if __name__ == "__main__":
+    import random
+    import shutil
+    import tempfile
+    import zipfile
+
+    rng = random.Random(0)
+    words = ("hisobot reja loyiha python jarvis tarmoq xotira server moliya byudjet uchrashuv "
+             "report budget meeting network memory deploy database sqlite index search vector").split()
+    vocab = ["va", "the", "bu", "uchun"] + words + [f"atama{i}" for i in range(5000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+    hub = tempfile.mkdtemp(prefix="jarvis_hub_")
+    for i in range(300):
+        folder = os.path.join(hub, rng.choice(["docs", "code", "notes"]))
+        os.makedirs(folder, exist_ok=True)
+        body = " ".join(rng.choices(vocab, weights, k=rng.randint(300, 3000)))
+        with open(os.path.join(folder, f"{rng.choice(words)}_{i}.md"), "w", encoding="utf-8") as f:
+            f.write(f"# Eslatma {i}\n\n{body}\n")
+    # 500-belgidan keyin keladigan ma'lumot: eski indeks uni topa olmasdi
+    with open(os.path.join(hub, "docs", "yillik.md"), "w", encoding="utf-8") as f:
+        f.write("Kirish. " * 200 + "Toshkent filiali byudjeti 2026 yilda 12 foizga oshadi.")
+    with zipfile.ZipFile(os.path.join(hub, "docs", "shartnoma.docx"), "w") as archive:
+        archive.writestr("word/document.xml", "<w:document><w:body><w:p><w:r><w:t>Ijara shartnomasi: "
+                         "Chilonzor ofisi, muddat 3 yil.</w:t></w:r></w:p></w:body></w:document>")
+
+    def run(workers, data_dir):
+        indexer = NeuralIndexer(data_dir=data_dir, settings={"hub_path": hub, "workers": workers})
+        return indexer, indexer.index_hub(wait=True)
+
+    base = tempfile.mkdtemp()
+    _, serial = run(1, os.path.join(base, "serial"))
+    indexer, pooled = run(2, os.path.join(base, "pool"))
+    print(f"{serial['files']} files -> {serial['chunks']} chunks | inline {serial['seconds']:.2f} s | "
+          f"2-process pool {pooled['seconds']:.2f} s (cpu_count={os.cpu_count()})")
+
+    for q in ["Toshkent filiali byudjeti", "Chilonzor ijara", "sqlite atama120"]:
+        print(f"{q!r:28} -> {[(os.path.basename(p), s[:60]) for p, s in indexer.search(q, 2)]}")
+
+    # Qayta ishga tushirish: hech narsa o'zgarmagan -> fayllar o'qilmaydi
+    indexer, rerun = run(2, os.path.join(base, "pool"))
+    print(f"rerun unchanged: {rerun['seconds'] * 1000:.0f} ms, indexed {rerun['indexed']}")
+    # Bitta faylning mtime'i o'zgargan, kontent emas; bittasi o'chirilgan
+    os.utime(os.path.join(hub, "docs", "yillik.md"))
+    os.remove(os.path.join(hub, "docs", "shartnoma.docx"))
+    touched = indexer.index_hub(wait=True)
+    print(f"touch + delete: unchanged {touched['unchanged']}, indexed {touched['indexed']}, removed {touched['removed']}; "
+          f"'Chilonzor' -> {indexer.search('Chilonzor ijara')}")
+    shutil.rmtree(hub)
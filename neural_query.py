@@ -7,8 +7,13 @@ import re
 from pathlib import Path
 from llm_brain import GeminiBrain
 
+try:
+    from config import JARVIS_HUB_PATH
+except ImportError:
+    JARVIS_HUB_PATH = "C:/JARVIS_HUB"
+
 class NeuralQueryEngine:
-    def __init__(self, brain=None, hub_path="C:/JARVIS_HUB"):
+    def __init__(self, brain=None, hub_path=JARVIS_HUB_PATH):
         self.brain = brain if brain else GeminiBrain()
         self.hub_path = Path(hub_path)
         self.max_tokens_per_file = 2000
@@ -8,6 +8,12 @@ def pack_project():
         "vps_agent.py", "elite_ai.py", "research_assistant.py", 
         "llm_brain.py", "utils.py", "config.py", "requirements.txt",
         "telegram_bot.py", "memory.py", "social_sentience.py",
+        "db_pool.py", # memory.py SQLite ulanishlari
+        "db_migrations.py",
+        "memory_retention.py",
+        "async_bridge.py", # telegram_bot / vps_agent
+        "rolling_summary.py",
+        "retrieval.py", # elite_ai kontekst
         "agent.py" # Core logic
     ]
     
@@ -5,8 +5,82 @@ Natural language parser for Uzbek and English commands
 
 import re
 import os
-from config import UZ_PATTERNS, EN_PATTERNS, POPULAR_WEBSITES, APP_PATHS
+import threading
+from collections import Counter, OrderedDict
+from config import UZ_PATTERNS, EN_PATTERNS, POPULAR_WEBSITES, APP_PATHS, PARSER_SETTINGS
 from utils import setup_logger, normalize_text, extract_app_name, extract_website_url
+from intent_matcher import IntentMatcher
+from spell_corrector import SymSpell
+from intent_classifier import get_classifier, decision_settings, model_generation, UNKNOWN_LABEL
+from action_registry import ACTION_REGISTRY
+
+# Pattern jadvallari import vaqtida bir marta kompilyatsiya qilinadi (barcha parser'lar uchun umumiy)
+_INTENT_MATCHER = IntentMatcher(UZ_PATTERNS, EN_PATTERNS)
+
+# SymSpell lug'ati birinchi parser yaratilganda bir marta yuklanadi (diskdan) yoki quriladi
+_SPELLER = None
+_SPELLER_LOCK = threading.Lock()
+
+
+def get_speller():
+    """Umumiy SymSpell nusxasi (o'chirilgan bo'lsa None)"""
+    global _SPELLER
+    if not PARSER_SETTINGS.get("spell_correction", True):
+        return None
+    with _SPELLER_LOCK:
+        if _SPELLER is None:
+            vocabulary = SymSpell.vocabulary_from_patterns(UZ_PATTERNS, EN_PATTERNS)
+            # Ilova va sayt nomlari ("notepad", "chrome") to'g'ri yozilgan deb hisoblanadi
+            names = {word for name in list(APP_PATHS) + list(POPULAR_WEBSITES) for word in name.lower().split()}
+            _SPELLER = SymSpell(max_distance=PARSER_SETTINGS.get("spell_max_distance", 2),
+                                protected=names).load_or_build(vocabulary)
+    return _SPELLER
+
+
+# Learned route kaliti uchun tashlab yuboriladigan so'zlar va belgilar
+ROUTE_FILLER_WORDS = {"jarvis", "iltimos", "please", "hey", "ey", "janob", "menga"}
+ROUTE_STRIP_CHARS = ".,!?;:\"()"
+# Erkin matn parametrlari: muzlatilgan holda qayta ishlatilsa boshqa xabar/so'rov yuboriladi
+ROUTE_FREE_TEXT_PARAMS = {"text", "message", "content", "caption", "query", "prompt", "sub_action", "command", "body"}
+ROUTE_MAX_PARAM_WORDS = 3
+
+
+# Murakkab buyruqlar: ketma-ket (yangi bosqich) va parallel (bir bosqich) bog'lovchilar
+SEQUENTIAL_CONJUNCTIONS = ["undan keyin", "keyin", "so'ngra", "so'ng", "after that", "then"]
+PARALLEL_CONJUNCTIONS = ["va", "and", ","]
+_CONJUNCTION_RE = re.compile(
+    "(" + "|".join(
+        [r"\b" + re.escape(c) + r"\b" for c in SEQUENTIAL_CONJUNCTIONS + PARALLEL_CONJUNCTIONS if c != ","] + [","]
+    ) + ")"
+)
+
+# Bu action'lar o'z ichida boshqa buyruqni saqlaydi ("5 daqiqadan keyin ..."), bo'linmaydi
+NON_SPLIT_ACTIONS = {"schedule", "timer", "protocol", "emergency", "confirm", "send_telegram_message", "type_text", "write_in_app"}
+
+
+def route_learnable(action, parameters=None):
+    """LLM yo'nalishini eslab qolish mumkinmi: xavfli, ichki buyruqli va erkin matnli action'lar emas"""
+    if not action or action == "unknown" or action in NON_SPLIT_ACTIONS or ACTION_REGISTRY.is_destructive(action):
+        return False
+    for name, value in (parameters or {}).items():
+        if name in ROUTE_FREE_TEXT_PARAMS:
+            return False
+        if isinstance(value, str) and len(value.split()) > ROUTE_MAX_PARAM_WORDS:
+            return False
+    return True
+
+
+def route_key(text):
+    """Deyarli bir xil iboralar uchun umumiy kalit (learned routes)"""
+    text = normalize_text(text)
+    for ch in ROUTE_STRIP_CHARS:
+        text = text.replace(ch, " ")
+    return " ".join(w for w in text.split() if w not in ROUTE_FILLER_WORDS)
+
+
+def _contains_word(pattern, word):
+    """Pattern matnida word alohida so'z sifatida bormi"""
+    return re.search(r"(?<!\w)" + re.escape(word) + r"(?!\w)", pattern) is not None
 
 
 class CommandParser:
@@ -14,8 +88,26 @@ class CommandParser:
     Tabiiy tilni JSON buyruqqa o'giradigan klass
     """
     
-    def __init__(self):
+    def __init__(self, cache_size=None):
         self.logger = setup_logger("CommandParser")
+
+        # Normallashtirilgan matn -> {action, parameters} (LRU)
+        self.cache_size = cache_size if cache_size is not None else PARSER_SETTINGS["cache_size"]
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Klassifikator almashsa (retrain, birinchi o'rgatish) keshdagi "unknown" va tenglik natijalari eskiradi
+        self._model_generation = model_generation()
+
+        # LLM orqali o'rganilgan yo'nalishlar: route_key -> {action, parameters}
+        self.learned_routes = {}
+        # Hali bazaga yozilmagan yo'nalish ishlatilishlari (drain_route_hits)
+        self._route_hits = Counter()
+
+        # Nutqni tanish xatolari uchun tuzatuvchi (edit distance 1-2)
+        self.speller = get_speller()
+
         self.logger.info("CommandParser initialized")
     
     def parse(self, text):
@@ -25,50 +117,247 @@ class CommandParser:
         if not text:
             return {"action": "unknown", "parameters": {}}
         
+        normalized_text = normalize_text(text)
+
+        with self._cache_lock:
+            generation = model_generation()
+            if generation != self._model_generation:
+                self._cache.clear()
+                self._model_generation = generation
+            cached = self._cache.get(normalized_text)
+            if cached is not None:
+                self._cache.move_to_end(normalized_text)
+                self.cache_hits += 1
+                if cached.get("route"):
+                    self._route_hits[cached["route"]] += 1
+            else:
+                self.cache_misses += 1
+
+        if cached is not None:
+            self.logger.debug(f"Parse cache hit: {normalized_text}")
+            return {"action": cached["action"], "parameters": dict(cached["parameters"])}
+
         self.logger.info(f"Parsing command: {text}")
-        normalized_text = text.lower().strip()
-        
+        result = self._parse_uncached(normalized_text, text)
+
+        if self.cache_size > 0:
+            with self._cache_lock:
+                self._cache[normalized_text] = result
+                self._cache.move_to_end(normalized_text)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return {"action": result["action"], "parameters": dict(result["parameters"])}
+
+    def _parse_uncached(self, normalized_text, text):
+        """Kesh'siz to'liq tahlil: pattern'lar, keyin o'rganilgan yo'nalishlar"""
         # Intent'ni aniqlash
         action, confidence = self._detect_action(normalized_text)
+
+        # Asl matn hech narsaga mos kelmasa, tuzatilgan matn sinab ko'riladi (parametrlar asl matndan).
+        # Faqat tuzatilgan so'zni o'z ichiga olgan pattern mosliklari hisobga olinadi; taxminiy tuzatish
+        # xavfli action bera olmaydi ("ovozni oshir" -> "ovozni ochir" -> shutdown emas)
+        if action == "unknown" and self.speller:
+            corrected, fixes = self.speller.correct_text(normalized_text)
+            if fixes:
+                fixed_tokens = set(corrected.split()) - set(normalized_text.split())
+                corrected_action, _ = self._detect_action(corrected, required_tokens=fixed_tokens)
+                if corrected_action != "unknown" and not ACTION_REGISTRY.is_destructive(corrected_action):
+                    self.logger.info(f"Spell-corrected: '{normalized_text}' -> '{corrected}' ({corrected_action})")
+                    action = corrected_action
         
         if action == "unknown":
-            return {"action": "unknown", "parameters": {}}
+            key = route_key(normalized_text)
+            route = self.learned_routes.get(key)
+            if route:
+                self.logger.info(f"Learned route: '{normalized_text}' -> {route['action']}")
+                with self._cache_lock:
+                    self._route_hits[key] += 1
+                return {"action": route["action"], "parameters": dict(route["parameters"]), "route": key}
+
+            # Ikkinchi bosqich: lokal klassifikator (brain'ga murojaatdan oldin)
+            action = self._classify(normalized_text)
+            if action == "unknown":
+                return {"action": "unknown", "parameters": {}}
         
         # Parametrlarni extract qilish
         parameters = self._extract_parameters(action, normalized_text, text)
         
         return {"action": action, "parameters": parameters}
 
-    def _detect_action(self, text):
-        """Buyruqdan action'ni aniqlash"""
-        best_action = "unknown"
-        best_score = 0
-        
-        # O'zbek pattern'larni tekshirish - Regex support
-        for action, patterns in UZ_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, text):
-                    score = len(pattern)
-                    if score > best_score:
-                        best_score = score
-                        best_action = action
-        
-        # Ingliz pattern'lar
-        for action, patterns in EN_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, text):
-                    score = len(pattern)
-                    if score > best_score:
-                        best_score = score
-                        best_action = action
-                        
+    def parse_plan(self, text):
+        """
+        Murakkab buyruqni tartiblangan rejaga aylantirish.
+        Qaytaradi: bosqichlar ro'yxati [[{action, parameters, text}, ...], ...] yoki None.
+        Bir bosqichdagi qadamlar mustaqil ("va", "and", ","), bosqichlar esa ketma-ket ("keyin", "then").
+        Butun matn tahlilidagi matn parametri ichidagi bog'lovchi ("python va java farqi qidir") bo'luvchi
+        emas. Har bo'lak o'z trigger pattern'iga mos kelishi shart (klassifikator, o'rganilgan yo'nalish
+        yoki imlo tuzatish hisobga olinmaydi), aks holda buyruq bo'linmaydi. Bo'laklar asl matndan
+        (harflar o'zgarmagan holda) olinadi.
+        """
+        if not text:
+            return None
+
+        original = text.strip()
+        normalized_text = normalize_text(original)
+        if not _CONJUNCTION_RE.search(normalized_text):
+            return None
+
+        whole = self.parse(text)
+        if whole["action"] in NON_SPLIT_ACTIONS:
+            return None
+
+        # Parametr qiymatlari egallagan oraliqlar: ichidagi bog'lovchilar matnning bir qismi. Chetidagisi
+        # ("papka yarat va ..." -> folder_name "va ...") qolgan matnni ochko'z olgan extractor, bo'luvchi
+        protected = []
+        for name, value in whole["parameters"].items():
+            value = normalize_text(value) if isinstance(value, str) and name != "original_text" else ""
+            start = normalized_text.find(value) if value else -1
+            while start >= 0:
+                protected.append((start, start + len(value)))
+                start = normalized_text.find(value, start + 1)
+        splits = [m for m in _CONJUNCTION_RE.finditer(normalized_text)
+                  if not any(lo < m.start() and m.end() < hi for lo, hi in protected)]
+        if not splits:
+            return None
+
+        # normalize_text uzunlikni saqlasa (odatda shunday) bo'laklar asl matndan kesiladi
+        source = original if len(original) == len(normalized_text) else normalized_text
+        stages, current, position = [], [], 0
+        for m in splits + [None]:
+            piece = source[position:m.start() if m else len(source)].strip()
+            if piece:
+                step = self._plan_step(piece)
+                if step is None:
+                    return None
+                current.append(step)
+            if m is None:
+                break
+            position = m.end()
+            if m.group(0) in SEQUENTIAL_CONJUNCTIONS and current:
+                stages.append(current)
+                current = []
+        if current:
+            stages.append(current)
+
+        if sum(len(stage) for stage in stages) < 2:
+            return None
+        return stages
+
+    def _plan_step(self, piece):
+        """Reja qadami: bo'lak o'z pattern'i bilan aniq action'ga mos kelsa, aks holda None"""
+        normalized_piece = normalize_text(piece)
+        detected, _ = self._detect_action(normalized_piece)
+        if detected == "unknown" or detected in NON_SPLIT_ACTIONS:
+            return None
+        step = self.parse(piece)
+        if step["action"] != detected:
+            return None
+        # "uni o'chir": bir nechta action'ga teng mos keladigan trigger xavfli qadam bo'la olmaydi
+        if ACTION_REGISTRY.is_destructive(detected):
+            matches = _INTENT_MATCHER.match_all(normalized_piece)
+            best = max(score for _, _, score in matches)
+            if len({action for action, _, score in matches if score == best}) > 1:
+                return None
+        step["parameters"]["original_text"] = piece
+        return {"action": step["action"], "parameters": step["parameters"], "text": piece}
+
+    def cache_stats(self):
+        """Parse kesh statistikasi"""
+        with self._cache_lock:
+            total = self.cache_hits + self.cache_misses
+            return {
+                "size": len(self._cache),
+                "capacity": self.cache_size,
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "hit_rate": self.cache_hits / total if total else 0.0,
+            }
+
+    def clear_cache(self):
+        """Parse keshini tozalash"""
+        with self._cache_lock:
+            self._cache.clear()
+
+    # --- LEARNED ROUTES ---
+
+    def load_learned_routes(self, routes):
+        """Saqlangan yo'nalishlarni yuklash: [(phrase, action, parameters), ...]"""
+        for phrase, action, parameters in routes or []:
+            if route_learnable(action, parameters):  # oldin saqlangan, endi ruxsat etilmagan yo'nalishlar o'tkaziladi
+                self.learned_routes[phrase] = {"action": action, "parameters": parameters or {}}
+        self.logger.info(f"Loaded {len(self.learned_routes)} learned routes.")
+
+    def drain_route_hits(self):
+        """Oxirgi chaqiruvdan beri ishlatilgan yo'nalishlar {route_key: soni} (bazadagi hits uchun)"""
+        with self._cache_lock:
+            hits, self._route_hits = dict(self._route_hits), Counter()
+        return hits
+
+    def learn_route(self, text, action, parameters=None):
+        """LLM aniqlagan (va muvaffaqiyatli bajarilgan) action'ni eslab qolish; qaytaradi: route kaliti yoki None"""
+        key = route_key(text)
+        if not key or not route_learnable(action, parameters):
+            return None
+        self.learned_routes[key] = {"action": action, "parameters": dict(parameters or {})}
+        with self._cache_lock:
+            stale = [k for k, v in self._cache.items() if v["action"] == "unknown" and route_key(k) == key]
+            for k in stale:
+                del self._cache[k]
+        return key
+
+    def _detect_action(self, text, required_tokens=None):
+        """
+        Buyruqdan action'ni aniqlash (kompilyatsiya qilingan matcher, bitta o'tish).
+        required_tokens: faqat shu so'zlardan birini o'z ichiga olgan pattern'lar hisobga olinadi.
+        """
+        best_action, best_score = "unknown", 0
+        tied, tied_patterns = [], []
+        for action, pattern, score in _INTENT_MATCHER.match_all(text):
+            if required_tokens and not any(_contains_word(pattern, token) for token in required_tokens):
+                continue
+            if score > best_score:
+                best_action, best_score, tied, tied_patterns = action, score, [action], [pattern]
+            elif score == best_score and action not in tied:
+                tied.append(action)
+                tied_patterns.append(pattern)
+
+        # Bir xil uzunlikdagi mosliklar (masalan "o'chir") lokal klassifikator bilan ajratiladi.
+        # Dalil faqat pattern'dan tashqaridagi so'zlar ("chromeni o'chir" -> "chromeni"): umumiy pattern
+        # hech bir nomzodni afzal qilmaydi
+        if len(tied) > 1:
+            residual = text
+            for pattern in tied_patterns:
+                residual = residual.replace(pattern, " ")
+            classifier = get_classifier()
+            choice = classifier.rank(residual, tied, PARSER_SETTINGS.get("classifier_margin", 0.25)) \
+                if classifier and residual.strip() else None
+            # Tenglikni yechish xavfli action'ga o'tkaza olmaydi (faqat jadvaldagi birinchisi bo'lsa)
+            if choice and not (ACTION_REGISTRY.is_destructive(choice) and not ACTION_REGISTRY.is_destructive(tied[0])):
+                best_action = choice
+
         if best_action == "unknown":
-            print(f"🔍 [DEBUG] RAW: '{text}' action not detected.")
+            self.logger.debug(f"RAW: '{text}' action not detected.")
         else:
-            print(f"🔍 [DEBUG] DETECTED: {best_action} (Score: {best_score})")
-                        
+            self.logger.debug(f"DETECTED: {best_action} (Score: {best_score})")
+
         return best_action, best_score
 
+    def _classify(self, text):
+        """Lokal NB klassifikator: faqat xavfsiz (o'qish) action'lar, farq yoki qamrov past bo'lsa 'unknown'"""
+        classifier = get_classifier()
+        if not classifier:
+            return "unknown"
+        action = classifier.decide(text, *decision_settings())
+        if action == UNKNOWN_LABEL or ACTION_REGISTRY.is_destructive(action):
+            return "unknown"
+        self.logger.info(f"Classifier: '{text}' -> {action}")
+        return action
+
+    def match_all(self, text):
+        """Barcha pattern mosliklari va ballari: [(action, pattern, score), ...]"""
+        return _INTENT_MATCHER.match_all(text.lower().strip())
+
     def _extract_parameters(self, action, text, original_text=""):
         """Parametrlarni ajratib olish"""
         params = {}
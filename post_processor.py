@@ -0,0 +1,246 @@
+"""
+JARVIS - Post-Execution Bookkeeping Queue
+Action bajarilgandan keyingi ishlar (commands_history yozuvi, IntentEngine tahlili,
+predict_next, gamification XP, o'rganilgan yo'nalishlar hits) javob yo'lidan olib tashlanadi:
+navbatga qo'yiladi va bitta fon oqimi ularni partiyalab (executemany, bitta JSON yozuvi) bajaradi.
+To'g'ri yopilganda (close / atexit) navbatdagi hech narsa yo'qolmaydi.
+"""
+import atexit
+import queue
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from utils import setup_logger
+
+EXECUTED_MARK = "Executed via System"
+# Bu action'lar uchun XP berilmaydi (fon monitoringi)
+NO_XP_ACTIONS = {"describe_screen", "posture_monitor"}
+
+_STOP = object()
+
+
+class PostProcessor:
+    """
+    Yagona iste'molchili navbat. owner — WindowsExecutor: memory, intent_engine va
+    gamification har partiyada owner'dan olinadi (modul keyin yuklansa ham ishlaydi).
+    """
+
+    def __init__(self, owner=None, batch_size=64, max_delay=0.05):
+        self.logger = setup_logger("PostProcessor")
+        self.owner = owner
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.last_prediction = None
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._stats = {"queued": 0, "processed": 0, "batches": 0, "max_depth": 0, "last_batch_ms": 0.0, "errors": 0}
+
+        self._thread = threading.Thread(target=self._run, name="PostProcessor", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # --- PRODUCERS (javob yo'lida, mikrosekundlar) ---
+
+    def record_action(self, action, parameters, result=None):
+        """Executor action'i: history + intent tahlili + (muvaffaqiyatli bo'lsa) XP"""
+        award_xp = (action not in NO_XP_ACTIONS and bool(result)
+                    and "error" not in str(result).lower())
+        self._put(("action", datetime.now(), action, str(parameters), award_xp))
+
+    def record_history(self, memory, command, response, language="uz"):
+        """Agent darajasidagi (matn -> og'zaki javob) tarix yozuvi"""
+        self._put(("history", datetime.now(), memory, command, response, language))
+
+    def record_route_hits(self, memory, hits):
+        """O'rganilgan yo'nalishlar ishlatilishi {phrase: soni} (learned_routes.hits, last_used)"""
+        if hits:
+            self._put(("routes", datetime.now(), memory, hits))
+
+    def _put(self, item):
+        if self._closed:
+            # Yopilgandan keyin kelganlar shu oqimda darhol bajariladi
+            self._process([item])
+            return
+        self._queue.put(item)
+        with self._stats_lock:
+            self._stats["queued"] += 1
+            self._stats["max_depth"] = max(self._stats["max_depth"], self._queue.qsize())
+
+    # --- CONSUMER ---
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while item is not _STOP and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            stop = batch[-1] is _STOP
+            work = batch[:-1] if stop else batch
+            try:
+                if work:
+                    self._process(work)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _process(self, batch):
+        t0 = time.perf_counter()
+        owner = self.owner
+        owner_memory = getattr(owner, "memory", None)
+        intent_engine = getattr(owner, "intent_engine", None)
+        gamification = getattr(owner, "gamification", None)
+
+        rows_by_memory = {}
+        route_hits = {}
+        actions, xp_events = [], []
+        for item in batch:
+            if item[0] == "action":
+                _, ts, action, params, award_xp = item
+                actions.append((ts, action))
+                if award_xp:
+                    xp_events.append((10, action))
+                # IntentEngine history'ni shu memory'dan o'qiydi
+                if owner_memory and intent_engine:
+                    rows_by_memory.setdefault(id(owner_memory), (owner_memory, []))[1].append(
+                        (ts, f"{action} {params}", EXECUTED_MARK, "uz"))
+            elif item[0] == "routes":
+                _, ts, memory, hits = item
+                entry = route_hits.setdefault(id(memory), [memory, Counter(), ts])
+                entry[1].update(hits)
+                entry[2] = ts
+            else:
+                _, ts, memory, command, response, language = item
+                if memory:
+                    rows_by_memory.setdefault(id(memory), (memory, []))[1].append(
+                        (ts, command, response, language))
+
+        try:
+            for memory, rows in rows_by_memory.values():
+                memory.add_history_many(rows)
+            for memory, hits, ts in route_hits.values():
+                memory.touch_learned_routes(hits, ts)
+
+            if actions and intent_engine:
+                # O'tish modeli action bo'yicha O(1) yangilanadi, bashorat lug'atdan o'qiladi
+                for ts, action in actions:
+                    intent_engine.observe(action, ts.timestamp())
+                prediction = intent_engine.predict_next(actions[-1][1])
+                if prediction:
+                    self.last_prediction = prediction
+                    self.logger.info(f"🔮 PREDICTION: {prediction['action']}")
+                    # Yuqori ishonchli bashorat: keyingi action'ga modul/ma'lumot/audio oldindan tayyorlanadi
+                    prefetcher = getattr(owner, "prefetcher", None)
+                    if prefetcher is not None:
+                        prefetcher.submit(prediction)
+                intent_engine.maybe_save()
+
+            if xp_events and gamification:
+                gamification.add_xp_many(xp_events)
+        except Exception as e:
+            with self._stats_lock:
+                self._stats["errors"] += 1
+            self.logger.error(f"Post-processing error: {e}")
+
+        with self._stats_lock:
+            self._stats["processed"] += len(batch)
+            self._stats["batches"] += 1
+            self._stats["last_batch_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+
+    # --- CONTROL ---
+
+    def flush(self, timeout=None):
+        """Navbatdagi barcha yozuvlar bajarilguncha kutish"""
+        if timeout is None:
+            self._queue.join()
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def close(self, timeout=10.0):
+        """Navbatni bo'shatib iste'molchini to'xtatish (qayta chaqirish xavfsiz)"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            self.logger.warning("Post-processor did not drain in time.")
+        else:
+            self.logger.info(f"Post-processor drained: {self.stats()}")
+        # Yuklangan bo'lsa o'tish modelini saqlash (lazy proksi bu yerda qurilmaydi)
+        intent_engine = getattr(self.owner, "intent_engine", None)
+        if intent_engine is not None and getattr(intent_engine, "loaded", True):
+            try:
+                intent_engine.save()
+            except Exception as e:
+                self.logger.error(f"Intent model save error: {e}")
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["pending"] = self._queue.qsize()
+        return stats
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import tempfile
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from memory import MemoryEngine
+    from intent_engine import IntentEngine
+    from gamification import GamificationSystem
+
+    class _Owner:
+        pass
+
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    owner = _Owner()
+    owner.memory = MemoryEngine(db_path=db_path)
+    owner.intent_engine = IntentEngine(memory_engine=owner.memory,
+                                       model_path=os.path.join(os.path.dirname(db_path), "intent.json"))
+    owner.gamification = GamificationSystem()
+    owner.gamification.data_file = os.path.join(os.path.dirname(db_path), "user_stats.json")
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    actions = ["open_app", "youtube_search", "volume_up", "get_time"]
+
+    # Eski usul: har bir action'dan keyin sinxron bookkeeping
+    t0 = time.perf_counter()
+    for i in range(n):
+        action = actions[i % len(actions)]
+        owner.memory.add_command_history(action, "{}")
+        owner.intent_engine.analyze_patterns()
+        owner.intent_engine.predict_next(action)
+        owner.gamification.add_xp(10, action)
+    sync_ms = (time.perf_counter() - t0) * 1000 / n
+
+    # Yangi usul: javob yo'lida faqat navbatga qo'yish
+    processor = PostProcessor(owner)
+    t0 = time.perf_counter()
+    for i in range(n):
+        processor.record_action(actions[i % len(actions)], {}, "ok")
+    enqueue_us = (time.perf_counter() - t0) * 1e6 / n
+    processor.close()
+
+    rows = owner.memory._query("SELECT COUNT(*) FROM commands_history", fetch_one=True)[0]
+    print(f"Synchronous bookkeeping : {sync_ms:8.3f} ms/command")
+    print(f"Queued (hot path)       : {enqueue_us:8.1f} us/command")
+    print(f"Drained: {processor.stats()} | history rows: {rows} (expected {2 * n})")
@@ -0,0 +1,308 @@
+"""
+JARVIS - Predictive Prefetcher
+IntentEngine yuqori ishonch bilan bashorat qilgan keyingi action uchun tayyorgarlik oldindan
+ko'riladi: lazy modul quriladi, yangiliklar / bozor narxlari TTL keshga olinadi va javob ovozli
+bo'lsa audio qurilma ochib qo'yiladi. Faqat PREFETCH_PLANS dagi, yon ta'sirsiz tayyorgarlik
+(o'qish) bajariladi; action'ning o'zi hech qachon ishga tushirilmaydi. CPU va tarmoq byudjeti
+oshsa bashorat tashlab yuboriladi. stats() kesh va bashorat hit-rate'ini qaytaradi.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from utils import setup_logger
+from action_registry import ACTION_REGISTRY
+from lazy_loader import LazyProxy
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+try:
+    from config import PREFETCH_SETTINGS
+except ImportError:
+    PREFETCH_SETTINGS = {}
+
+DEFAULTS = {
+    "enabled": True,
+    "min_confidence": 0.6,    # Bundan past bashoratlar uchun hech narsa qilinmaydi
+    "max_cpu_percent": 70,    # CPU bundan band bo'lsa prefetch o'tkazib yuboriladi
+    "max_fetches": 6,         # Tarmoq byudjeti: fetch_window ichida ko'pi bilan shuncha so'rov
+    "fetch_window": 300,      # (sekund)
+    "ttl": 120,               # Keshlangan ma'lumot shuncha sekund yangi hisoblanadi
+    "queue_size": 4,
+    "confirm_window": 600,    # Bashorat shu vaqt ichida bajarilsa "hit"
+}
+
+DEFAULT_CRYPTO = "bitcoin"
+DEFAULT_STOCK = "AAPL"
+# MarketMonitor xatoni matn sifatida qaytaradi - bunday javob keshlanmaydi
+ERROR_MARKERS = ("xatolik", "topilmadi")
+
+
+def _fetch_news(owner):
+    return owner.news_bot.get_daily_digest() or None
+
+
+def _fetch_crypto(owner):
+    result = owner.market.get_crypto_price(DEFAULT_CRYPTO)
+    return None if any(m in result for m in ERROR_MARKERS) else result
+
+
+def _fetch_stock(owner):
+    result = owner.market.get_stock_price(DEFAULT_STOCK)
+    return None if any(m in result for m in ERROR_MARKERS) else result
+
+
+# action -> tayyorgarlik: modules (lazy quriladi), data (kesh kaliti, fetch(owner)), speaks (TTS javob)
+PREFETCH_PLANS = {
+    "get_news_digest": {"modules": ("news_bot",), "data": ("news_digest", _fetch_news), "speaks": True},
+    "get_crypto_price": {"modules": ("market",), "data": (f"crypto:{DEFAULT_CRYPTO}", _fetch_crypto), "speaks": True},
+    "get_stock_price": {"modules": ("market",), "data": (f"stock:{DEFAULT_STOCK}", _fetch_stock), "speaks": True},
+    "get_finance_report": {"modules": ("finance",), "data": None, "speaks": False},
+    "get_balance": {"modules": ("finance",), "data": None, "speaks": False},
+    "advanced_schedule_manage": {"modules": ("scheduler",), "data": None, "speaks": False},
+}
+
+
+class Prefetcher:
+    """
+    owner — WindowsExecutor (lazy modullar, voice). submit() PostProcessor oqimidan, take() va
+    on_action() action handler'laridan chaqiriladi; prefetch bitta fon oqimida bajariladi.
+    """
+
+    def __init__(self, owner, settings=None, plans=None):
+        self.logger = setup_logger("Prefetcher")
+        self.owner = owner
+        self.settings = {**DEFAULTS, **PREFETCH_SETTINGS, **(settings or {})}
+        self.plans = PREFETCH_PLANS if plans is None else plans
+
+        self._cache = {}            # kalit -> (muddati, qiymat)
+        self._fetch_times = deque() # tarmoq byudjeti uchun so'rov vaqtlari
+        self._expected = None       # (action, muddati) - oxirgi prefetch qilingan bashorat
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=self.settings["queue_size"])
+        self._thread = None
+        self._stats = {
+            "predictions": 0, "scheduled": 0, "skipped_low_confidence": 0, "skipped_unplanned": 0,
+            "skipped_unsafe": 0, "skipped_busy": 0, "skipped_cpu": 0, "skipped_network": 0,
+            "modules_built": 0, "fetched": 0, "fetch_errors": 0, "audio_prepared": 0,
+            "data_hits": 0, "data_misses": 0, "expired": 0, "prediction_hits": 0, "prediction_misses": 0,
+        }
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._stats[name] += n
+
+    # --- PRODUCERS ---
+
+    def submit(self, prediction):
+        """IntentEngine.predict_next natijasi: shartlar bajarilsa prefetch navbatga qo'yiladi"""
+        if not prediction or not self.settings["enabled"]:
+            return False
+        action = prediction.get("action")
+        self._count("predictions")
+        if prediction.get("confidence", 0) < self.settings["min_confidence"]:
+            self._count("skipped_low_confidence")
+            return False
+        if action not in self.plans:
+            self._count("skipped_unplanned")
+            return False
+        if ACTION_REGISTRY.is_destructive(action):
+            self._count("skipped_unsafe")
+            return False
+        try:
+            self._queue.put_nowait(action)
+        except queue.Full:
+            self._count("skipped_busy")
+            return False
+        self._ensure_worker()
+        with self._lock:
+            self._stats["scheduled"] += 1
+            self._expected = (action, time.monotonic() + self.settings["confirm_window"])
+        return True
+
+    def on_action(self, action):
+        """Haqiqiy bajarilgan action: kutilgan bashorat bilan solishtiriladi (javob yo'lida, O(1))"""
+        with self._lock:
+            if self._expected is None:
+                return
+            expected, deadline = self._expected
+            self._expected = None
+            hit = expected == action and time.monotonic() <= deadline
+            self._stats["prediction_hits" if hit else "prediction_misses"] += 1
+
+    def take(self, key):
+        """Prefetch qilingan ma'lumot (yangi bo'lsa) yoki None - handler o'zi oladi"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and entry[0] >= now:
+                self._stats["data_hits"] += 1
+                return entry[1]
+            if entry:
+                del self._cache[key]
+                self._stats["expired"] += 1
+            self._stats["data_misses"] += 1
+        return None
+
+    # --- WORKER ---
+
+    def _ensure_worker(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="Prefetcher", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            action = self._queue.get()
+            try:
+                if action is None:
+                    return
+                self._prefetch(action)
+            except Exception as e:
+                self.logger.error(f"Prefetch error ({action}): {e}")
+            finally:
+                self._queue.task_done()
+
+    def _cpu_busy(self):
+        if not PSUTIL_AVAILABLE:
+            return False
+        return psutil.cpu_percent(interval=None) > self.settings["max_cpu_percent"]
+
+    def _network_allowed(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._fetch_times and now - self._fetch_times[0] > self.settings["fetch_window"]:
+                self._fetch_times.popleft()
+            if len(self._fetch_times) >= self.settings["max_fetches"]:
+                return False
+            self._fetch_times.append(now)
+            return True
+
+    def _fresh(self, key):
+        with self._lock:
+            entry = self._cache.get(key)
+            return entry is not None and entry[0] >= time.monotonic()
+
+    def _prefetch(self, action):
+        plan = self.plans[action]
+        if self._cpu_busy():
+            self._count("skipped_cpu")
+            return
+
+        for name in plan.get("modules", ()):
+            module = getattr(self.owner, name, None)
+            if isinstance(module, LazyProxy) and not module.loaded:
+                module._resolve(mode="prefetch")
+                self._count("modules_built")
+
+        data = plan.get("data")
+        if data and not self._fresh(data[0]):
+            key, fetch = data
+            if not self._network_allowed():
+                self._count("skipped_network")
+            else:
+                try:
+                    value = fetch(self.owner)
+                except Exception as e:
+                    value = None
+                    self.logger.warning(f"Prefetch fetch failed ({key}): {e}")
+                if value is None:
+                    self._count("fetch_errors")
+                else:
+                    with self._lock:
+                        self._cache[key] = (time.monotonic() + self.settings["ttl"], value)
+                        self._stats["fetched"] += 1
+
+        if plan.get("speaks"):
+            prepare = getattr(getattr(self.owner, "voice", None), "prepare_audio", None)
+            if prepare and prepare():
+                self._count("audio_prepared")
+
+    # --- CONTROL ---
+
+    def flush(self):
+        """Navbatdagi prefetch'lar tugaguncha kutish"""
+        self._queue.join()
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(5.0)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        demands = stats["data_hits"] + stats["data_misses"]
+        judged = stats["prediction_hits"] + stats["prediction_misses"]
+        stats["hit_rate"] = round(stats["data_hits"] / demands, 3) if demands else 0.0
+        stats["prediction_accuracy"] = round(stats["prediction_hits"] / judged, 3) if judged else 0.0
+        stats["cached"] = len(self._cache)
+        return stats
+
+
+if __name__ == "__main__":
+    from lazy_loader import LazyRegistry
+
+    class _Market:
+        """Tarmoq kechikishini taqlid qiluvchi MarketMonitor (~250 ms)"""
+        def __init__(self):
+            time.sleep(0.4)  # import + sessiya
+
+        def get_crypto_price(self, symbol="bitcoin"):
+            time.sleep(0.25)
+            return f"{symbol.capitalize()} narxi hozirda 64000 AQSH dollarini tashkil etmoqda, janob."
+
+    class _Voice:
+        def __init__(self):
+            self.ready = False
+
+        def prepare_audio(self):
+            self.ready = True
+            return True
+
+    class _Owner:
+        def __init__(self):
+            self.modules = LazyRegistry("demo")
+            self.market = self.modules.add("market", _Market)
+            self.voice = _Voice()
+
+    def handler(owner, prefetcher):
+        """executor._get_crypto_price bilan bir xil yo'l"""
+        t0 = time.perf_counter()
+        result = prefetcher.take(f"crypto:{DEFAULT_CRYPTO}") or owner.market.get_crypto_price(DEFAULT_CRYPTO)
+        prefetcher.on_action("get_crypto_price")
+        return result, (time.perf_counter() - t0) * 1000
+
+    owner = _Owner()
+    cold = Prefetcher(owner, settings={"enabled": False})
+    _, cold_ms = handler(owner, cold)
+    print(f"no prefetch (cold module + fetch): {cold_ms:7.1f} ms")
+
+    owner = _Owner()
+    prefetcher = Prefetcher(owner, settings={"max_fetches": 2, "fetch_window": 60})
+    prediction = {"action": "get_crypto_price", "confidence": 0.8}
+    prefetcher.submit(prediction)
+    prefetcher.flush()
+    _, warm_ms = handler(owner, prefetcher)
+    print(f"prefetched (module + data ready) : {warm_ms:7.1f} ms, audio ready: {owner.voice.ready}")
+
+    # Guard'lar: past ishonch, rejada yo'q, destruktiv, tarmoq byudjeti
+    prefetcher.submit({"action": "get_crypto_price", "confidence": 0.3})
+    prefetcher.submit({"action": "open_app", "confidence": 0.9})
+    guarded = Prefetcher(owner, plans={"shutdown": {"modules": ()}})
+    print(f"destructive 'shutdown' prediction scheduled: {guarded.submit({'action': 'shutdown', 'confidence': 0.9})}")
+    prefetcher.settings["ttl"] = 0  # har prefetch darhol eskiradi -> har safar yangi so'rov kerak
+    prefetcher._cache.clear()
+    for _ in range(3):
+        prefetcher.submit(prediction)
+        prefetcher.flush()
+        handler(owner, prefetcher)
+    stats = prefetcher.stats()
+    print({k: v for k, v in stats.items() if v})
+    prefetcher.close()
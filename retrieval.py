@@ -0,0 +1,213 @@
+"""
+JARVIS - Hybrid Retrieval for LLM Context
+LLM yo'lida kontekst bitta joyda yig'iladi: SQL faktlar (MemoryEngine FTS5), vektor xotira
+(MemoryCore) va fayl indeksi (NeuralIndexer) parallel so'raladi, har manbaga o'z muddati (deadline)
+beriladi, kechikkan manba natijasi tashlanadi. Har manbaning o'z ishchi oqimi bor va bir vaqtda faqat
+bitta chaqiruvi ishlaydi: oldingi chaqiruvi hali tugamagan manba o'tkazib yuboriladi (sekin manba
+boshqalarni to'xtatib qo'ymaydi, navbat o'smaydi). Natijalar Reciprocal Rank Fusion bilan birlashtiriladi:
+    score(doc) = sum(weight_s / (rrf_k + rank_s(doc)))
+takrorlar olib tashlanadi va blok token byudjetiga sig'diriladi. Agent va EliteAI bir xil blokni ishlatadi.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from memory import fold_apostrophes
+from utils import setup_logger
+
+try:
+    from config import RETRIEVAL_SETTINGS
+except ImportError:
+    RETRIEVAL_SETTINGS = {}
+
+DEFAULTS = {
+    "per_source": 5,          # Har manbadan olinadigan natijalar
+    "rrf_k": 60,
+    "max_tokens": 500,        # Kontekst bloki uchun (taxminan 4 belgi = 1 token)
+    "deadline_ms": {"facts": 150, "vector": 400, "files": 250},
+    "default_deadline_ms": 300,
+}
+
+CHARS_PER_TOKEN = 4
+LABELS = {"facts": "fakt", "vector": "xotira", "files": "fayl"}
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _dedupe_key(text):
+    return " ".join(fold_apostrophes(text).split())
+
+
+class HybridRetriever:
+    """
+    Manba: nom -> fn(query, limit) -> [matn, ...] (muhimlik tartibida). add_source() bilan qo'shiladi;
+    fn ishchi oqimda chaqiriladi (LazyProxy modullar ham shu yerda quriladi).
+    """
+
+    def __init__(self, settings=None):
+        self.logger = setup_logger("HybridRetriever")
+        self.settings = {**DEFAULTS, **RETRIEVAL_SETTINGS, **(settings or {})}
+        self.sources = {}  # nom -> (fn, og'irlik)
+        self._executors = {}  # nom -> bitta oqimli ThreadPoolExecutor
+        self._inflight = {}   # nom -> hali tugamagan Future
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def add_source(self, name, fn, weight=1.0):
+        self.sources[name] = (fn, weight)
+        if name not in self._executors:
+            self._executors[name] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"retrieval-{name}")
+        self._stats.setdefault(name, {"calls": 0, "results": 0, "timeouts": 0, "skipped": 0, "errors": 0,
+                                      "last_ms": 0.0})
+        return self
+
+    def _count(self, name, key, value=1):
+        with self._lock:
+            self._stats[name][key] += value
+
+    def _call(self, name, fn, query, limit):
+        t0 = time.perf_counter()
+        try:
+            return list(fn(query, limit) or [])
+        finally:
+            with self._lock:
+                self._stats[name]["last_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+
+    def gather(self, query):
+        """Barcha manbalarni parallel so'rash: {nom: [matn, ...]} (muddatida javob berganlar)"""
+        started = time.monotonic()
+        futures = {}
+        with self._lock:
+            for name, (fn, _) in self.sources.items():
+                previous = self._inflight.get(name)
+                if previous is not None and not previous.done():
+                    # Oldingi so'rov hali ishlayapti: bu safar manbasiz (timeout sifatida hisoblanadi)
+                    self._stats[name]["timeouts"] += 1
+                    self._stats[name]["skipped"] += 1
+                    continue
+                future = self._executors[name].submit(self._call, name, fn, query, self.settings["per_source"])
+                self._inflight[name] = futures[name] = future
+        deadlines = self.settings["deadline_ms"]
+        ranked = {}
+        for name, future in futures.items():
+            self._count(name, "calls")
+            deadline = deadlines.get(name, self.settings["default_deadline_ms"]) / 1000
+            try:
+                ranked[name] = future.result(timeout=max(0.0, started + deadline - time.monotonic()))
+                self._count(name, "results", len(ranked[name]))
+            except FutureTimeout:
+                self._count(name, "timeouts")
+                self.logger.warning(f"Retrieval source '{name}' missed its {deadline * 1000:.0f} ms deadline")
+            except Exception as e:
+                self._count(name, "errors")
+                self.logger.error(f"Retrieval source '{name}' failed: {e}")
+        return ranked
+
+    def fuse(self, ranked):
+        """RRF: [{"text", "sources", "score"}, ...] kamayish tartibida, takrorlarsiz"""
+        k = self.settings["rrf_k"]
+        fused = {}
+        for name, texts in ranked.items():
+            weight = self.sources[name][1]
+            for rank, text in enumerate(texts, 1):
+                text = (text or "").strip()
+                if not text:
+                    continue
+                key = _dedupe_key(text)
+                item = fused.get(key)
+                if item is None:
+                    item = fused[key] = {"text": text, "sources": [], "score": 0.0}
+                if name not in item["sources"]:
+                    item["sources"].append(name)
+                    item["score"] += weight / (k + rank)
+        return sorted(fused.values(), key=lambda item: -item["score"])
+
+    def retrieve(self, query):
+        return self.fuse(self.gather(query))
+
+    def context_block(self, query, max_tokens=None):
+        """Prompt uchun token byudjetidagi blok (hech narsa topilmasa bo'sh satr)"""
+        budget = max_tokens or self.settings["max_tokens"]
+        lines = []
+        for item in self.retrieve(query):
+            label = "/".join(LABELS.get(s, s) for s in item["sources"])
+            line = f"- [{label}] {' '.join(item['text'].split())}"
+            cost = estimate_tokens(line) + 1
+            if cost > budget:
+                if budget >= 16:  # sig'maganini qisqartirib qo'shish
+                    lines.append(line[:(budget - 1) * CHARS_PER_TOKEN - 1] + "…")
+                break
+            lines.append(line)
+            budget -= cost
+        return "\n".join(lines)
+
+    def stats(self):
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def close(self):
+        for executor in self._executors.values():
+            executor.shutdown(wait=False)
+
+
+def build_retriever(memory=None, vector_memory=None, file_index=None, settings=None):
+    """Mavjud modullar bo'yicha standart manbalar (None bo'lganlari qo'shilmaydi)"""
+    retriever = HybridRetriever(settings)
+    if memory is not None:
+        retriever.add_source("facts", lambda q, n: [row[0] for row in memory.search_facts(q, limit=n) or []])
+    if vector_memory is not None:
+        retriever.add_source("vector", lambda q, n: [r["text"] for r in vector_memory.search_memory(q, top_k=n)])
+    if file_index is not None:
+        retriever.add_source("files", lambda q, n: [f"{path}: {preview}" for path, preview in file_index.search(q, limit=n)])
+    return retriever
+
+
+if __name__ == "__main__":
+    def slow(seconds, results):
+        def fn(query, limit):
+            time.sleep(seconds)
+            return results[:limit]
+        return fn
+
+    facts = ["Foydalanuvchi Python dasturchi", "Sevimli taomi osh", "Ertaga soat 9 da hisobot topshiradi"]
+    vectors = ["Ertaga soat 9 da hisobot topshiradi", "Hisobot O'zbekiston bo'yicha", "Python loyiha: JARVIS"]
+    files = ["C:/JARVIS_HUB/hisobot.md: 2026 yillik hisobot rejasi", "C:/JARVIS_HUB/notes.txt: osh retsepti"]
+
+    retriever = HybridRetriever(settings={"deadline_ms": {"facts": 150, "vector": 400, "files": 250}})
+    retriever.add_source("facts", slow(0.02, facts))
+    retriever.add_source("vector", slow(0.18, vectors))
+    retriever.add_source("files", slow(0.12, files))
+
+    t0 = time.perf_counter()
+    for _ in range(3):
+        [fn("hisobot", 5) for fn, _ in retriever.sources.values()]
+    sequential_ms = (time.perf_counter() - t0) * 1000 / 3
+    t0 = time.perf_counter()
+    for _ in range(3):
+        block = retriever.context_block("hisobot")
+    parallel_ms = (time.perf_counter() - t0) * 1000 / 3
+    print(f"sequential sources: {sequential_ms:.0f} ms | parallel + RRF: {parallel_ms:.0f} ms")
+    print(block)
+
+    # Muddat: osilib qolgan manba javobni ushlab turmaydi
+    retriever.add_source("files", slow(2.0, files))
+    t0 = time.perf_counter()
+    items = retriever.retrieve("hisobot")
+    print(f"hung file index -> {(time.perf_counter() - t0) * 1000:.0f} ms, {len(items)} items, "
+          f"timeouts: {retriever.stats()['files']['timeouts']}")
+
+    # Sekin manba (masalan, tarmoqsiz Gemini embedding) tez manbalarni band qilmaydi va navbat o'smaydi
+    stuck = HybridRetriever()
+    stuck.add_source("facts", slow(0.0, facts))
+    stuck.add_source("vector", slow(5.0, vectors))
+    for _ in range(8):
+        ranked = stuck.gather("hisobot")
+        assert "facts" in ranked and "vector" not in ranked
+    stats = stuck.stats()
+    assert stats["facts"]["timeouts"] == 0 and stats["vector"]["skipped"] == 7, stats
+    print(f"slow vector source over 8 queries: facts timeouts {stats['facts']['timeouts']}, "
+          f"vector calls started {stats['vector']['calls']}, skipped {stats['vector']['skipped']}")
+    stuck.close()
+    print(f"tight budget (40 tokens):\n{retriever.context_block('hisobot', max_tokens=40)}")
+    retriever.close()
@@ -0,0 +1,203 @@
+"""
+JARVIS - Rolling Conversation Summaries
+Har kun va har sessiya uchun bitta qisqa xulosa saqlanadi (semantic_memory). update() faqat oxirgi
+checkpoint'dan keyingi yangi suhbatlarni (conversation_history.id > last_id) mavjud xulosaga qo'shadi,
+shuning uchun xom tarix qayta xulosalanmaydi. Promptlarga xom qatorlar o'rniga context_block()
+(o'lchami cheklangan) qo'shiladi.
+"""
+import json
+import threading
+from datetime import datetime
+from utils import setup_logger
+
+try:
+    from config import SUMMARY_SETTINGS
+except ImportError:
+    SUMMARY_SETTINGS = {}
+
+DEFAULTS = {
+    "max_chars": 600,      # Bitta xulosaning maksimal uzunligi
+    "min_new_turns": 3,    # Kamida shuncha yangi suhbat bo'lsa qayta xulosalanadi
+    "max_turns_per_fold": 40,
+    "interval": 300,       # Fon tekshiruvi oralig'i (sekund)
+}
+
+DAY_TOPIC = "summary:day:{day}"
+SESSION_TOPIC = "summary:session:{session}"
+# GeminiBrain barcha provayderlar ishlamaganda qaytaradigan matnlar (xulosa sifatida saqlanmaydi)
+FAILURE_MARKERS = ("Janob, barcha AI xizmatlarida", "Janob, AI brain butunlay")
+
+
+class RollingSummarizer:
+    """
+    memory: MemoryEngine; brain: generate_response(prompt) ga ega obyekt (None bo'lsa LLM'siz,
+    extractive xulosa). session_id berilmasa yaratilgan vaqt bo'yicha yangi sessiya ochiladi.
+    """
+
+    def __init__(self, memory, brain=None, session_id=None, settings=None):
+        self.logger = setup_logger("RollingSummary")
+        self.memory = memory
+        self.brain = brain
+        self.settings = {**DEFAULTS, **SUMMARY_SETTINGS, **(settings or {})}
+        self.session_id = session_id or datetime.now().strftime("%Y%m%d-%H%M%S")
+        row = memory._query("SELECT MAX(id) FROM conversation_history", fetch_one=True)
+        self._session_start_id = (row[0] if row else None) or 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.folds = 0
+
+    # --- CHECKPOINTS ---
+
+    def _load(self, topic, default_last_id=0):
+        summary, context = self.memory.get_semantic_memory(topic)
+        try:
+            state = json.loads(context) if context else {}
+        except ValueError:
+            state = {}
+        return summary or "", state.get("last_id", default_last_id), state.get("turns", 0)
+
+    def _save(self, topic, summary, last_id, turns):
+        context = json.dumps({"last_id": last_id, "turns": turns, "updated": datetime.now().isoformat(timespec="seconds")})
+        self.memory.add_semantic_memory(topic, summary, context)
+
+    # --- FOLDING ---
+
+    def _new_turns(self, last_id, since=None):
+        sql = "SELECT id, user_query, assistant_response FROM conversation_history WHERE id > ?"
+        params = [last_id]
+        if since:
+            sql += " AND timestamp >= ?"
+            params.append(since)
+        sql += " ORDER BY id LIMIT ?"
+        params.append(self.settings["max_turns_per_fold"])
+        return self.memory._query(sql, tuple(params)) or []
+
+    def _fold(self, label, summary, turns):
+        """Mavjud xulosa + yangi suhbatlar -> yangi xulosa (max_chars gacha)"""
+        limit = self.settings["max_chars"]
+        if self.brain is not None:
+            lines = "\n".join(f"- U: {(q or '')[:200]} | J: {(a or '')[:200]}" for _, q, a in turns)
+            prompt = (
+                f"Siz suhbat xulosasini yangilaysiz ({label}). Joriy xulosa:\n{summary or '(bo`sh)'}\n\n"
+                f"Yangi suhbatlar:\n{lines}\n\n"
+                f"Joriy xulosaga yangi ma'lumotni qo'shib, {limit} belgidan oshmaydigan yagona qisqa "
+                "xulosa yozing. Faqat faktlar, rejalar va foydalanuvchi afzalliklari; kirish so'zlarsiz."
+            )
+            try:
+                result = (self.brain.generate_response(prompt) or "").strip()
+                if result and not result.startswith(FAILURE_MARKERS):
+                    return result[:limit]
+            except Exception as e:
+                self.logger.warning(f"Summary LLM error, using extractive fold: {e}")
+
+        from memory_retention import extractive_summary
+        addition = extractive_summary(label, [(q, a) for _, q, a in turns], max_len=limit)
+        lines = (summary.splitlines() if summary else []) + [addition]
+        # Eng yangi ma'lumot saqlanadi: chegaradan oshsa eng eski qatorlar tashlanadi
+        while len(lines) > 1 and len("\n".join(lines)) > limit:
+            lines.pop(0)
+        return "\n".join(lines)[-limit:]
+
+    def _update_topic(self, topic, label, since=None, default_last_id=0, force=False):
+        summary, last_id, total = self._load(topic, default_last_id)
+        turns = self._new_turns(last_id, since)
+        if not turns or (len(turns) < self.settings["min_new_turns"] and not force):
+            return False
+        summary = self._fold(label, summary, turns)
+        self._save(topic, summary, turns[-1][0], total + len(turns))
+        self.folds += 1
+        return True
+
+    def update(self, force=False):
+        """Kunlik va sessiya xulosalarini yangilash. force=True: min_new_turns tekshirilmaydi"""
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            changed = False
+            # Bir chaqiruvda max_turns_per_fold dan ko'p yangi suhbat bo'lsa qismlab qo'shiladi
+            for _ in range(50):
+                today = datetime.now().strftime("%Y-%m-%d")
+                day = self._update_topic(DAY_TOPIC.format(day=today), today, since=today, force=force)
+                session = self._update_topic(SESSION_TOPIC.format(session=self.session_id), "sessiya",
+                                             default_last_id=self._session_start_id, force=force)
+                if not (day or session):
+                    break
+                changed = True
+            return changed
+        except Exception as e:
+            self.logger.error(f"Rolling summary error: {e}")
+            return False
+        finally:
+            self._lock.release()
+
+    # --- PROMPT CONTEXT ---
+
+    def context_block(self):
+        """Promptlar uchun o'lchami cheklangan uzoq muddatli kontekst (bo'sh bo'lishi mumkin)"""
+        today = datetime.now().strftime("%Y-%m-%d")
+        day_summary, _, _ = self._load(DAY_TOPIC.format(day=today))
+        session_summary, _, _ = self._load(SESSION_TOPIC.format(session=self.session_id))
+        parts = []
+        if day_summary:
+            parts.append(f"Bugungi suhbatlar xulosasi: {day_summary}")
+        if session_summary and session_summary != day_summary:
+            parts.append(f"Joriy sessiya xulosasi: {session_summary}")
+        return "\n".join(parts)
+
+    # --- BACKGROUND ---
+
+    def start(self, idle_check=None):
+        """Fon oqimi: har interval sekundda, idle bo'lsa update()"""
+        if self._thread:
+            return self._thread
+
+        def loop():
+            while not self._stop.wait(self.settings["interval"]):
+                if idle_check is None or idle_check():
+                    self.update()
+
+        self._thread = threading.Thread(target=loop, name="RollingSummary", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    from memory import MemoryEngine
+
+    class _StandInBrain:
+        """Lokal o'rinbosar model: promptdagi yangi suhbatlar sonini qaytaradi"""
+        def __init__(self):
+            self.prompts = []
+
+        def generate_response(self, prompt):
+            self.prompts.append(prompt)
+            new_turns = prompt.count("\n- U: ")
+            return f"[{len(self.prompts)}-xulosa: +{new_turns} suhbat, jami prompt {len(prompt)} belgi]"
+
+    memory = MemoryEngine(db_path=os.path.join(tempfile.mkdtemp(), "summary.db"))
+    brain = _StandInBrain()
+    summarizer = RollingSummarizer(memory, brain, settings={"max_chars": 200})
+
+    for batch in range(3):
+        for i in range(5):
+            memory.store_conversation(f"python loyiha {batch}-{i} haqida savol", "javob " * 30)
+        summarizer.update()
+        print(f"batch {batch}: prompt had {brain.prompts[-1].count(chr(10) + '- U: ')} new turns "
+              f"(expected 5), prompt size {len(brain.prompts[-1])} chars")
+    memory.store_conversation("bitta yangi savol", "javob")
+    print(f"1 new turn, update() -> {summarizer.update()} (below min_new_turns)")
+    block = summarizer.context_block()
+    print(f"context_block ({len(block)} chars):\n{block}")
+
+    offline = RollingSummarizer(memory, brain=None, session_id="offline", settings={"max_chars": 200})
+    for i in range(4):
+        memory.store_conversation(f"ob-havo va sport {i}", "javob")
+    offline.update(force=True)
+    print(f"extractive session summary: {offline.context_block()}")
+    memory.close()
@@ -4,6 +4,11 @@ import time
 import threading
 from pathlib import Path
 
+try:
+    from config import JARVIS_HUB_PATH
+except ImportError:
+    JARVIS_HUB_PATH = "C:/JARVIS_HUB"
+
 class SmartSorter:
     """
     JARVIS - Smart Sorter Core (Elite v10.0)
@@ -12,7 +17,7 @@ class SmartSorter:
     def __init__(self, brain=None, terminal_callback=None):
         self.brain = brain
         self.log = terminal_callback
-        self.base_hub = Path("C:/JARVIS_HUB")
+        self.base_hub = Path(JARVIS_HUB_PATH)
         self.base_hub.mkdir(parents=True, exist_ok=True)
         
         # Extensions mapping for basic sorting
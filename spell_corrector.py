@@ -0,0 +1,222 @@
+"""
+JARVIS - Symmetric-Delete Spell Corrector (SymSpell)
+Nutqni tanish xatolarini (yotubeda, qushiq quy ...) pattern lug'ati asosida mikrosekundlarda tuzatadi.
+Lug'at bir marta quriladi va data/symspell_index.json ga saqlanadi.
+"""
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+from utils import setup_logger
+
+# Faqat harf va apostrofdan iborat tokenlar tuzatiladi
+WORD_RE = re.compile(r"^[^\W\d_]+(?:'[^\W\d_]+)*'?$")
+
+# Pattern lug'atida yo'q, lekin to'g'ri yozilgan umumiy so'zlar: ular "tuzatilmaydi"
+# ("love" -> "move", "baland" -> "balans" kabi buyruq o'g'irlashlarining oldini oladi)
+COMMON_WORDS = frozenset("""
+    a an the and or but if then so to of in on at by for from with about into over after before
+    i me my you your he she it we they them this that these those who what when where why how which
+    is am are was were be been do does did have has had can could will would should may might must
+    not no yes ok okay hi hello thanks thank please sorry good bad big small new old more most very
+    tell say know think want like love need make take give get go come see look feel joke story
+    time day today tomorrow life world people friend name question answer help work home
+    men sen u biz siz ular bu shu u yerda nima kim qanday qachon qayerda nega necha qancha
+    va yoki lekin ham bilan uchun haqida keyin oldin hozir bugun ertaga kecha yana juda eng
+    bor yo'q ha mayli rahmat salom xayr iltimos yaxshi yomon katta kichik baland past tez sekin
+    qil qiling ber bering ayt ayting bil bilasan bilasizmi qalaysan qalaysiz nima gap kayfiyat
+    hayot dunyo odam do'st ism savol javob ish uy vaqt kun yil oy hafta soat daqiqa
+    uchrashuv reja fikr gap narsa hamma hech
+""".split())
+
+
+def damerau_levenshtein(a, b, max_distance):
+    """Cheklangan Damerau-Levenshtein masofasi (max_distance'dan oshsa max_distance + 1)"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    prev_prev = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = cur[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev_prev[j - 2] + 1)
+            row_min = min(row_min, cur[j])
+        if row_min > max_distance:
+            return max_distance + 1
+        prev_prev, prev = prev, cur
+    return prev[-1]
+
+
+class SymSpell:
+    """
+    Symmetric-delete lug'at: har bir so'zning max_distance tagacha o'chirilgan variantlari -> so'zlar.
+    Qidiruvda kiruvchi tokenning o'chirilgan variantlari ham generatsiya qilinadi va kesishma tekshiriladi.
+    """
+
+    def __init__(self, max_distance=2, index_path=None, protected=None):
+        self.logger = setup_logger("SymSpell")
+        self.max_distance = max_distance
+        # Hech qachon tuzatilmaydigan so'zlar (umumiy so'zlar, ilova va sayt nomlari)
+        self.protected = COMMON_WORDS | {w.lower() for w in (protected or ())}
+        self.index_path = index_path or os.path.join(os.getcwd(), "data", "symspell_index.json")
+        self.words = {}    # so'z -> chastota
+        self.deletes = {}  # o'chirilgan variant -> [so'zlar]
+        self.lookup_cache_size = 4096
+        self._lookup_cache = {}  # token -> (so'z, masofa)
+
+    # --- BUILD ---
+
+    @staticmethod
+    def vocabulary_from_patterns(*pattern_tables):
+        """Pattern jadvallaridan so'z chastotalari"""
+        counts = Counter()
+        for table in pattern_tables:
+            for patterns in table.values():
+                for pattern in patterns:
+                    for token in pattern.lower().split():
+                        if WORD_RE.match(token):
+                            counts[token] += 1
+        return counts
+
+    def _edits(self, word, distance):
+        """So'zning distance tagacha barcha o'chirilgan variantlari"""
+        results = set()
+        frontier = {word}
+        for _ in range(distance):
+            nxt = set()
+            for w in frontier:
+                if len(w) <= 1:
+                    continue
+                for i in range(len(w)):
+                    nxt.add(w[:i] + w[i + 1:])
+            results |= nxt
+            frontier = nxt
+        return results
+
+    def build(self, vocabulary):
+        """Lug'atdan delete-indeksni qurish"""
+        self.words = dict(vocabulary)
+        deletes = {}
+        for word in self.words:
+            for variant in self._edits(word, self.max_distance) | {word}:
+                deletes.setdefault(variant, []).append(word)
+        self.deletes = deletes
+        self._lookup_cache = {}
+        return self
+
+    def _signature(self, vocabulary):
+        raw = json.dumps([self.max_distance, sorted(vocabulary.items())], ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def load_or_build(self, vocabulary):
+        """Diskdagi indeks lug'atga mos bo'lsa yuklash, aks holda qurib saqlash"""
+        signature = self._signature(vocabulary)
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("signature") == signature:
+                    self.words = data["words"]
+                    self.deletes = data["deletes"]
+                    self._lookup_cache = {}
+                    self.logger.info(f"SymSpell index loaded ({len(self.words)} words).")
+                    return self
+            except Exception as e:
+                self.logger.warning(f"SymSpell index load error: {e}")
+
+        self.build(vocabulary)
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            with open(self.index_path, "w", encoding="utf-8") as f:
+                json.dump({"signature": signature, "words": self.words, "deletes": self.deletes}, f, ensure_ascii=False)
+            self.logger.info(f"SymSpell index built ({len(self.words)} words, {len(self.deletes)} deletes).")
+        except Exception as e:
+            self.logger.warning(f"SymSpell index save error: {e}")
+        return self
+
+    # --- LOOKUP ---
+
+    def max_distance_for(self, token):
+        """Qisqa so'zlarni ortiqcha tuzatmaslik uchun uzunlikka qarab masofa"""
+        if len(token) <= 3:
+            return 0
+        if len(token) <= 6:
+            return min(1, self.max_distance)
+        return self.max_distance
+
+    def lookup(self, token):
+        """Eng yaqin lug'at so'zi: (so'z, masofa) yoki (token, 0)"""
+        if token in self.words or token in self.protected:
+            return token, 0
+
+        max_distance = self.max_distance_for(token)
+        if not max_distance or not WORD_RE.match(token):
+            return token, 0
+
+        cached = self._lookup_cache.get(token)
+        if cached is not None:
+            return cached
+
+        # Tartib: eng kichik masofa, keyin eng ko'p uchraydigan, keyin alifbo (deterministik)
+        best_key, best = None, (token, 0)
+        seen = set()
+        for variant in self._edits(token, max_distance) | {token}:
+            for candidate in self.deletes.get(variant, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                # Faqat qo'shimcha qo'shish ("notepad" -> "notepadda") tuzatish emas, boshqa shakl
+                if candidate.startswith(token):
+                    continue
+                distance = damerau_levenshtein(token, candidate, max_distance)
+                if distance > max_distance:
+                    continue
+                key = (distance, -self.words[candidate], candidate)
+                if best_key is None or key < best_key:
+                    best_key, best = key, (candidate, distance)
+
+        if len(self._lookup_cache) >= self.lookup_cache_size:
+            self._lookup_cache.clear()
+        self._lookup_cache[token] = best
+        return best
+
+    def correct_text(self, text):
+        """Matndagi har bir tokenni tuzatish; qaytaradi: (yangi_matn, tuzatishlar_soni)"""
+        tokens = text.split()
+        changed = 0
+        for i, token in enumerate(tokens):
+            fixed, distance = self.lookup(token)
+            if distance:
+                tokens[i] = fixed
+                changed += 1
+        return " ".join(tokens), changed
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from config import UZ_PATTERNS, EN_PATTERNS
+
+    t0 = time.perf_counter()
+    speller = SymSpell().load_or_build(SymSpell.vocabulary_from_patterns(UZ_PATTERNS, EN_PATTERNS))
+    print(f"Index ready in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    samples = ["yotubeda qidr", "qushiq quyy", "kompyutrni o'chir", "ekrnni qulfla", "yangilklarni o'qi"]
+    for s in samples:
+        t0 = time.perf_counter()
+        fixed, n = speller.correct_text(s)
+        print(f"{s!r:28} -> {fixed!r:28} ({n} fix, {(time.perf_counter() - t0) * 1e6:.0f} us)")
+
+    # To'g'ri yozilgan umumiy so'zlar va nomlar o'zgarmaydi
+    protected = SymSpell(protected=["notepad"]).load_or_build(SymSpell.vocabulary_from_patterns(UZ_PATTERNS, EN_PATTERNS))
+    for s in ["ovozni baland qil", "what is love", "open chrome and notepad", "notepad o'chir"]:
+        fixed, n = protected.correct_text(s)
+        assert n == 0, f"{s!r} -> {fixed!r}"
+    print("common words and app names left untouched")
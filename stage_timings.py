@@ -0,0 +1,159 @@
+"""
+JARVIS - Per-Stage Latency Timings
+StageTimer bitta process_command chaqiruvi bosqichlarini (parse, LLM, execute, speak ...)
+monotonic soat bilan o'lchaydi. StageHistograms har bir bosqich uchun oxirgi N o'lchovni
+saqlaydi (rolling) va HUD / web gateway uchun percentil va histogramma qaytaradi.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Histogramma chegaralari (ms): <=0.1, <=0.25, ... , > 10000
+BUCKET_EDGES_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class StageTimer:
+    """Lap-uslubidagi taymer: lap(stage) oldingi lap'dan beri o'tgan vaqtni shu bosqichga yozadi"""
+    __slots__ = ("t0", "last", "stages")
+
+    def __init__(self):
+        self.t0 = self.last = time.perf_counter_ns()
+        self.stages = {}
+
+    def lap(self, stage):
+        now = time.perf_counter_ns()
+        self.stages[stage] = self.stages.get(stage, 0) + now - self.last
+        self.last = now
+
+    def skip(self):
+        """O'tgan vaqtni hech bir bosqichga yozmaslik (faqat 'total'da qoladi)"""
+        self.last = time.perf_counter_ns()
+
+    def finish(self):
+        """{bosqich: ms, ..., "total": ms}"""
+        timings = {stage: round(ns / 1e6, 3) for stage, ns in self.stages.items()}
+        timings["total"] = round((time.perf_counter_ns() - self.t0) / 1e6, 3)
+        return timings
+
+
+class StageHistograms:
+    """Bosqich -> oxirgi `window` ta o'lchov (ms). Yozish O(bosqichlar soni), hisob so'rovda."""
+
+    def __init__(self, window=500, export_path=None, export_interval=5.0):
+        self.window = window
+        self.export_path = export_path
+        self.export_interval = export_interval
+        self._samples = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._exporter = None
+
+    def record(self, timings):
+        with self._lock:
+            for stage, ms in timings.items():
+                samples = self._samples.get(stage)
+                if samples is None:
+                    samples = self._samples[stage] = deque(maxlen=self.window)
+                samples.append(ms)
+                self._totals[stage] = self._totals.get(stage, 0) + 1
+            self._dirty = True
+        if self.export_path and self._exporter is None:
+            self._start_exporter()
+
+    def snapshot(self, stage=None):
+        """{bosqich: {count, window, mean, p50, p95, p99, max, buckets}} (ms)"""
+        with self._lock:
+            items = {s: list(v) for s, v in self._samples.items() if stage is None or s == stage}
+            totals = dict(self._totals)
+
+        result = {}
+        for name, values in items.items():
+            if not values:
+                continue
+            values.sort()
+            n = len(values)
+            buckets = [0] * (len(BUCKET_EDGES_MS) + 1)
+            edge_idx = 0
+            for v in values:
+                while edge_idx < len(BUCKET_EDGES_MS) and v > BUCKET_EDGES_MS[edge_idx]:
+                    edge_idx += 1
+                buckets[edge_idx] += 1
+            result[name] = {
+                "count": totals.get(name, n),
+                "window": n,
+                "mean": round(sum(values) / n, 3),
+                "p50": values[int(n * 0.50)],
+                "p95": values[min(n - 1, int(n * 0.95))],
+                "p99": values[min(n - 1, int(n * 0.99))],
+                "max": values[-1],
+                "buckets": buckets,
+            }
+        return result
+
+    def report(self):
+        """Eng sekin bosqichlardan boshlab matnli jadval"""
+        snap = self.snapshot()
+        lines = [f"{'stage':16} {'count':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}"]
+        for name, s in sorted(snap.items(), key=lambda kv: -kv[1]["p95"]):
+            lines.append(f"{name:16} {s['count']:>6} {s['p50']:>7.2f}ms {s['p95']:>7.2f}ms "
+                         f"{s['p99']:>7.2f}ms {s['max']:>7.2f}ms")
+        return "\n".join(lines)
+
+    def export(self):
+        """Web gateway (alohida jarayon) uchun JSON fayl"""
+        if not self.export_path:
+            return
+        data = {"updated": time.strftime("%Y-%m-%d %H:%M:%S"), "bucket_edges_ms": BUCKET_EDGES_MS,
+                "stages": self.snapshot()}
+        tmp = self.export_path + ".tmp"
+        os.makedirs(os.path.dirname(self.export_path), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.export_path)
+
+    def _start_exporter(self):
+        with self._lock:
+            if self._exporter is not None:
+                return
+            self._exporter = threading.Thread(target=self._export_loop, name="StageExporter", daemon=True)
+        self._exporter.start()
+
+    def _export_loop(self):
+        while True:
+            time.sleep(self.export_interval)
+            if not self._dirty:
+                continue
+            self._dirty = False
+            try:
+                self.export()
+            except Exception:
+                pass
+
+
+if __name__ == "__main__":
+    import random
+    histograms = StageHistograms()
+    n = 20000
+
+    # O'lchov xarajati: bitta buyruq ~8 bosqich
+    stages = ["learn", "detect_language", "parse", "retrieval", "llm", "execute", "speak"]
+    t0 = time.perf_counter()
+    for _ in range(n):
+        timer = StageTimer()
+        for stage in stages:
+            timer.lap(stage)
+        histograms.record(timer.finish())
+    per_command_us = (time.perf_counter() - t0) / n * 1e6
+    print(f"Timer + histogram overhead: {per_command_us:.2f} us/command ({len(stages)} stages)")
+
+    histograms = StageHistograms(window=500)
+    for _ in range(1000):
+        histograms.record({"parse": random.uniform(0.02, 0.3), "llm": random.lognormvariate(6.5, 0.5),
+                           "execute": random.lognormvariate(3, 1), "speak": random.uniform(800, 2500)})
+    t0 = time.perf_counter()
+    snap = histograms.snapshot()
+    print(f"Snapshot: {(time.perf_counter() - t0) * 1000:.2f} ms")
+    print(histograms.report())
@@ -4,6 +4,11 @@ import zipfile
 import time
 from pathlib import Path
 
+try:
+    from config import JARVIS_HUB_PATH
+except ImportError:
+    JARVIS_HUB_PATH = "C:/JARVIS_HUB"
+
 class SyncManager:
     """
     JARVIS - Autonomous Sync & Backup (Elite v11.0)
@@ -11,7 +16,7 @@ class SyncManager:
     """
     def __init__(self, terminal_callback=None):
         self.log = terminal_callback
-        self.hub_path = Path("C:/JARVIS_HUB")
+        self.hub_path = Path(JARVIS_HUB_PATH)
         self.vault_path = Path(os.getcwd()) / "data" / "shadow.vault"
         self.backup_root = Path(os.getcwd()) / "data" / "backups"
         self.backup_root.mkdir(parents=True, exist_ok=True)
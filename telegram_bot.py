@@ -9,6 +9,7 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes
 import config
 from utils import setup_logger
+from async_bridge import run_blocking
 
 # Suppress loggers
 import logging
@@ -51,34 +52,38 @@ class TelegramBot:
         self.logger.info(f"Bot received command: {data}")
 
         if data == "lock":
-            subprocess.run("rundll32.exe user32.dll,LockWorkStation", shell=True)
+            await run_blocking(subprocess.run, "rundll32.exe user32.dll,LockWorkStation", shell=True)
             await query.edit_message_text(text="🔒 System Locked")
             
         elif data == "sleep":
             await query.edit_message_text(text="🌙 Sleep Mode Initiated")
-            os.system("rundll32.exe powrprof.dll,SetSuspendState 0,1,0")
+            await run_blocking(os.system, "rundll32.exe powrprof.dll,SetSuspendState 0,1,0")
             
         elif data == "screen":
             path = "remote_screenshot.png"
-            pyautogui.screenshot(path)
-            await query.message.reply_photo(photo=open(path, 'rb'), caption="📸 Screenshot")
+            await run_blocking(pyautogui.screenshot, path)
+            with open(path, 'rb') as photo:
+                await query.message.reply_photo(photo=photo, caption="📸 Screenshot")
             os.remove(path)
             
         elif data == "info":
-            battery = psutil.sensors_battery()
-            percent = battery.percent if battery else "N/A"
-            mem = psutil.virtual_memory().percent
-            cpu = psutil.cpu_percent()
+            percent, mem, cpu = await run_blocking(self._system_status)
             await query.edit_message_text(text=f"📊 **System Status**\n🔋 Battery: {percent}%\n🧠 RAM: {mem}%\n⚡ CPU: {cpu}%", parse_mode="Markdown")
             
         elif data == "mute":
-            pyautogui.press("volumemute")
+            await run_blocking(pyautogui.press, "volumemute")
             await query.edit_message_text(text="🔊 Ovoz o'chirildi")
             
         elif data == "unmute":
-            pyautogui.press("volumemute")
+            await run_blocking(pyautogui.press, "volumemute")
             await query.edit_message_text(text="🔊 Ovoz yoqildi")
 
+    def _system_status(self):
+        """(battery %, RAM %, CPU %) - psutil bloklaydi, pool'da chaqiriladi"""
+        battery = psutil.sensors_battery()
+        percent = battery.percent if battery else "N/A"
+        return percent, psutil.virtual_memory().percent, psutil.cpu_percent()
+
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle incoming text commands"""
         user_id = update.effective_user.id
@@ -104,12 +109,16 @@ class TelegramBot:
         try:
             base_dir = os.path.dirname(os.path.abspath(__file__))
             cmd_file = os.path.join(base_dir, "data", "remote_command.txt")
-            with open(cmd_file, "w", encoding="utf-8") as f:
-                f.write(text)
+            await run_blocking(self._write_remote_command, cmd_file, text)
             await update.message.reply_text(f"📥 Buyruq qabul qilindi: '{text}'")
         except Exception as e:
             await update.message.reply_text(f"❌ Xatolik: {e}")
 
+    @staticmethod
+    def _write_remote_command(cmd_file, text):
+        with open(cmd_file, "w", encoding="utf-8") as f:
+            f.write(text)
+
     async def send_notification(self, message):
         """Send proactive message to the user"""
         try:
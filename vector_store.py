@@ -0,0 +1,229 @@
+"""
+JARVIS - Memory-mapped Vector Store
+MemoryCore embeddinglari uchun append-only saqlash:
+    vectors.f32  - normallashtirilgan float32 matritsa (qator = bitta xotira), np.memmap orqali o'qiladi
+    meta.jsonl   - har qatorga mos metadata (text, source, timestamp), bitta JSON qator
+    header.json  - o'lcham (dim) va format versiyasi
+Qo'shish faylning oxiriga yozadi (butun fayl qayta yozilmaydi). Qidiruv bitta matritsa-vektor
+ko'paytmasi + argpartition (top-k). Yozuv to'liq tugamagan bo'lsa (uzilish), yuklashda ikki
+faylning umumiy qismi olinadi. Store katta bo'lsa (ann_index.DEFAULTS["min_rows"]) qidiruv IVF
+indeksi orqali (ann_index.IVFIndex), kichik store'da aniq skan. Indeks o'qitish va qayta joylashtirishni
+fonda bajaradi: qo'shish store qulfini faqat yangi qatorlar uchun ushlaydi, qidiruv qulfsiz.
+"""
+import json
+import os
+import threading
+import numpy as np
+from ann_index import IVFIndex
+
+FORMAT_VERSION = 1
+VECTORS_FILE = "vectors.f32"
+META_FILE = "meta.jsonl"
+HEADER_FILE = "header.json"
+
+
+def normalize_rows(matrix):
+    """Qatorlarni L2 bo'yicha normallashtirish (nol vektor nol bo'lib qoladi)"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class VectorStore:
+    def __init__(self, directory, ann=True, ann_settings=None):
+        self.directory = directory
+        self.vectors_path = os.path.join(directory, VECTORS_FILE)
+        self.meta_path = os.path.join(directory, META_FILE)
+        self.header_path = os.path.join(directory, HEADER_FILE)
+        self.dim = None
+        self.meta = []
+        self._matrix = None  # np.memmap, qo'shishdan keyin qayta ochiladi
+        self._lock = threading.RLock()
+        self._load()
+        self.index = IVFIndex(directory, ann_settings) if ann else None
+        if self.index:
+            self.index.sync(self.matrix())
+
+    def __len__(self):
+        return len(self.meta)
+
+    # --- LOAD ---
+
+    def _load(self):
+        if not os.path.exists(self.header_path):
+            return
+        with open(self.header_path, "r", encoding="utf-8") as f:
+            self.dim = json.load(f)["dim"]
+        meta = []
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        meta.append(json.loads(line))
+                    except ValueError:
+                        break  # yarim yozilgan oxirgi qator
+        rows = os.path.getsize(self.vectors_path) // (4 * self.dim) if os.path.exists(self.vectors_path) else 0
+        count = min(rows, len(meta))
+        self.meta = meta[:count]
+        # Uzilgan yozuv qoldiqlarini kesish: keyingi qo'shishlar to'g'ri joyga tushadi
+        if os.path.exists(self.vectors_path) and os.path.getsize(self.vectors_path) != count * 4 * self.dim:
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(count * 4 * self.dim)
+        if len(meta) != count:
+            self._rewrite_meta()
+
+    def _rewrite_meta(self):
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for item in self.meta:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.meta_path)
+
+    def matrix(self):
+        """(n, dim) float32 memmap (faqat o'qish); bo'sh bo'lsa None"""
+        with self._lock:
+            if self._matrix is None and self.meta:
+                self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                         shape=(len(self.meta), self.dim))
+            return self._matrix
+
+    # --- WRITE ---
+
+    def add_many(self, vectors, metas):
+        """Vektorlar partiyasini (normallashtirib) va metadata'ni fayllar oxiriga yozish"""
+        metas = list(metas)
+        if not metas:
+            return 0
+        matrix = normalize_rows(vectors)
+        if matrix.shape[0] != len(metas):
+            raise ValueError("vectors va metas soni teng emas")
+        with self._lock:
+            if self.dim is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self.dim = matrix.shape[1]
+                with open(self.header_path, "w", encoding="utf-8") as f:
+                    json.dump({"version": FORMAT_VERSION, "dim": self.dim}, f)
+            elif matrix.shape[1] != self.dim:
+                raise ValueError(f"Vektor o'lchami {matrix.shape[1]}, kutilgan {self.dim}")
+            # Avval vektorlar, keyin metadata: uzilishda ortiqcha vektorlar _load() da kesiladi
+            with open(self.vectors_path, "ab") as f:
+                f.write(np.ascontiguousarray(matrix).tobytes())
+            with open(self.meta_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(m, ensure_ascii=False) + "\n" for m in metas))
+            start = len(self.meta)
+            self.meta.extend(metas)
+            self._matrix = None
+            if self.index:
+                self.index.on_append(self.matrix(), start, matrix)
+        return len(metas)
+
+    def add(self, vector, meta):
+        return self.add_many([vector], [meta])
+
+    # --- SEARCH ---
+
+    def search(self, query_vector, top_k=3, threshold=None, exact=False, nprobe=None):
+        """
+        [(o'xshashlik, indeks), ...] kamayish tartibida (cosine, chunki qatorlar normallashtirilgan).
+        exact=True: IVF indeksi bo'lsa ham to'liq skan.
+        """
+        matrix = self.matrix()
+        if matrix is None or top_k <= 0:
+            return []
+        query = normalize_rows(query_vector)[0]
+        if query.shape[0] != self.dim:
+            raise ValueError(f"So'rov o'lchami {query.shape[0]}, kutilgan {self.dim}")
+        if not exact and self.index and self.index.usable(matrix.shape[0]):
+            scores, ids = self.index.search(matrix, query, top_k, nprobe)
+            results = [(float(score), int(i)) for score, i in zip(scores, ids)]
+            if threshold is not None:
+                results = [r for r in results if r[0] > threshold]
+            return results
+        scores = matrix @ query
+        k = min(top_k, scores.shape[0])
+        if k < scores.shape[0]:
+            idx = np.argpartition(-scores, k - 1)[:k]
+        else:
+            idx = np.arange(scores.shape[0])
+        idx = idx[np.argsort(-scores[idx], kind="stable")]
+        results = [(float(scores[i]), int(i)) for i in idx]
+        if threshold is not None:
+            results = [r for r in results if r[0] > threshold]
+        return results
+
+    # --- MIGRATION ---
+
+    def migrate_json(self, json_path):
+        """Eski data/vector_memory.json (ro'yxat, har elementda "vector") -> store. Fayl .migrated bo'ladi"""
+        if len(self) or not os.path.exists(json_path):
+            return 0
+        with open(json_path, "r", encoding="utf-8") as f:
+            items = json.load(f)
+        items = [item for item in items if item.get("vector")]
+        if items:
+            dim = len(items[0]["vector"])
+            items = [item for item in items if len(item["vector"]) == dim]
+            self.add_many([item["vector"] for item in items],
+                          [{k: v for k, v in item.items() if k != "vector"} for item in items])
+        os.replace(json_path, json_path + ".migrated")
+        return len(items)
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    import time
+
+    dim = 768  # models/embedding-001
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000]
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((20, dim)).astype(np.float32)
+
+    # Migratsiya: eski JSON format
+    tmp = tempfile.mkdtemp()
+    legacy = [{"text": f"xotira {i}", "vector": rng.standard_normal(dim).tolist(), "source": "User",
+               "timestamp": "New"} for i in range(50)]
+    json_path = os.path.join(tmp, "vector_memory.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(legacy, f, indent=2)
+    store = VectorStore(os.path.join(tmp, "migrated"))
+    moved = store.migrate_json(json_path)
+    best = store.search(legacy[7]["vector"], top_k=1)[0]
+    print(f"migrated {moved} memories; self-query -> {store.meta[best[1]]['text']} ({best[0]:.3f})")
+
+    for n in sizes:
+        data = rng.standard_normal((n, dim)).astype(np.float32)
+        store = VectorStore(os.path.join(tmp, f"bench_{n}"))
+        t0 = time.perf_counter()
+        for start in range(0, n, 5000):
+            store.add_many(data[start:start + 5000], ({"text": f"m{i}"} for i in range(start, min(n, start + 5000))))
+        build_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        store.add(queries[0], {"text": "yangi"})
+        append_ms = (time.perf_counter() - t0) * 1000
+
+        store = VectorStore(store.directory)  # qayta ochish (memmap)
+        store.search(queries[0], top_k=3, exact=True)
+        t0 = time.perf_counter()
+        for q in queries:
+            store.search(q, top_k=3, exact=True)
+        search_ms = (time.perf_counter() - t0) * 1000 / len(queries)
+
+        # Eski usul: har xotira uchun np.array + norma, keyin to'liq sort
+        as_lists = data[:min(n, 10_000)].tolist()
+        t0 = time.perf_counter()
+        q_vec = np.array(queries[1].tolist())
+        scored = [(np.dot(q_vec, np.array(v)) / (np.linalg.norm(q_vec) * np.linalg.norm(np.array(v))), i)
+                  for i, v in enumerate(as_lists)]
+        scored.sort(key=lambda x: x[0], reverse=True)
+        legacy_ms = (time.perf_counter() - t0) * 1000 * n / len(as_lists)
+
+        exact = int(np.argmax(normalize_rows(data) @ normalize_rows(queries[1])[0]))
+        assert store.search(queries[1], top_k=1, exact=True)[0][1] == exact
+        print(f"n={n:>7}: bulk load {build_s:5.2f} s | append 1 {append_ms:6.2f} ms | "
+              f"exact search {search_ms:7.2f} ms vs legacy loop {legacy_ms:9.1f} ms"
+              f"{' (extrapolated from 10k)' if n > 10_000 else ''}")
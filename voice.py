@@ -382,6 +382,21 @@ class VoiceAssistant:
         else:
             self.stt = None
     
+    def prepare_audio(self):
+        """Keyingi speak() uchun TTS modullari va audio qurilmani oldindan ochish (prefetch)"""
+        if not (self.tts and self.enable_tts) or not self.lock.acquire(blocking=False):
+            return False
+        try:
+            import edge_tts  # noqa: F401 - birinchi import javob yo'lidan chiqariladi
+            import pygame
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            return True
+        except Exception:
+            return False
+        finally:
+            self.lock.release()
+
     def speak(self, text, lang="uz"):
         """Matnni ovozga o'girish (Edge TTS -> Silent Fallback to pyttsx3)"""
         if not text: return
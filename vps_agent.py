@@ -12,12 +12,15 @@ import config
 from elite_ai import EliteAI
 from research_assistant import ResearchAssistant
 from utils import setup_logger
+from async_bridge import AsyncProxy
 
 # --- GLOBAL STATE ---
 COMMAND_QUEUE = []
 app = Flask(__name__)
 logger = setup_logger("VPS_Agent")
 ai = EliteAI()
+# Telegram handler'lari uchun: EliteAI (MemoryEngine + LLM HTTP) chaqiruvlari pool'da bajariladi
+async_ai = AsyncProxy(ai)
 research = ResearchAssistant()
 
 # --- TELEGRAM BOT LOGIC (VPS MODE) ---
@@ -63,7 +66,7 @@ class VPSTelegramBot:
             return
 
         # 3. AI Chat (VPS-da bajariladi)
-        response = ai.process(text)
+        response = await async_ai.process(text)
         await update.message.reply_text(response)
 
     def run(self):
@@ -94,5 +97,8 @@ if __name__ == "__main__":
     threading.Thread(target=run_flask, daemon=True).start()
     
     # Botni asosiy thread-da ishga tushirish
+    # Suhbat xulosalarini fonda yangilab borish
+    ai.summarizer.start()
+
     bot = VPSTelegramBot()
     bot.run()